@@ -1,52 +1,94 @@
 import flet as ft
 import boto3
 import os
+from botocore.config import Config
 from dotenv import load_dotenv
+from s3_uploader import S3Uploader
+from upload_manifest import UploadManifest
 
 # Cargar variables de entorno (asegúrate de tener un .env con las credenciales)
 load_dotenv()
 AWS_ACCESS_KEY = os.getenv("AWS_ACCESS_KEY")
 AWS_SECRET_KEY = os.getenv("AWS_SECRET_KEY")
 
-# Inicializar cliente de S3
+# Archivos que se suben a la vez y partes en paralelo por archivo
+MAX_WORKERS = 4
+MAX_CONCURRENCY = 8
+
+# Inicializar cliente de S3 (compartido por todos los hilos de subida)
 s3_client = boto3.client(
     's3',
     aws_access_key_id=AWS_ACCESS_KEY,
-    aws_secret_access_key=AWS_SECRET_KEY
+    aws_secret_access_key=AWS_SECRET_KEY,
+    config=Config(max_pool_connections=MAX_WORKERS * MAX_CONCURRENCY)
 )
+# Manifest local: evita volver a subir lo que no cambió y permite reanudar multipartes
+MANIFEST_FILE = os.path.expanduser("~/.config/aws_sdk_app/uploads.db")
+uploader = S3Uploader(s3_client, max_workers=MAX_WORKERS, max_concurrency=MAX_CONCURRENCY, manifest=UploadManifest(MANIFEST_FILE))
 
 def main(page: ft.Page):
     page.title = "Subir archivos a S3"
     page.window_width = 500
-    page.window_height = 400
+    page.window_height = 600
     
     bucket_name_input = ft.TextField(label="Nombre del Bucket", width=400)
     folder_name_input = ft.TextField(label="Nombre de la Subcarpeta (opcional)", width=400)
     
-    def subir_archivo(e: ft.FilePickerResultEvent):
-        if e.files and bucket_name_input.value:
-            archivo_local = e.files[0].path
-            nombre_en_s3 = os.path.basename(archivo_local)
-            bucket_name = bucket_name_input.value
-            subcarpeta = folder_name_input.value.strip()
-            
-            # Si se especifica una subcarpeta, agregarla al nombre del archivo
-            if subcarpeta:
-                nombre_en_s3 = f"{subcarpeta}/{nombre_en_s3}"
-            
-            try:
-                s3_client.upload_file(archivo_local, bucket_name, nombre_en_s3)
-                resultado.value = f"Archivo subido exitosamente a {bucket_name}/{nombre_en_s3}"
-            except Exception as ex:
-                resultado.value = f"Error al subir: {ex}"
-            page.update()
-    
-    file_picker = ft.FilePicker(on_result=subir_archivo)
-    page.overlay.append(file_picker)
-    
-    btn_subir = ft.ElevatedButton("Seleccionar archivo", on_click=lambda _: file_picker.pick_files(allow_multiple=False))
-    resultado = ft.Text("Selecciona un archivo, especifica un bucket y opcionalmente una subcarpeta para subir a S3")
-    
-    page.add(bucket_name_input, folder_name_input, btn_subir, resultado)
+    barra_total = ft.ProgressBar(value=0, width=400)
+    lista_archivos = ft.ListView(height=150, spacing=5)
+    
+    def mostrar_progreso(progreso, filas):
+        # Se llama desde los hilos de subida, como mucho cada 0.2 s
+        totales = progreso.totals()
+        barra_total.value = totales["fraction"]
+        resultado.value = (
+            f"{totales['done']}/{totales['files']} archivos · "
+            f"{totales['sent'] / 1024 / 1024:.1f}/{totales['size'] / 1024 / 1024:.1f} MB · "
+            f"{totales['throughput'] / 1024 / 1024:.1f} MB/s"
+        )
+        for clave, archivo in list(progreso.files.items()):
+            fila = filas.get(clave)
+            if fila is None:
+                continue
+            barra, texto = fila
+            barra.value = archivo["sent"] / archivo["size"] if archivo["size"] else 1.0
+            texto.value = f"{clave} ({archivo['status']})" + (f": {archivo['error']}" if archivo["error"] else "")
+        page.update()
+    
+    def subir(rutas):
+        if not rutas or not bucket_name_input.value:
+            return
+        bucket_name = bucket_name_input.value.strip()
+        subcarpeta = folder_name_input.value.strip()
+        
+        # Las filas de cada tanda se crean antes de encolar nada: los hilos de subida ya las encuentran
+        filas = {}  # clave en S3 -> (barra, texto)
+        progreso = uploader.plan(rutas, bucket_name, subcarpeta, on_change=lambda p: mostrar_progreso(p, filas))
+        lista_archivos.controls.clear()
+        for clave in progreso.files:
+            barra, texto = ft.ProgressBar(value=0, width=150), ft.Text(clave, size=12)
+            filas[clave] = (barra, texto)
+            lista_archivos.controls.append(ft.Row([barra, texto]))
+        mostrar_progreso(progreso, filas)
+        # La subida corre en el pool del uploader: la UI no se bloquea
+        uploader.start(progreso)
+    
+    def subir_archivos(e: ft.FilePickerResultEvent):
+        if e.files:
+            subir([f.path for f in e.files])
+    
+    def subir_carpeta(e: ft.FilePickerResultEvent):
+        if e.path:
+            subir([e.path])
+    
+    file_picker = ft.FilePicker(on_result=subir_archivos)
+    folder_picker = ft.FilePicker(on_result=subir_carpeta)
+    page.overlay.extend([file_picker, folder_picker])
+    
+    btn_subir = ft.ElevatedButton("Seleccionar archivos", on_click=lambda _: file_picker.pick_files(allow_multiple=True))
+    btn_carpeta = ft.ElevatedButton("Seleccionar carpeta", on_click=lambda _: folder_picker.get_directory_path())
+    resultado = ft.Text("Selecciona archivos o una carpeta, especifica un bucket y opcionalmente una subcarpeta para subir a S3")
+    
+    page.add(bucket_name_input, folder_name_input, ft.Row([btn_subir, btn_carpeta]), barra_total, resultado, lista_archivos)
 
 ft.app(target=main)
@@ -0,0 +1,242 @@
+import math
+import mmap
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import ClientError
+from upload_manifest import file_hash
+
+MB = 1024 * 1024
+# Límite de partes de una subida multiparte en S3
+MAX_PARTS = 10000
+
+# 🔹 Configuración de transferencia según el tamaño del archivo
+def transfer_config_for(size, chunk_size=16 * MB, max_concurrency=8):
+    """Multiparte a partir de chunk_size, con partes mayores si el archivo no cabe en MAX_PARTS"""
+    chunk_size = max(chunk_size, math.ceil(size / MAX_PARTS))
+    return TransferConfig(
+        multipart_threshold=chunk_size,
+        multipart_chunksize=chunk_size,
+        max_concurrency=max_concurrency,
+        use_threads=True,
+    )
+
+# 🔹 Archivos a subir (las carpetas se recorren) con su clave en S3
+def expand_paths(paths, prefix=""):
+    prefix = prefix.strip("/")
+    uploads = []
+    for path in paths:
+        if os.path.isdir(path):
+            # La carpeta conserva su nombre y su estructura dentro del prefijo
+            base = os.path.dirname(os.path.abspath(path))
+            for root, _, files in os.walk(path):
+                for name in sorted(files):
+                    local = os.path.join(root, name)
+                    uploads.append((local, os.path.relpath(local, base).replace(os.sep, "/")))
+        else:
+            uploads.append((path, os.path.basename(path)))
+    return [(local, f"{prefix}/{key}" if prefix else key) for local, key in uploads]
+
+# Estados finales de un archivo: subido, omitido (sin cambios), copiado (mismo contenido en otra clave)
+DONE_STATUSES = ("subido", "omitido", "copiado", "error")
+
+class UploadProgress:
+    """Bytes subidos por archivo y en total, alimentado por los callbacks de boto3"""
+
+    def __init__(self, on_change=None, interval=0.2, bucket=None, uploads=()):
+        self.on_change = on_change  # Se llama como mucho cada `interval` segundos
+        self.interval = interval
+        self.bucket = bucket
+        self.uploads = list(uploads)  # (ruta local, clave) de la tanda
+        self.files = {}  # clave -> {"size", "sent", "status", "error"}
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+        self._last_notify = 0.0
+
+    def add(self, key, size):
+        with self._lock:
+            self.files[key] = {"size": size, "sent": 0, "status": "pendiente", "error": None}
+
+    def callback(self, key):
+        """Callback de boto3 para un archivo (recibe los bytes de cada bloque enviado)"""
+        def on_bytes(amount):
+            with self._lock:
+                file = self.files[key]
+                file["sent"] += amount
+                file["status"] = "subiendo"
+            self._notify()
+        return on_bytes
+
+    def finish(self, key, error=None, status="subido"):
+        with self._lock:
+            file = self.files[key]
+            file["status"] = "error" if error else status
+            file["error"] = error
+            if not error:
+                file["sent"] = file["size"]
+        self._notify(force=True)
+
+    def totals(self):
+        with self._lock:
+            size = sum(file["size"] for file in self.files.values())
+            sent = sum(file["sent"] for file in self.files.values())
+            done = sum(file["status"] in DONE_STATUSES for file in self.files.values())
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        return {
+            "size": size,
+            "sent": sent,
+            "files": len(self.files),
+            "done": done,
+            "fraction": sent / size if size else 1.0,
+            "throughput": sent / elapsed,  # bytes/s
+        }
+
+    def _notify(self, force=False):
+        now = time.monotonic()
+        if self.on_change is None or (not force and now - self._last_notify < self.interval):
+            return
+        self._last_notify = now
+        try:
+            self.on_change(self)
+        except Exception as e:
+            # Un fallo de la UI no debe marcar como fallida una subida que sí terminó
+            print(f"❌ Error al mostrar el progreso: {e}")
+
+class S3Uploader:
+    """Sube varios archivos a la vez con un pool acotado; cada archivo grande va en multiparte.
+
+    Con un manifest, los archivos sin cambios no se vuelven a subir, el contenido que ya está en
+    otra clave del bucket se copia en S3 y las multipartes interrumpidas se retoman por su última
+    parte completada.
+    """
+
+    def __init__(self, s3_client, max_workers=4, chunk_size=16 * MB, max_concurrency=8, manifest=None):
+        self.s3_client = s3_client
+        self.chunk_size = chunk_size
+        self.max_concurrency = max_concurrency
+        self.manifest = manifest
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="s3-upload")
+        # Partes de las multipartes reanudables, compartido por todos los archivos
+        self._part_executor = ThreadPoolExecutor(max_workers=max_workers * max_concurrency, thread_name_prefix="s3-part")
+
+    def upload(self, paths, bucket, prefix="", on_change=None):
+        """Encolar la subida de archivos y carpetas; devuelve (progreso, futures)"""
+        progress = self.plan(paths, bucket, prefix, on_change)
+        return progress, self.start(progress)
+
+    def plan(self, paths, bucket, prefix="", on_change=None):
+        """Progreso con todos los archivos de la tanda registrados, sin empezar a subir nada"""
+        uploads = expand_paths(paths, prefix)
+        progress = UploadProgress(on_change, bucket=bucket, uploads=uploads)
+        for local, key in uploads:
+            progress.add(key, os.path.getsize(local))
+        return progress
+
+    def start(self, progress):
+        """Encolar las subidas de una tanda planificada con plan(); devuelve sus futures"""
+        return [
+            self._executor.submit(self._upload_one, local, progress.bucket, key, progress)
+            for local, key in progress.uploads
+        ]
+
+    def _upload_one(self, local, bucket, key, progress):
+        try:
+            status = self._transfer(local, bucket, key, progress)
+        except Exception as e:
+            progress.finish(key, error=str(e))
+            return False
+        progress.finish(key, status=status)
+        return True
+
+    def _transfer(self, local, bucket, key, progress):
+        stat = os.stat(local)
+        config = transfer_config_for(stat.st_size, self.chunk_size, self.max_concurrency)
+        if self.manifest is None:
+            self.s3_client.upload_file(local, bucket, key, Config=config, Callback=progress.callback(key))
+            return "subido"
+
+        # Mismo tamaño y mtime que la última subida de esta clave: ni siquiera se lee el archivo
+        previous = self.manifest.get(bucket, key)
+        if previous and (previous["size"], previous["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+            return "omitido"
+
+        sha256 = file_hash(local)
+        record = lambda: self.manifest.record(bucket, key, local, stat.st_size, stat.st_mtime_ns, sha256)
+        if previous and previous["sha256"] == sha256:
+            record()  # Solo cambió el mtime
+            return "omitido"
+
+        # El mismo contenido ya está en otra clave del bucket: copia en el servidor
+        source = self.manifest.find_hash(bucket, sha256)
+        if source is not None and stat.st_size <= 5 * 1024 * MB:
+            try:
+                self.s3_client.copy_object(Bucket=bucket, Key=key, CopySource={"Bucket": bucket, "Key": source})
+                record()
+                return "copiado"
+            except ClientError:
+                pass  # La clave de origen ya no existe: se sube normalmente
+
+        if stat.st_size >= config.multipart_threshold:
+            self._resumable_multipart(local, bucket, key, stat, config.multipart_chunksize, progress)
+        else:
+            self.s3_client.upload_file(local, bucket, key, Config=config, Callback=progress.callback(key))
+        record()
+        return "subido"
+
+    def _resumable_multipart(self, local, bucket, key, stat, part_size, progress):
+        """Multiparte cuyo upload_id queda en el manifest; al reanudar se saltan las partes ya subidas"""
+        done = {}
+        pending = self.manifest.get_multipart(bucket, key)
+        if pending and (pending["size"], pending["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+            part_size = pending["part_size"]
+            upload_id = pending["upload_id"]
+            try:
+                done = self._list_parts(bucket, key, upload_id)
+            except ClientError:
+                upload_id = None  # La subida ya no existe (abortada o expirada)
+        else:
+            if pending:
+                # El archivo cambió desde la subida interrumpida
+                self._abort(bucket, key, pending["upload_id"])
+            upload_id = None
+        if upload_id is None:
+            upload_id = self.s3_client.create_multipart_upload(Bucket=bucket, Key=key)["UploadId"]
+            self.manifest.start_multipart(bucket, key, upload_id, stat.st_size, stat.st_mtime_ns, part_size)
+
+        on_bytes = progress.callback(key)
+        parts = math.ceil(stat.st_size / part_size)
+        with open(local, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            def upload_part(number):
+                start = (number - 1) * part_size
+                size = min(part_size, stat.st_size - start)
+                if number in done and done[number]["Size"] == size:
+                    on_bytes(size)
+                    return done[number]["ETag"]
+                response = self.s3_client.upload_part(
+                    Bucket=bucket, Key=key, UploadId=upload_id, PartNumber=number, Body=mm[start:start + size]
+                )
+                on_bytes(size)
+                return response["ETag"]
+
+            etags = list(self._part_executor.map(upload_part, range(1, parts + 1)))
+        self.s3_client.complete_multipart_upload(
+            Bucket=bucket, Key=key, UploadId=upload_id,
+            MultipartUpload={"Parts": [{"PartNumber": n, "ETag": etag} for n, etag in enumerate(etags, start=1)]},
+        )
+
+    def _list_parts(self, bucket, key, upload_id):
+        parts = {}
+        paginator = self.s3_client.get_paginator("list_parts")
+        for page in paginator.paginate(Bucket=bucket, Key=key, UploadId=upload_id):
+            for part in page.get("Parts", []):
+                parts[part["PartNumber"]] = part
+        return parts
+
+    def _abort(self, bucket, key, upload_id):
+        try:
+            self.s3_client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+        except ClientError:
+            pass
+        self.manifest.drop_multipart(bucket, key)
@@ -0,0 +1,185 @@
+import os
+import boto3
+import pytest
+from moto import mock_aws
+from s3_uploader import MAX_PARTS, MB, S3Uploader, expand_paths, transfer_config_for
+from upload_manifest import UploadManifest
+
+BUCKET = "firmware-test"
+
+@pytest.fixture
+def s3(monkeypatch):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with mock_aws():
+        client = boto3.client("s3")
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+
+def write(path, size):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(os.urandom(size))
+    return path
+
+def wait(futures):
+    return [future.result(timeout=60) for future in futures]
+
+def test_transfer_config_grows_parts_to_fit_max_parts():
+    assert transfer_config_for(100 * MB).multipart_chunksize == 16 * MB
+    config = transfer_config_for(500 * 1024 * MB, chunk_size=16 * MB, max_concurrency=4)
+    assert config.multipart_chunksize * MAX_PARTS >= 500 * 1024 * MB
+    assert config.multipart_threshold == config.multipart_chunksize
+    assert config.max_concurrency == 4
+
+def test_expand_paths_keeps_folder_structure(tmp_path):
+    write(tmp_path / "fw" / "app.bin", 1)
+    write(tmp_path / "fw" / "data" / "spiffs.bin", 1)
+    single = write(tmp_path / "boot.bin", 1)
+    keys = [key for _, key in expand_paths([str(tmp_path / "fw"), str(single)], prefix="/v1/")]
+    assert keys == ["v1/fw/app.bin", "v1/fw/data/spiffs.bin", "v1/boot.bin"]
+
+def test_uploads_files_and_folder_concurrently(s3, tmp_path):
+    small = [write(tmp_path / "fw" / f"part{i}.bin", 1000 + i) for i in range(5)]
+    large = write(tmp_path / "image.bin", 11 * MB)
+    uploader = S3Uploader(s3, max_workers=3, chunk_size=5 * MB, max_concurrency=2)
+
+    progress, futures = uploader.upload([str(tmp_path / "fw"), str(large)], BUCKET, prefix="release")
+    assert wait(futures) == [True] * 6
+
+    objects = {o["Key"]: o["Size"] for o in s3.list_objects_v2(Bucket=BUCKET)["Contents"]}
+    assert objects == {
+        **{f"release/fw/part{i}.bin": 1000 + i for i in range(5)},
+        "release/image.bin": 11 * MB,
+    }
+    # El archivo grande se subió en multiparte (ETag "hash-partes")
+    assert s3.head_object(Bucket=BUCKET, Key="release/image.bin")["ETag"].strip('"').endswith("-3")
+    assert s3.get_object(Bucket=BUCKET, Key="release/fw/part0.bin")["Body"].read() == open(small[0], "rb").read()
+
+def test_progress_totals_and_throttled_notifications(s3, tmp_path):
+    paths = [write(tmp_path / f"f{i}.bin", 6 * MB) for i in range(3)]
+    notifications = []
+    uploader = S3Uploader(s3, max_workers=3, chunk_size=5 * MB)
+
+    progress, futures = uploader.upload([str(p) for p in paths], BUCKET, on_change=lambda p: notifications.append(p.totals()))
+    assert progress.totals()["size"] == 18 * MB
+    wait(futures)
+
+    totals = progress.totals()
+    assert totals["sent"] == totals["size"] == 18 * MB
+    assert totals["done"] == totals["files"] == 3
+    assert totals["fraction"] == 1.0
+    assert totals["throughput"] > 0
+    assert all(file["status"] == "subido" for file in progress.files.values())
+    # Notificaciones acotadas (cada 0.2 s o al terminar un archivo), no una por bloque de boto3
+    assert 3 <= len(notifications) < 50
+    assert notifications[-1]["done"] == 3
+
+def test_failed_upload_is_reported_per_file(s3, tmp_path):
+    good = write(tmp_path / "ok.bin", 10)
+    uploader = S3Uploader(s3)
+
+    progress, futures = uploader.upload([str(good)], "missing-bucket")
+    assert wait(futures) == [False]
+    file = progress.files["ok.bin"]
+    assert file["status"] == "error" and file["error"]
+    assert progress.totals()["done"] == 1
+
+def test_plan_registers_every_file_before_any_upload_starts(s3, tmp_path):
+    for i in range(8):
+        write(tmp_path / "batch" / f"f{i}.txt", 100)
+    uploader = S3Uploader(s3, max_workers=4)
+    seen = []
+
+    progress = uploader.plan([str(tmp_path / "batch")], BUCKET, on_change=lambda p: seen.append(set(p.files)))
+    assert set(progress.files) == {f"batch/f{i}.txt" for i in range(8)}
+    assert all(file["status"] == "pendiente" for file in progress.files.values())
+    assert wait(uploader.start(progress)) == [True] * 8
+    assert all(keys == set(progress.files) for keys in seen)
+
+def test_failing_progress_callback_does_not_fail_uploads(s3, tmp_path):
+    paths = [str(write(tmp_path / f"f{i}.txt", 100)) for i in range(8)]
+    uploader = S3Uploader(s3, max_workers=4)
+
+    def on_change(progress):
+        raise KeyError("f0.txt")
+
+    progress, futures = uploader.upload(paths, BUCKET, on_change=on_change)
+    assert wait(futures) == [True] * 8
+    assert all(file["status"] == "subido" for file in progress.files.values())
+
+class CountingClient:
+    """Cliente de S3 que cuenta las UploadPart y puede fallar a partir de una de ellas"""
+
+    def __init__(self, client, fail_after=None):
+        self.client = client
+        self.fail_after = fail_after
+        self.parts = []  # (upload_id, número de parte)
+        self.copies = 0
+
+    def upload_part(self, **kwargs):
+        if self.fail_after is not None and len(self.parts) >= self.fail_after:
+            raise ConnectionError("conexión perdida")
+        response = self.client.upload_part(**kwargs)
+        self.parts.append((kwargs["UploadId"], kwargs["PartNumber"]))
+        return response
+
+    def copy_object(self, **kwargs):
+        self.copies += 1
+        return self.client.copy_object(**kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+def test_unchanged_file_is_skipped(s3, tmp_path):
+    path = str(write(tmp_path / "fw.bin", 1000))
+    uploader = S3Uploader(s3, manifest=UploadManifest(str(tmp_path / "uploads.db")))
+
+    first, futures = uploader.upload([path], BUCKET)
+    wait(futures)
+    second, futures = uploader.upload([path], BUCKET)
+    wait(futures)
+    assert first.files["fw.bin"]["status"] == "subido"
+    assert second.files["fw.bin"]["status"] == "omitido"
+
+    # Solo cambia el mtime: se hashea, pero tampoco se sube
+    os.utime(path, ns=(1, 1))
+    third, futures = uploader.upload([path], BUCKET)
+    wait(futures)
+    assert third.files["fw.bin"]["status"] == "omitido"
+
+def test_same_content_under_a_new_key_is_copied_in_s3(s3, tmp_path):
+    path = str(write(tmp_path / "fw.bin", 1000))
+    client = CountingClient(s3)
+    uploader = S3Uploader(client, manifest=UploadManifest(str(tmp_path / "uploads.db")))
+
+    wait(uploader.upload([path], BUCKET, prefix="v1")[1])
+    progress, futures = uploader.upload([path], BUCKET, prefix="v2")
+    wait(futures)
+    assert progress.files["v2/fw.bin"]["status"] == "copiado"
+    assert client.copies == 1
+    original = s3.get_object(Bucket=BUCKET, Key="v1/fw.bin")["Body"].read()
+    assert s3.get_object(Bucket=BUCKET, Key="v2/fw.bin")["Body"].read() == original
+
+def test_interrupted_multipart_resumes_with_the_missing_parts(s3, tmp_path):
+    path = str(write(tmp_path / "image.bin", 16 * MB))  # 4 partes de 5 MB (la última de 1 MB)
+    manifest = UploadManifest(str(tmp_path / "uploads.db"))
+
+    failing = CountingClient(s3, fail_after=2)
+    uploader = S3Uploader(failing, max_workers=1, chunk_size=5 * MB, max_concurrency=1, manifest=manifest)
+    progress, futures = uploader.upload([path], BUCKET)
+    assert wait(futures) == [False]
+    assert progress.files["image.bin"]["status"] == "error"
+    assert [number for _, number in failing.parts] == [1, 2]
+    upload_id = manifest.get_multipart(BUCKET, "image.bin")["upload_id"]
+
+    healthy = CountingClient(s3)
+    uploader = S3Uploader(healthy, max_workers=1, chunk_size=5 * MB, max_concurrency=1, manifest=manifest)
+    progress, futures = uploader.upload([path], BUCKET)
+    assert wait(futures) == [True]
+    # Misma subida multiparte, solo las partes que faltaban
+    assert healthy.parts == [(upload_id, 3), (upload_id, 4)]
+    assert progress.totals()["sent"] == 16 * MB
+    assert manifest.get_multipart(BUCKET, "image.bin") is None
+    assert s3.get_object(Bucket=BUCKET, Key="image.bin")["Body"].read() == open(path, "rb").read()
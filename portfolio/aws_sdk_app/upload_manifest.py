@@ -0,0 +1,96 @@
+import hashlib
+import mmap
+import os
+import sqlite3
+import threading
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS uploads (
+    bucket TEXT NOT NULL,
+    key TEXT NOT NULL,
+    local_path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    PRIMARY KEY (bucket, key)
+);
+CREATE INDEX IF NOT EXISTS idx_uploads_hash ON uploads(bucket, sha256);
+CREATE TABLE IF NOT EXISTS multipart (
+    bucket TEXT NOT NULL,
+    key TEXT NOT NULL,
+    upload_id TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    part_size INTEGER NOT NULL,
+    PRIMARY KEY (bucket, key)
+);
+"""
+
+# 🔹 Hash SHA-256 leyendo el archivo por mmap, por bloques
+def file_hash(path, block_size=8 * 1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return digest.hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                # hashlib suelta el GIL con bloques grandes: varios hilos hashean en paralelo
+                for start in range(0, len(mm), block_size):
+                    digest.update(view[start:start + block_size])
+            finally:
+                view.release()
+    return digest.hexdigest()
+
+class UploadManifest:
+    """Registro local de lo ya subido: (ruta, tamaño, mtime, hash) -> clave, y multipartes a medias"""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def get(self, bucket, key):
+        """Registro de la clave: {"local_path", "size", "mtime_ns", "sha256"} o None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT local_path, size, mtime_ns, sha256 FROM uploads WHERE bucket = ? AND key = ?", (bucket, key)
+            ).fetchone()
+        return dict(zip(("local_path", "size", "mtime_ns", "sha256"), row)) if row else None
+
+    def find_hash(self, bucket, sha256):
+        """Una clave del bucket que ya tiene ese contenido, o None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT key FROM uploads WHERE bucket = ? AND sha256 = ? LIMIT 1", (bucket, sha256)
+            ).fetchone()
+        return row[0] if row else None
+
+    def record(self, bucket, key, local_path, size, mtime_ns, sha256):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO uploads (bucket, key, local_path, size, mtime_ns, sha256) VALUES (?, ?, ?, ?, ?, ?)",
+                (bucket, key, local_path, size, mtime_ns, sha256),
+            )
+            self._conn.execute("DELETE FROM multipart WHERE bucket = ? AND key = ?", (bucket, key))
+
+    def get_multipart(self, bucket, key):
+        """Subida multiparte sin terminar: {"upload_id", "size", "mtime_ns", "part_size"} o None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT upload_id, size, mtime_ns, part_size FROM multipart WHERE bucket = ? AND key = ?", (bucket, key)
+            ).fetchone()
+        return dict(zip(("upload_id", "size", "mtime_ns", "part_size"), row)) if row else None
+
+    def start_multipart(self, bucket, key, upload_id, size, mtime_ns, part_size):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO multipart (bucket, key, upload_id, size, mtime_ns, part_size) VALUES (?, ?, ?, ?, ?, ?)",
+                (bucket, key, upload_id, size, mtime_ns, part_size),
+            )
+
+    def drop_multipart(self, bucket, key):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM multipart WHERE bucket = ? AND key = ?", (bucket, key))
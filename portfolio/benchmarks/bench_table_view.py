@@ -0,0 +1,55 @@
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+# El paquete cleaning se importa desde la raíz de portfolio (como test.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import flet as ft
+from cleaning.table_view import DataFrameView
+
+# 🔹 Coste de mostrar un DataFrame de 1M x 20: tabla completa con iloc escalar (antes) vs página de DataFrameView
+ROWS = 1_000_000
+COLUMNS = 20
+SAMPLE_ROWS = 2_000  # La tabla completa se mide sobre una muestra y se extrapola
+
+def make_frame():
+    rng = np.random.default_rng(1)
+    data = {f"c{j}": rng.normal(size=ROWS) if j % 2 else rng.integers(0, 1000, size=ROWS) for j in range(COLUMNS - 1)}
+    data["label"] = pd.Series(rng.integers(0, 50, size=ROWS)).map(lambda i: f"sensor-{i}")
+    return pd.DataFrame(data)
+
+def build_full_table(dataframe):
+    """update_dataframe_view anterior: un DataRow y un Text por celda con dataframe.iloc[i, j]"""
+    return ft.DataTable(
+        columns=[ft.DataColumn(ft.Text(col)) for col in dataframe.columns],
+        rows=[
+            ft.DataRow(
+                cells=[ft.DataCell(ft.Text(str(dataframe.iloc[i, j]))) for j in range(dataframe.shape[1])]
+            ) for i in range(dataframe.shape[0])
+        ]
+    )
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+if __name__ == "__main__":
+    frame = make_frame()
+
+    table, ms = timed(build_full_table, frame.iloc[:SAMPLE_ROWS])
+    print(f"{'antes: tabla completa':<34} {ms:>9.1f} ms para {SAMPLE_ROWS:,} filas "
+          f"-> ~{ms * ROWS / SAMPLE_ROWS / 1000:,.0f} s y {2 * ROWS * COLUMNS + ROWS:,} controles para {ROWS:,}")
+
+    view = DataFrameView(page_size=50)
+    _, ms = timed(view.set_frame, frame)
+    print(f"{'DataFrameView.set_frame':<34} {ms:>9.2f} ms")
+    for label, page_index in (("primera", 0), ("mitad", view.pages // 2), ("última", view.pages - 1)):
+        _, ms = timed(view.go_to, page_index)
+        print(f"{'DataFrameView.go_to página ' + label:<34} {ms:>9.2f} ms")
+    controls = len(view.table.rows) * (1 + 2 * COLUMNS)
+    print(f"{'controles de la tabla visible':<34} {controls:>9,}")
+    print(view.header.value)
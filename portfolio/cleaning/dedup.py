@@ -0,0 +1,156 @@
+import itertools
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from cleaning.transforms import CACHE_DIR, TransformPipeline, source_origin
+
+RECORD = np.dtype([("hash", "<u8"), ("row", "<i8")])
+
+# 🔹 Hash de cada fila, estable entre chunks
+def row_hashes(chunk):
+    # Un mismo valor puede leerse como int en un chunk y float en otro (o como texto): se unifica
+    normalized = pd.DataFrame({
+        col: chunk[col].astype("float64") if pd.api.types.is_numeric_dtype(chunk[col]) else chunk[col].astype(str)
+        for col in chunk.columns
+    })
+    return pd.util.hash_pandas_object(normalized, index=False).to_numpy(dtype=np.uint64)
+
+class HashPartitions:
+    """(hash, fila) repartidos por los bits altos del hash; se vuelcan a disco al pasar memory_budget"""
+
+    def __init__(self, directory, partitions=64, memory_budget=256 * 1024 * 1024):
+        self.directory = directory
+        self.partitions = partitions
+        self.memory_budget = memory_budget
+        self._shift = np.uint64(64 - int(np.log2(partitions)))
+        self._buffers = [[] for _ in range(partitions)]
+        self._in_memory = 0
+        self.spills = 0
+
+    def add(self, hashes, rows):
+        records = np.empty(len(hashes), dtype=RECORD)
+        records["hash"] = hashes
+        records["row"] = rows
+        part = (hashes >> self._shift).astype(np.intp)
+        order = np.argsort(part, kind="stable")
+        bounds = np.searchsorted(part[order], np.arange(self.partitions + 1))
+        records = records[order]
+        for p in range(self.partitions):
+            if bounds[p] < bounds[p + 1]:
+                self._buffers[p].append(records[bounds[p]:bounds[p + 1]])
+        self._in_memory += records.nbytes
+        if self._in_memory > self.memory_budget:
+            self.spill()
+
+    def spill(self):
+        """Agregar los buffers en memoria al archivo de cada partición"""
+        for p, buffers in enumerate(self._buffers):
+            if buffers:
+                with open(self._path(p), "ab") as f:
+                    for records in buffers:
+                        records.tofile(f)
+                buffers.clear()
+        self._in_memory = 0
+        self.spills += 1
+
+    def duplicate_rows(self):
+        """Filas repetidas (todas salvo la primera aparición de cada hash), partición por partición"""
+        for p in range(self.partitions):
+            parts = list(self._buffers[p])
+            if os.path.exists(self._path(p)):
+                parts.insert(0, np.fromfile(self._path(p), dtype=RECORD))
+            if not parts:
+                continue
+            records = np.concatenate(parts)
+            order = np.lexsort((records["row"], records["hash"]))
+            hashes = records["hash"][order]
+            rows = records["row"][order]
+            yield rows[1:][hashes[1:] == hashes[:-1]]
+
+    def _path(self, p):
+        return os.path.join(self.directory, f"part-{p:03d}.bin")
+
+# 🔹 Limpieza en streaming: los pasos del plan en su orden, directo al CSV de salida
+def clean_to_csv(source, output_path, steps, chunksize=100_000, memory_budget=256 * 1024 * 1024,
+                 on_progress=None, cache_dir=CACHE_DIR):
+    """Aplicar los pasos (remove_nulls, remove_duplicates, normalize, encode) en el orden dado.
+
+    Los pasos con estado se preparan con una pasada sobre la salida de los anteriores: duplicados
+    con hashes particionados, normalizar/codificar con partial_fit (o el ajuste ya guardado para
+    este archivo y estos pasos previos). La última pasada filtra, transforma y escribe cada chunk.
+    """
+    stats = {"rows_in": 0, "rows_out": 0, "nulls": 0, "duplicates": 0, "spills": 0}
+    stages = []  # (paso, estado ya preparado)
+    for i, step in enumerate(steps):
+        if step == "remove_nulls":
+            stages.append((step, None))
+        elif step == "remove_duplicates":
+            stages.append((step, find_duplicates(staged_chunks(source, stages, chunksize, on_progress), memory_budget, stats)))
+        elif step in ("normalize", "encode"):
+            chunks = staged_chunks(source, stages, chunksize, on_progress)
+            first = next(chunks, None)
+            if first is None:
+                continue  # Archivo vacío
+            pipeline = TransformPipeline.load_or_create(
+                first, source_origin(source.path, steps[:i]), normalize=step == "normalize",
+                encode=step == "encode", cache_dir=cache_dir,
+            )
+            if pipeline.fitted:
+                chunks.close()
+            else:
+                pipeline.fit(itertools.chain([first], chunks))
+                pipeline.save(cache_dir)
+            stages.append((step, pipeline))
+        else:
+            raise ValueError(f"Paso desconocido: {step}")
+
+    with open(output_path, "w", newline="", encoding="utf-8") as f:
+        for i, chunk in enumerate(staged_chunks(source, stages, chunksize, on_progress, stats)):
+            chunk.to_csv(f, header=(i == 0), index=False)
+    return stats
+
+def staged_chunks(source, stages, chunksize, on_progress=None, stats=None):
+    """Chunks del archivo con los pasos ya preparados aplicados; el índice es la fila en el archivo"""
+    offset = 0
+    for chunk in source.chunks(chunksize, on_progress):
+        chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+        offset += len(chunk)
+        if stats is not None:
+            stats["rows_in"] += len(chunk)
+        for step, state in stages:
+            if step == "remove_nulls":
+                keep = chunk.notna().all(axis=1).to_numpy()
+                if stats is not None:
+                    stats["nulls"] += int((~keep).sum())
+                chunk = chunk[keep]
+            elif step == "remove_duplicates":
+                rows = chunk.index.to_numpy()
+                duplicated = np.zeros(len(rows), dtype=bool)
+                inside = rows < len(state)
+                duplicated[inside] = state[rows[inside]]
+                if stats is not None:
+                    stats["duplicates"] += int(duplicated.sum())
+                chunk = chunk[~duplicated]
+            else:
+                chunk = state.transform(chunk)
+        if stats is not None:
+            stats["rows_out"] += len(chunk)
+        yield chunk
+
+def find_duplicates(chunks, memory_budget=256 * 1024 * 1024, stats=None):
+    """Un bool por fila del archivo: True en las repetidas (todas salvo la primera aparición)"""
+    with tempfile.TemporaryDirectory(prefix="dedup-") as directory:
+        partitions = HashPartitions(directory, memory_budget=memory_budget)
+        rows_seen = 0
+        for chunk in chunks:
+            if len(chunk):
+                rows = chunk.index.to_numpy()
+                partitions.add(row_hashes(chunk), rows)
+                rows_seen = max(rows_seen, int(rows.max()) + 1)
+        duplicates = np.zeros(rows_seen, dtype=bool)
+        for rows in partitions.duplicate_rows():
+            duplicates[rows] = True
+        if stats is not None:
+            stats["spills"] += partitions.spills
+    return duplicates
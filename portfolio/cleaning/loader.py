@@ -0,0 +1,72 @@
+import csv
+import os
+import pandas as pd
+
+# pyarrow es opcional: solo acelera la lectura completa (su motor no lee por chunks)
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+SAMPLE_BYTES = 64 * 1024
+DELIMITERS = ",;\t|"
+
+# 🔹 Detectar codificación y separador con una muestra pequeña del archivo
+def sniff(path, sample_bytes=SAMPLE_BYTES):
+    with open(path, "rb") as f:
+        sample = f.read(sample_bytes)
+    encoding = "latin1"
+    for candidate in ("utf-8-sig", "utf-8"):
+        try:
+            text = sample.decode(candidate)
+        except UnicodeDecodeError as e:
+            # Solo se tolera un carácter multibyte cortado por el límite de la muestra
+            if len(sample) < sample_bytes or e.reason != "unexpected end of data" or e.start < len(sample) - 3:
+                continue
+            text = sample[:e.start].decode(candidate)
+        encoding = candidate
+        break
+    else:
+        text = sample.decode(encoding)
+
+    # Solo líneas completas para el sniffer
+    lines = text.splitlines()[:-1] if len(sample) == sample_bytes else text.splitlines()
+    try:
+        sep = csv.Sniffer().sniff("\n".join(lines[:200]), delimiters=DELIMITERS).delimiter
+    except csv.Error:
+        sep = ","
+    return encoding, sep
+
+class CsvSource:
+    """CSV leído con el motor C (o pyarrow) tras detectar una sola vez codificación y separador"""
+
+    def __init__(self, path):
+        self.path = path
+        self.size = os.path.getsize(path)
+        self.encoding, self.sep = sniff(path)
+
+    def chunks(self, chunksize=100_000, on_progress=None, nrows=None):
+        """Iterar el archivo en DataFrames de chunksize filas; on_progress(filas, bytes leídos, bytes totales)"""
+        rows = 0
+        with open(self.path, "rb") as f:
+            reader = pd.read_csv(
+                f, sep=self.sep, encoding=self.encoding, engine="c",
+                on_bad_lines="skip", chunksize=chunksize, nrows=nrows, low_memory=False,
+            )
+            with reader:
+                for chunk in reader:
+                    rows += len(chunk)
+                    if on_progress:
+                        # El parser lee por bloques: la posición del archivo es un progreso aproximado
+                        on_progress(rows, min(f.tell(), self.size), self.size)
+                    yield chunk
+
+    def read(self, chunksize=100_000, on_progress=None, nrows=None):
+        """Cargar el archivo (o sus primeras nrows filas) en memoria"""
+        if HAS_PYARROW and nrows is None and on_progress is None:
+            return pd.read_csv(self.path, sep=self.sep, encoding=self.encoding, engine="pyarrow", on_bad_lines="skip")
+        chunks = list(self.chunks(chunksize, on_progress, nrows))
+        if not chunks:
+            return pd.read_csv(self.path, sep=self.sep, encoding=self.encoding, nrows=0)
+        return pd.concat(chunks, ignore_index=True)
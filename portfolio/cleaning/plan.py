@@ -0,0 +1,87 @@
+from collections import OrderedDict
+from cleaning.transforms import TransformPipeline
+
+# 🔹 Operaciones disponibles: nombre -> (etiqueta, función sobre un DataFrame)
+OPERATIONS = {
+    "remove_nulls": ("Eliminar nulos", lambda frame: frame.dropna()),
+    "remove_duplicates": ("Eliminar duplicados", lambda frame: frame.drop_duplicates()),
+    "normalize": ("Normalizar", lambda frame: TransformPipeline(frame, normalize=True, encode=False).fit([frame]).transform(frame)),
+    "encode": ("Codificar", lambda frame: TransformPipeline(frame, normalize=False, encode=True).fit([frame]).transform(frame)),
+}
+
+class OperationPlan:
+    """Lista de operaciones que se ejecuta solo al pedir el resultado.
+
+    Cada resultado intermedio se guarda con el prefijo de operaciones que lo produjo como clave, así
+    deshacer, rehacer o reordenar solo recalcula desde el primer paso que cambió.
+    """
+
+    def __init__(self, base, max_cached=16):
+        self.base = base  # Frame sobre el que se evalúa el plan (la vista previa)
+        self.ops = []
+        self._redo = []
+        self._cache = OrderedDict()  # tuple(prefijo de ops) -> DataFrame, en orden LRU
+        self.max_cached = max_cached
+
+    def add(self, op):
+        if op not in OPERATIONS:
+            raise ValueError(f"Operación desconocida: {op}")
+        self.ops.append(op)
+        self._redo.clear()
+
+    def undo(self):
+        if self.ops:
+            self._redo.append(self.ops.pop())
+
+    def redo(self):
+        if self._redo:
+            self.ops.append(self._redo.pop())
+
+    def move(self, index, offset):
+        """Mover el paso `index` a `index + offset`"""
+        target = index + offset
+        if 0 <= index < len(self.ops) and 0 <= target < len(self.ops):
+            self.ops.insert(target, self.ops.pop(index))
+            self._redo.clear()
+
+    def remove(self, index):
+        if 0 <= index < len(self.ops):
+            del self.ops[index]
+            self._redo.clear()
+
+    def can_undo(self):
+        return bool(self.ops)
+
+    def can_redo(self):
+        return bool(self._redo)
+
+    def labels(self):
+        return [OPERATIONS[op][0] for op in self.ops]
+
+    def result(self):
+        """Plan evaluado sobre la vista previa, partiendo del prefijo más largo ya calculado"""
+        ops = tuple(self.ops)
+        start, frame = 0, self.base
+        for end in range(len(ops), 0, -1):
+            if ops[:end] in self._cache:
+                start, frame = end, self._cache[ops[:end]]
+                self._cache.move_to_end(ops[:end])
+                break
+        for end in range(start + 1, len(ops) + 1):
+            frame = OPERATIONS[ops[end - 1]][1](frame)
+            self._remember(ops[:end], frame)
+        return frame
+
+    def run(self, frame):
+        """Plan completo sobre otro frame (el archivo entero al exportar)"""
+        if frame is self.base:
+            return self.result()
+        for op in self.ops:
+            frame = OPERATIONS[op][1](frame)
+        return frame
+
+    def _remember(self, key, frame):
+        self._cache[key] = frame
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_cached:
+            self._cache.popitem(last=False)
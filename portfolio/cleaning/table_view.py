@@ -0,0 +1,84 @@
+import math
+import flet as ft
+import pandas as pd
+
+class DataFrameView(ft.Column):
+    """Tabla paginada de un DataFrame: solo se crean controles para las filas de la página visible"""
+
+    def __init__(self, page_size=50, **kwargs):
+        super().__init__(**kwargs)
+        self.page_size = page_size
+        self.frame = None
+        self.page_index = 0
+        self._columns = None
+        self._rows = []  # DataRow reutilizadas al paginar
+        self._texts = []  # Los ft.Text de cada una de esas filas
+
+        self.header = ft.Text()
+        self.table = ft.DataTable(columns=[ft.DataColumn(ft.Text(""))], rows=[])
+        self.slider = ft.Slider(min=0, max=1, value=0, expand=True, on_change_end=self.on_slider)
+        self.controls = [
+            self.header,
+            ft.Row([
+                ft.IconButton(icon=ft.icons.FIRST_PAGE, on_click=lambda e: self.go_to(0)),
+                ft.IconButton(icon=ft.icons.CHEVRON_LEFT, on_click=lambda e: self.go_to(self.page_index - 1)),
+                self.slider,
+                ft.IconButton(icon=ft.icons.CHEVRON_RIGHT, on_click=lambda e: self.go_to(self.page_index + 1)),
+                ft.IconButton(icon=ft.icons.LAST_PAGE, on_click=lambda e: self.go_to(self.pages - 1)),
+            ]),
+            ft.Row([self.table], scroll=ft.ScrollMode.AUTO),
+        ]
+
+    @property
+    def pages(self):
+        return max(1, math.ceil(len(self.frame) / self.page_size)) if self.frame is not None else 1
+
+    def set_frame(self, frame: pd.DataFrame, keep_page=True):
+        """Mostrar otro DataFrame; no se recorre el frame, solo se corta la página visible"""
+        self.frame = frame
+        if not keep_page:
+            self.page_index = 0
+        columns = [str(col) for col in frame.columns]
+        if columns != self._columns:
+            self._columns = columns
+            self._rows = []
+            self._texts = []
+            self.table.columns = [ft.DataColumn(ft.Text(col)) for col in columns] or [ft.DataColumn(ft.Text(""))]
+        self.slider.max = max(1, self.pages - 1)
+        self.slider.divisions = self.pages - 1 if 1 < self.pages <= 1000 else None
+        self.go_to(self.page_index)
+
+    def go_to(self, page_index):
+        if self.frame is None:
+            return
+        self.page_index = min(max(0, int(page_index)), self.pages - 1)
+        self.render()
+
+    def on_slider(self, e):
+        self.go_to(round(float(e.control.value)))
+
+    def render(self):
+        """Coste O(tamaño de página): texto vectorizado de la página y controles reutilizados"""
+        start = self.page_index * self.page_size
+        page = self.frame.iloc[start:start + self.page_size]
+        values = page.astype(str).to_numpy()
+        n_columns = len(self._columns)
+
+        # Crear solo las filas que faltan; las existentes se reutilizan cambiando el texto
+        while len(self._rows) < len(values):
+            texts = [ft.Text() for _ in range(n_columns)]
+            self._texts.append(texts)
+            self._rows.append(ft.DataRow(cells=[ft.DataCell(text) for text in texts]))
+        for texts, row in zip(self._texts, values):
+            for text, value in zip(texts, row):
+                text.value = value
+        self.table.rows = self._rows[:len(values)] if n_columns else []
+
+        end = start + len(values)
+        self.header.value = (
+            f"Filas {start + 1:,}-{end:,} de {len(self.frame):,} · {n_columns} columnas · "
+            f"página {self.page_index + 1:,}/{self.pages:,}"
+        ) if len(self.frame) else f"0 filas · {n_columns} columnas"
+        self.slider.value = self.page_index
+        if self.page:
+            self.update()
@@ -0,0 +1,132 @@
+import hashlib
+import os
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+CACHE_DIR = os.path.expanduser("~/.cache/data_cleaning")
+
+# 🔹 Columnas numéricas y categóricas según los tipos de un chunk
+def numeric_columns(frame):
+    return [col for col in frame.columns
+            if pd.api.types.is_numeric_dtype(frame[col]) and not pd.api.types.is_bool_dtype(frame[col])]
+
+def categorical_columns(frame):
+    return [col for col in frame.columns
+            if pd.api.types.is_object_dtype(frame[col]) or pd.api.types.is_string_dtype(frame[col])
+            or isinstance(frame[col].dtype, pd.CategoricalDtype)]
+
+def schema_key(frame, steps, origin=None):
+    """Identificador del esquema (columnas y tipos), de los pasos y del origen de los datos"""
+    schema = [(str(col), str(dtype)) for col, dtype in frame.dtypes.items()]
+    return hashlib.sha256(repr((schema, sorted(steps), origin)).encode()).hexdigest()[:16]
+
+def source_origin(path, upstream=()):
+    """Origen de un ajuste: el archivo (ruta, tamaño y mtime) y los pasos aplicados antes"""
+    stat = os.stat(path)
+    return (os.path.abspath(path), stat.st_size, stat.st_mtime_ns, tuple(upstream))
+
+class StreamingScaler:
+    """StandardScaler por columna ajustado con partial_fit chunk a chunk"""
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.scalers = {col: StandardScaler() for col in self.columns}
+
+    def partial_fit_column(self, col, chunk):
+        values = pd.to_numeric(chunk[col], errors="coerce").to_numpy(dtype=np.float64).reshape(-1, 1)
+        self.scalers[col].partial_fit(values)  # Los NaN se ignoran en las estadísticas
+
+    def transform_column(self, col, chunk):
+        values = pd.to_numeric(chunk[col], errors="coerce").to_numpy(dtype=np.float64).reshape(-1, 1)
+        return self.scalers[col].transform(values).ravel()
+
+class StreamingEncoder:
+    """Vocabulario por columna construido chunk a chunk; las categorías no vistas se codifican como -1"""
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.vocabularies = {col: {} for col in self.columns}  # valor -> código, en orden de aparición
+        self._indexes = {}
+
+    def partial_fit_column(self, col, chunk):
+        vocabulary = self.vocabularies[col]
+        for value in pd.unique(chunk[col].dropna().astype(str)):
+            if value not in vocabulary:
+                vocabulary[value] = len(vocabulary)
+        self._indexes.pop(col, None)
+
+    def transform_column(self, col, chunk):
+        index = self._indexes.get(col)
+        if index is None:
+            # get_indexer hace la búsqueda del chunk entero en una llamada vectorizada
+            index = self._indexes[col] = pd.Index(list(self.vocabularies[col]), dtype=object)
+        codes = index.get_indexer(chunk[col].astype(str))
+        codes[chunk[col].isna().to_numpy()] = -1
+        return codes
+
+    def __getstate__(self):
+        return {"columns": self.columns, "vocabularies": self.vocabularies, "_indexes": {}}
+
+class TransformPipeline:
+    """Normalización y codificación ajustadas en streaming, por columna y en paralelo"""
+
+    def __init__(self, frame, normalize=True, encode=True, max_workers=4, origin=None):
+        self.steps = [name for name, enabled in (("normalize", normalize), ("encode", encode)) if enabled]
+        self.origin = origin  # Sin origen (p. ej. un DataFrame en memoria) el ajuste no se guarda
+        self.key = schema_key(frame, self.steps, origin)
+        self.stages = []
+        if normalize:
+            self.stages.append(StreamingScaler(numeric_columns(frame)))
+        if encode:
+            self.stages.append(StreamingEncoder(categorical_columns(frame)))
+        self.max_workers = max_workers
+        self.fitted = False
+
+    def _tasks(self):
+        return [(stage, col) for stage in self.stages for col in stage.columns]
+
+    def partial_fit(self, chunk):
+        if not len(chunk):
+            return  # Chunk vaciado por los filtros anteriores
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            list(executor.map(lambda task: task[0].partial_fit_column(task[1], chunk), self._tasks()))
+
+    def fit(self, chunks):
+        for chunk in chunks:
+            self.partial_fit(chunk)
+        self.fitted = True
+        return self
+
+    def transform(self, chunk):
+        if not len(chunk):
+            return chunk
+        tasks = self._tasks()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = list(executor.map(lambda task: task[0].transform_column(task[1], chunk), tasks))
+        chunk = chunk.copy()
+        for (_, col), values in zip(tasks, results):
+            chunk[col] = values
+        return chunk
+
+    def save(self, cache_dir=CACHE_DIR):
+        if self.origin is None:
+            return
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(os.path.join(cache_dir, f"pipeline-{self.key}.pkl"), "wb") as f:
+            pickle.dump(self, f)
+
+    @classmethod
+    def load_or_create(cls, frame, origin, normalize=True, encode=True, cache_dir=CACHE_DIR):
+        """Pipeline ya ajustado con el mismo archivo sin cambios y los mismos pasos previos; si no, uno nuevo"""
+        pipeline = cls(frame, normalize, encode, origin=origin)
+        path = os.path.join(cache_dir, f"pipeline-{pipeline.key}.pkl")
+        if os.path.exists(path):
+            try:
+                with open(path, "rb") as f:
+                    return pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError, AttributeError) as e:
+                print(f"❌ Error al cargar el pipeline guardado: {e}")
+        return pipeline
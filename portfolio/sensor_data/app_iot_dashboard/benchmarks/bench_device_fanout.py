@@ -0,0 +1,79 @@
+import json
+import os
+import sys
+import time
+
+# Los módulos de la app se importan desde su raíz (como al ejecutar main.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MQTT_ASYNC", "1")
+
+import paho.mqtt.client as mqtt
+from utils.async_mqtt_manager import AsyncMQTTManager
+from utils.device_fanout import DeviceFanout
+
+# 🔹 Widgets actualizados por segundo: un mensaje escalar por clave (antes) vs un mensaje de estado por dispositivo
+DEVICES = 100
+KEYS = 16
+ROUNDS = 200
+
+class Widget:
+    """Lo que hace un VUMeterWidget al recibir un valor"""
+
+    def __init__(self):
+        self.value = None
+
+    def set_value(self, value):
+        self.value = float(value) / 100
+
+def make_message(topic, payload):
+    message = mqtt.MQTTMessage(topic=topic.encode())
+    message.payload = payload
+    return message
+
+def run(manager, messages, widgets):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for message in messages:
+            manager.on_message(None, None, message)
+    elapsed = time.perf_counter() - start
+    assert all(widget.value is not None for widget in widgets)
+    return len(widgets) * ROUNDS / elapsed, len(messages) * ROUNDS / elapsed
+
+def bench_per_key():
+    """Antes: cada widget escucha iot/{device_id}/{key} y el dispositivo publica un mensaje por clave"""
+    manager = AsyncMQTTManager(host="127.0.0.1")
+    widgets = []
+    messages = []
+    for d in range(DEVICES):
+        for k in range(KEYS):
+            widget = Widget()
+            widgets.append(widget)
+            manager.subscribe(f"iot/esp32-{d}/k{k}", lambda topic, payload, w=widget: w.set_value(payload))
+            messages.append(make_message(f"iot/esp32-{d}/k{k}", f"{k}.5".encode()))
+    return run(manager, messages, widgets)
+
+def bench_fanout():
+    """Ahora: un mensaje JSON iot/{device_id}/state con todas las claves, decodificado una vez"""
+    manager = AsyncMQTTManager(host="127.0.0.1")
+    fanout = DeviceFanout(mqtt=manager)
+    widgets = []
+    messages = []
+    for d in range(DEVICES):
+        for k in range(KEYS):
+            widget = Widget()
+            widgets.append(widget)
+            fanout.bind(f"esp32-{d}", f"k{k}", widget.set_value)
+        state = {f"k{k}": k + 0.5 for k in range(KEYS)}
+        state["firmware"] = "1.4.2"
+        messages.append(make_message(f"iot/esp32-{d}/state", json.dumps(state).encode()))
+    rates = run(manager, messages, widgets)
+    assert fanout.callback_errors == 0
+    return rates
+
+def report(label, rates):
+    widgets, messages = rates
+    print(f"{label:<36} {widgets:>12,.0f} widgets/s {messages:>12,.0f} mensajes/s")
+
+if __name__ == "__main__":
+    report("un mensaje por clave (antes)", bench_per_key())
+    report("estado por dispositivo (fan-out)", bench_fanout())
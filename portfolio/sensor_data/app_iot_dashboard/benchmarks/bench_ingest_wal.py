@@ -0,0 +1,50 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Los módulos de la app se importan desde su raíz (como al ejecutar main.py); WAL y archivo van a un directorio temporal
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+TMP = tempfile.mkdtemp()
+os.environ.setdefault("MQTT_ASYNC", "1")
+os.environ["TELEMETRY_ARCHIVE_DIR"] = os.path.join(TMP, "telemetry")
+os.environ["INGEST_WAL_DIR"] = os.path.join(TMP, "wal")
+
+from utils.ingest_wal import IngestWAL
+from utils.telemetry_archive import TelemetryArchive
+
+# 🔹 Muestras/s sostenidas por put() hasta el archivo de telemetría: max_group=1 (sin group commit) vs group commit
+DEVICES = 200
+KEYS = 4
+
+def samples(n):
+    now = time.time()
+    return [(f"esp32-{i % DEVICES}", f"k{i // DEVICES % KEYS}", float(i), now + i / 1e6) for i in range(n)]
+
+def make_wal(name, **kwargs):
+    archive = TelemetryArchive(directory=os.path.join(TMP, name, "telemetry"))
+    return IngestWAL(sink=archive, directory=os.path.join(TMP, name, "wal"), **kwargs)
+
+def bench(name, n, fsync, **kwargs):
+    """Un productor (el hilo de MQTT) hace put() y el hilo del WAL escribe; muestras/s hasta vaciar la cola"""
+    wal = make_wal(name, fsync=fsync, max_pending=n, **kwargs)
+    wal.start()
+    batch = samples(n)
+    start = time.perf_counter()
+    producer = threading.Thread(target=lambda: [wal.put(*sample) for sample in batch])
+    producer.start()
+    producer.join()
+    while wal.samples + wal.dropped < n:
+        time.sleep(0.001)
+    return n / (time.perf_counter() - start), wal
+
+def report(label, rate, wal):
+    print(f"{label:<36} {rate:>12,.0f} muestras/s  grupos={wal.groups:<6} descartadas={wal.dropped}")
+
+if __name__ == "__main__":
+    for fsync in (True, False):
+        suffix = "fsync" if fsync else "sin fsync"
+        # Sin group commit: cada muestra es su propio grupo (un write, un fsync y un append al archivo)
+        report(f"una muestra por commit ({suffix})", *bench(f"single-{fsync}", 2_000 if fsync else 50_000, fsync, group_size=1, max_group=1))
+        report(f"group commit ({suffix})", *bench(f"group-{fsync}", 500_000, fsync))
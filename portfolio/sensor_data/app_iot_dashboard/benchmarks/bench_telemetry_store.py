@@ -0,0 +1,62 @@
+import os
+import random
+import sys
+import time
+
+# Los módulos de la app se importan desde su raíz (como al ejecutar main.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MQTT_ASYNC", "1")
+
+import paho.mqtt.client as mqtt
+from utils.async_mqtt_manager import AsyncMQTTManager
+from utils.telemetry_store import TelemetryStore
+
+# 🔹 Muestras/s que ingiere TelemetryStore: append directo y detrás de on_message del gestor MQTT
+DEVICES = 500
+KEYS = 4
+SAMPLES = 500_000
+
+def report(label, count, elapsed):
+    print(f"{label:<50} {count / elapsed:>12,.0f} muestras/s")
+
+def bench_append():
+    store = TelemetryStore(capacity=4096, max_bytes=256 * 1024 * 1024)
+    rng = random.Random(1)
+    series = [(f"esp32-{rng.randrange(DEVICES)}", f"k{rng.randrange(KEYS)}") for _ in range(SAMPLES)]
+    now = time.time()
+    start = time.perf_counter()
+    for i, (device_id, key) in enumerate(series):
+        store.append(device_id, key, 21.5, now + i)
+    report("TelemetryStore.append", SAMPLES, time.perf_counter() - start)
+
+def bench_mqtt_ingest():
+    store = TelemetryStore(capacity=4096, max_bytes=256 * 1024 * 1024)
+    manager = AsyncMQTTManager(host="127.0.0.1")
+    manager.subscribe("iot/+/+", lambda topic, payload: None)  # Un widget comodín mantiene vivos los tópicos
+    manager.add_message_listener(store.on_mqtt_message)
+    rng = random.Random(1)
+    messages = []
+    for _ in range(SAMPLES):
+        message = mqtt.MQTTMessage(topic=f"iot/esp32-{rng.randrange(DEVICES)}/k{rng.randrange(KEYS)}".encode())
+        message.payload = b"21.5"
+        messages.append(message)
+    start = time.perf_counter()
+    for message in messages:
+        manager.on_message(None, None, message)
+    report("MQTT on_message -> TelemetryStore.on_mqtt_message", SAMPLES, time.perf_counter() - start)
+    assert sum(store.window(*series)[0].size for series in store.series()) == min(SAMPLES, DEVICES * KEYS * 4096)
+
+def bench_window():
+    store = TelemetryStore(capacity=100_000, max_bytes=256 * 1024 * 1024)
+    store.extend("esp32-0", "temp", range(100_000), range(100_000))
+    start = time.perf_counter()
+    for i in range(10_000):
+        ts, values = store.window("esp32-0", "temp", i, i + 50_000)
+    elapsed = time.perf_counter() - start
+    assert values.base is not None and len(values) == 50_001  # Vista, sin copia
+    print(f"{'window() de 50k muestras (vista sin copia)':<50} {elapsed / 10_000 * 1e6:>12.1f} µs/llamada")
+
+if __name__ == "__main__":
+    bench_append()
+    bench_mqtt_ingest()
+    bench_window()
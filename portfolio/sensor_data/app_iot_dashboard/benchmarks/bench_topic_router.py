@@ -0,0 +1,79 @@
+import contextlib
+import os
+import random
+import sys
+import time
+
+# Los módulos de la app se importan desde su raíz (como al ejecutar main.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MQTT_ASYNC", "1")
+
+import paho.mqtt.client as mqtt
+from paho.mqtt.matcher import MQTTMatcher
+from utils.async_mqtt_manager import AsyncMQTTManager
+from utils.topic_router import TopicRouter
+
+# 🔹 Mensajes/s enrutados con 10k tópicos suscritos: on_message anterior (print + message_callback_add) vs TopicRouter
+TOPICS = 10_000
+MESSAGES = 200_000
+
+def make_message(topic, payload):
+    message = mqtt.MQTTMessage(topic=topic.encode())
+    message.payload = payload
+    return message
+
+def sample_messages():
+    rng = random.Random(1)
+    # 90 % a tópicos con widget, 10 % a tópicos sin suscriptores
+    topics = [f"iot/esp32-{rng.randrange(TOPICS)}/temp" if rng.random() < 0.9 else f"iot/esp32-{rng.randrange(TOPICS)}/debug"
+              for _ in range(MESSAGES)]
+    return [make_message(topic, b"21.5") for topic in topics]
+
+def rate(handler, messages):
+    start = time.perf_counter()
+    for message in messages:
+        handler(message)
+    return len(messages) / (time.perf_counter() - start)
+
+def report(label, value):
+    print(f"{label:<45} {value:>12,.0f} msg/s")
+    return value
+
+def bench_baseline(messages, delivered):
+    """Camino anterior: iot/# + print del payload + callbacks de paho por filtro (MQTTMatcher)"""
+    matcher = MQTTMatcher()
+    for i in range(TOPICS):
+        matcher[f"iot/esp32-{i}/temp"] = lambda topic, payload: delivered.append(1)
+
+    def on_message(message):
+        print(f"Mensaje recibido en {message.topic}: {message.payload.decode()}")
+        for callback in matcher.iter_match(message.topic):
+            callback(message.topic, message.payload)
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        value = rate(on_message, messages)
+    return report("anterior (print a /dev/null + MQTTMatcher)", value)
+
+def bench_router(messages, delivered):
+    manager = AsyncMQTTManager(host="127.0.0.1")
+    for i in range(TOPICS):
+        manager.subscribe(f"iot/esp32-{i}/temp", lambda topic, payload: delivered.append(1))
+    on_message = lambda message: manager.on_message(None, None, message)
+    return report("TopicRouter (on_message del gestor)", rate(on_message, messages))
+
+def bench_match_cold():
+    router = TopicRouter()
+    for i in range(TOPICS):
+        router.add(f"iot/esp32-{i}/temp", print)
+    router.add("iot/+/status", print)
+    topics = [f"iot/esp32-{i}/temp" for i in range(TOPICS)]
+    report("TopicRouter.match, primer mensaje por tópico", rate(router.match, topics))
+
+if __name__ == "__main__":
+    messages = sample_messages()
+    baseline, routed = [], []
+    before = bench_baseline(messages, baseline)
+    after = bench_router(messages, routed)
+    bench_match_cold()
+    assert len(baseline) == len(routed)
+    print(f"Entregas: {len(routed):,}; mejora x{after / before:.1f}")
@@ -12,6 +12,41 @@ DYNAMODB_TABLE = os.getenv("DYNAMODB_TABLE")
 MQTT_USERNAME = os.getenv("MQTT_USERNAME")
 MQTT_PASSWORD = os.getenv("MQTT_PASSWORD")
 
+# Usar el gestor MQTT sobre asyncio en lugar del hilo de paho
+MQTT_ASYNC = os.getenv("MQTT_ASYNC", "0") == "1"
+
+# Codec de payload por filtro de tópico: "filtro=codec;..." (float, json, cbor, msgpack, struct:..., dtype:...)
+MQTT_CODECS = os.getenv("MQTT_CODECS", "iot/+/state=json")
+
+# Tópico de estado por dispositivo: un mensaje con todas sus claves
+DEVICE_STATE_TOPIC = os.getenv("DEVICE_STATE_TOPIC", "iot/{device_id}/state")
+
+# Comandos hacia los dispositivos: tópico, QoS, comandos en vuelo y segundos de espera del PUBACK
+COMMAND_TOPIC = os.getenv("COMMAND_TOPIC", "iot/{device_id}/cmd/{key}")
+COMMAND_QOS = int(os.getenv("COMMAND_QOS", "1"))
+COMMAND_WINDOW = int(os.getenv("COMMAND_WINDOW", "16"))
+COMMAND_TIMEOUT_S = float(os.getenv("COMMAND_TIMEOUT_S", "10"))
+
+# Frecuencia máxima de refresco de la UI (frames por segundo)
+UI_FPS = int(os.getenv("UI_FPS", "20"))
+
+# Historial de telemetría en memoria: muestras por serie y límite total en MB
+TELEMETRY_CAPACITY = int(os.getenv("TELEMETRY_CAPACITY", "3600"))
+TELEMETRY_MAX_MB = int(os.getenv("TELEMETRY_MAX_MB", "256"))
+
+# Historial de telemetría en disco: carpeta, muestras por chunk y segundos entre escrituras
+TELEMETRY_ARCHIVE_DIR = os.getenv("TELEMETRY_ARCHIVE_DIR", os.path.expanduser("~/.config/iot_dashboard/telemetry"))
+TELEMETRY_CHUNK_SIZE = int(os.getenv("TELEMETRY_CHUNK_SIZE", "4096"))
+TELEMETRY_FLUSH_S = float(os.getenv("TELEMETRY_FLUSH_S", "60"))
+
+# Write-ahead log de la ingesta: muestras o milisegundos por grupo, tope de muestras por grupo (0 = sin tope), cola máxima y fsync
+INGEST_WAL_DIR = os.getenv("INGEST_WAL_DIR", os.path.expanduser("~/.config/iot_dashboard/wal"))
+INGEST_GROUP_SIZE = int(os.getenv("INGEST_GROUP_SIZE", "1000"))
+INGEST_GROUP_MS = int(os.getenv("INGEST_GROUP_MS", "50"))
+INGEST_MAX_GROUP = int(os.getenv("INGEST_MAX_GROUP", "0"))
+INGEST_MAX_PENDING = int(os.getenv("INGEST_MAX_PENDING", "100000"))
+INGEST_FSYNC = os.getenv("INGEST_FSYNC", "1") == "1"
+
 # Depuración (puedes desactivar esto en producción)
 print(f"AWS IoT Endpoint: {AWS_IOT_ENDPOINT}")
 print(f"DynamoDB Table: {DYNAMODB_TABLE}")
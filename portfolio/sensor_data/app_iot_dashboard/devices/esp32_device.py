@@ -1,17 +1,30 @@
 import flet as ft
 from devices.widgets.base_widget import BaseWidget
+from utils import data_manager
+from utils.device_fanout import device_fanout
 
 class Esp32Device(ft.Column):
-    def __init__(self, device_id):
+    def __init__(self, device_id, on_remove=None):
         super().__init__()
+        self.on_remove = on_remove
+        self.bind(device_id)
+
+    def bind(self, device_id):
+        """Asociar el control a un dispositivo; la lista virtualizada lo reutiliza para otro"""
+        for widget in getattr(self, "widgets", []):
+            self._unbind_widget(widget)
         self.device_id = device_id
         self.widgets = []
         self.controls = [self.build_device_ui()]
 
     def add_widget(self, widget):
         """Agregar un widget al ESP32"""
+        widget.device_id = self.device_id
         self.widgets.append(widget)
         self.controls.append(widget)
+        # Los widgets con on_device_value reciben su clave del tópico de estado del dispositivo
+        if hasattr(widget, "on_device_value"):
+            device_fanout.bind(self.device_id, widget.key, widget.on_device_value)
         self.update()
 
     def remove_widget(self, widget):
@@ -19,8 +32,15 @@ class Esp32Device(ft.Column):
         if widget in self.widgets:
             self.widgets.remove(widget)
             self.controls.remove(widget)
+            self._unbind_widget(widget)
             self.update()
 
+    def _unbind_widget(self, widget):
+        """Soltar todo lo que mantiene vivo al widget: fan-out, consultas a DynamoDB y suscripciones MQTT"""
+        if hasattr(widget, "on_device_value"):
+            device_fanout.unbind(self.device_id, widget.key, widget.on_device_value)
+        if isinstance(widget, BaseWidget):
+            widget.dispose()
 
     def build_device_ui(self):
         """Construir la interfaz de un dispositivo"""
@@ -31,5 +51,11 @@ class Esp32Device(ft.Column):
 
     def remove_device(self, e):
         """Eliminar este dispositivo de la lista"""
-        self.controls.clear()
-        self.update()
+        data_manager.remove_device(self.device_id)
+        for widget in self.widgets:
+            self._unbind_widget(widget)
+        if self.on_remove:
+            self.on_remove(self.device_id)
+        else:
+            self.controls.clear()
+            self.update()
@@ -5,6 +5,7 @@ class BaseWidget(ft.Row):
         super().__init__()
         self.name = name
         self.key = key
+        self.device_id = None  # Lo asigna Esp32Device al agregar el widget
         self.value = "--"
         self.build_ui()
 
@@ -20,7 +21,12 @@ class BaseWidget(ft.Row):
         """Actualizar el widget (lógica personalizada en cada tipo de widget)"""
         pass
 
+    def dispose(self):
+        """Liberar las suscripciones del widget (cada tipo libera las suyas); puede llamarse más de una vez"""
+        pass
+
     def delete_widget(self):
         """Eliminar el widget"""
+        self.dispose()
         self.controls.clear()
         self.update()
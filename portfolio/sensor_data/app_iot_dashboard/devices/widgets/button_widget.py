@@ -1,6 +1,7 @@
 from devices.widgets.base_widget import BaseWidget
 import flet as ft
-from utils.mqtt_manager import mqtt_manager  # Importamos la instancia global
+from utils.command_queue import command_queue  # Importamos la instancia global
+from config import COMMAND_TOPIC
 
 class ButtonWidget(BaseWidget):
     def __init__(self, name, key):
@@ -14,7 +15,11 @@ class ButtonWidget(BaseWidget):
         self.state = not self.state
         self.button.text = "Encendido" if self.state else "Apagado"
 
-        # Publicar en MQTT
-        mqtt_manager.publish("iot/button", str(self.state))
+        # Encolar el comando: sale en orden por dispositivo y los clics rápidos se fusionan
+        if self.device_id is None:
+            topic = "iot/button"
+        else:
+            topic = COMMAND_TOPIC.format(device_id=self.device_id, key=self.key)
+        command_queue.send(self.device_id, topic, str(self.state))
         
         self.update()
@@ -1,6 +1,7 @@
 from devices.widgets.base_widget import BaseWidget
 import flet as ft
 from utils.mqtt_manager import mqtt_manager
+from utils.update_queue import update_queue
 
 class VUMeterWidget(BaseWidget):
     def __init__(self, name, key):
@@ -9,13 +10,27 @@ class VUMeterWidget(BaseWidget):
         self.controls.append(self.bar)
 
         # Suscribirse a un tópico específico de datos del ESP32
-        mqtt_manager.client.message_callback_add(f"iot/{self.key}", self.on_mqtt_message)
+        self.topic = f"iot/{self.key}"
+        mqtt_manager.subscribe(self.topic, self.on_mqtt_message)
         
-    def on_mqtt_message(self, client, userdata, message):
-        """Actualizar la barra de progreso con los datos recibidos"""
+    def on_mqtt_message(self, topic, payload):
+        """Encolar el valor recibido; la UI se refresca en el siguiente frame"""
         try:
-            new_value = float(message.payload.decode())
-            self.bar.value = min(1.0, max(0.0, new_value))
-            self.update()
-        except ValueError:
+            update_queue.put(self, float(payload))
+        except (TypeError, ValueError):
             print("Error en la conversión del valor recibido")
+
+    def on_device_value(self, value):
+        """Valor de la clave en el tópico de estado del dispositivo (ya decodificado)"""
+        try:
+            update_queue.put(self, float(value))
+        except (TypeError, ValueError):
+            print("Error en la conversión del valor recibido")
+
+    def apply_value(self, value):
+        """Actualizar la barra de progreso (lo llama la cola de actualizaciones)"""
+        self.bar.value = min(1.0, max(0.0, value))
+
+    def dispose(self):
+        """Liberar la suscripción MQTT"""
+        mqtt_manager.unsubscribe(self.topic, self.on_mqtt_message)
@@ -1,29 +1,33 @@
 from devices.widgets.base_widget import BaseWidget
 import flet as ft
-import boto3
-import time
-import threading
+from utils.dynamodb_poller import dynamodb_poller
+from utils.update_queue import update_queue
 
 class VUMeterWidget(BaseWidget):
-    def __init__(self, name, key, table_name):
+    def __init__(self, name, key, table_name, interval=5.0, deadband=0.005):
         super().__init__(name, key)
         self.bar = ft.ProgressBar(value=0.0)
         self.controls.append(self.bar)
         self.table_name = table_name
-        self.dynamodb = boto3.resource("dynamodb")
-        self.table = self.dynamodb.Table(self.table_name)
-        
-        # Iniciar un hilo para actualizar el valor cada 5 segundos
-        self.update_thread = threading.Thread(target=self.update_widget)
-        self.update_thread.daemon = True
-        self.update_thread.start()
+
+        # El poller compartido consulta DynamoDB en lote por todos los widgets
+        # y solo llama a on_item cuando el valor se mueve más que la banda muerta
+        dynamodb_poller.subscribe(
+            self.key, self.on_item, interval=interval, deadband=deadband, table_name=self.table_name
+        )
+
+    def on_item(self, item):
+        """Encolar el nuevo valor leído de DynamoDB; la UI se refresca en el siguiente frame"""
+        update_queue.put(self, float(item.get("sensor_value", 0.0)))
+
+    def apply_value(self, value):
+        """Actualizar la barra de progreso (lo llama la cola de actualizaciones)"""
+        self.bar.value = min(1.0, max(0.0, value))
 
     def update_widget(self):
-        """Obtener datos desde DynamoDB y actualizar la barra"""
-        while True:
-            response = self.table.get_item(Key={"device_id": self.key})
-            if "Item" in response:
-                new_value = float(response["Item"].get("sensor_value", 0.0))
-                self.bar.value = min(1.0, max(0.0, new_value))
-                self.update()
-            time.sleep(5)  # Actualizar cada 5 segundos
+        """Pedir una lectura inmediata a DynamoDB"""
+        dynamodb_poller.refresh(self.key, self.table_name)
+
+    def dispose(self):
+        """Dejar de consultar la clave en DynamoDB"""
+        dynamodb_poller.unsubscribe(self.key, self.on_item, self.table_name)
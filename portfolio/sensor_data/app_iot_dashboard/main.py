@@ -1,13 +1,39 @@
+import os
+import sys
+# Módulos compartidos por las dos apps de sensor_data (paquete shared)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import flet as ft
 from tabs.administrar_esp32_tab import AdministrarESP32Tab
 from tabs.visualizar_datos_tab import VisualizarDatosTab
 from tabs.configuracion_tab import ConfiguracionTab
 from utils.mqtt_manager import mqtt_manager
+from utils.update_queue import update_queue
+from utils.telemetry_store import telemetry_store
+from utils.ingest_wal import ingest_wal
+from utils.dynamodb_poller import dynamodb_poller
+from config import MQTT_ASYNC
 
-def main(page: ft.Page):
+async def main(page: ft.Page):
     page.title = "ESP32 IoT Dashboard"
     page.scroll = "auto"
 
+    # Los mensajes MQTT se aplican a la UI en lotes, a UI_FPS
+    update_queue.start(page)
+
+    # El gestor asíncrono atiende su socket desde el event loop de Flet
+    if MQTT_ASYNC:
+        mqtt_manager.start()
+
+    # Guardar el historial de las series suscritas por los widgets para poder graficarlas
+    mqtt_manager.add_message_listener(telemetry_store.on_mqtt_message)
+    # ...y guardarlo en disco (vía WAL), junto con las lecturas de DynamoDB
+    if MQTT_ASYNC:
+        # Solo el gestor asíncrono puede dejar de leer el socket sin bloquear un callback
+        ingest_wal.set_flow_control(mqtt_manager.pause_reading, mqtt_manager.resume_reading)
+    ingest_wal.start()
+    mqtt_manager.add_message_listener(ingest_wal.on_mqtt_message)
+    dynamodb_poller.add_listener(ingest_wal.on_dynamodb_item)
+
     # Crear instancias de las pestañas solo una vez
     admin_tab = AdministrarESP32Tab(mqtt_manager)
     visualizar_tab = VisualizarDatosTab(mqtt_manager)
@@ -1,17 +1,19 @@
 import flet as ft
 from devices.esp32_device import Esp32Device
 from utils.mqtt_manager import MQTTManager
-from utils.data_manager import save_devices, load_devices
+from utils.data_manager import save_device, device_ids
+from shared.virtualized_list import VirtualizedList
 
 class AdministrarESP32Tab(ft.Column):
     def __init__(self, mqtt_manager: MQTTManager):
         super().__init__()
         self.mqtt_manager = mqtt_manager
-        self.devices = {}  # Diccionario para almacenar dispositivos ESP32
+        self.devices = set()  # IDs de los dispositivos ESP32
 
         # Inicializamos los elementos de la UI
         self.device_input = ft.TextField(label="ID del Dispositivo", on_submit=self.add_device)
-        self.devices_list = ft.Column()  # Lista de dispositivos
+        # Solo se crean los controles visibles; los que tienen widgets conservan su estado
+        self.devices_list = VirtualizedList(self.build_device, row_height=120, can_recycle=lambda device: not device.widgets)
 
         # Construimos la UI
         self.controls = [self.build_ui()]
@@ -33,22 +35,26 @@ class AdministrarESP32Tab(ft.Column):
         if not device_id or device_id in self.devices:
             return  # Evitar dispositivos duplicados o vacíos
 
-        device = Esp32Device(device_id)
-        self.devices[device_id] = device
-        self.devices_list.controls.append(device)
-        self.devices_list.update()
+        self.devices.add(device_id)
+        self.devices_list.append(device_id)
 
         # Guardar el estado en la base de datos
-        save_devices(self.devices)
+        save_device(self.devices_list.get(device_id) or Esp32Device(device_id))
+
+    def build_device(self, device_id, recycled):
+        """Crear (o reutilizar) el control de un dispositivo que entra en pantalla"""
+        if recycled is not None:
+            recycled.bind(device_id)
+            return recycled
+        return Esp32Device(device_id, on_remove=self.remove_device)
+
+    def remove_device(self, device_id):
+        self.devices.discard(device_id)
+        self.devices_list.remove(device_id)
 
     def load_existing_devices(self, e=None):
         """Cargar dispositivos desde la base de datos después de que la UI esté lista"""
-        existing_devices = load_devices()
-        for device_id in existing_devices:
-            device = Esp32Device(device_id)
-            self.devices[device_id] = device
-            self.devices_list.controls.append(device)  # Agregar a la UI
-        
-        # Actualizar la UI solo después de que la página esté lista
-        if self.page:
-            self.devices_list.update()
+        # Solo los IDs: los controles se crean al hacerse visibles
+        ids = device_ids()
+        self.devices = set(ids)
+        self.devices_list.set_keys(ids)
@@ -1,10 +1,108 @@
+import time
 import flet as ft
+import numpy as np
 from utils.mqtt_manager import MQTTManager
+from utils.telemetry_store import telemetry_store
+from utils.telemetry_archive import telemetry_archive
+from utils.downsampling import DownsamplePyramid
+
+# Puntos máximos por serie que se envían al LineChart
+CHART_MAX_POINTS = 500
+
+# Historial que se carga del archivo en disco (segundos)
+CHART_HISTORY_S = 24 * 3600
+
 class VisualizarDatosTab(ft.Column):
-     def __init__(self, mqtt_manager: MQTTManager):
+    def __init__(self, mqtt_manager: MQTTManager):
         super().__init__()
         self.mqtt_manager = mqtt_manager  # Almacenar la instancia de MQTT
+        self.pyramid = None
+        self.view_start = 0.0
+        self.view_end = 0.0
+        self.t_min = 0.0
+        self.t_max = 0.0
+
+        self.series_selector = ft.Dropdown(label="Serie", options=[], on_change=self.load_series)
+        self.chart = ft.LineChart(data_series=[], expand=True, height=300)
+        self.info = ft.Text("Aquí puedes visualizar datos.")
+
         self.controls = [
             ft.Text("Visualizar Datos", size=30, weight=ft.FontWeight.BOLD),
-            ft.Text("Aquí puedes visualizar datos."),
-        ]
\ No newline at end of file
+            ft.Row([
+                self.series_selector,
+                ft.IconButton(icon=ft.icons.REFRESH, tooltip="Actualizar", on_click=self.refresh_series),
+                ft.IconButton(icon=ft.icons.ZOOM_IN, tooltip="Acercar", on_click=lambda e: self.zoom(0.5)),
+                ft.IconButton(icon=ft.icons.ZOOM_OUT, tooltip="Alejar", on_click=lambda e: self.zoom(2.0)),
+                ft.IconButton(icon=ft.icons.CHEVRON_LEFT, tooltip="Anterior", on_click=lambda e: self.pan(-0.5)),
+                ft.IconButton(icon=ft.icons.CHEVRON_RIGHT, tooltip="Siguiente", on_click=lambda e: self.pan(0.5)),
+            ]),
+            self.info,
+            self.chart,
+        ]
+
+    def refresh_series(self, e=None):
+        """Actualizar la lista de series y recargar la seleccionada"""
+        self.series_selector.options = [
+            ft.dropdown.Option(key=f"{device_id}/{key}", text=f"{device_id or '-'} · {key}")
+            for device_id, key in sorted(set(telemetry_store.series()) | set(telemetry_archive.series()))
+        ]
+        if self.series_selector.value:
+            self.load_series()
+        else:
+            self.update()
+
+    def load_series(self, e=None):
+        """Cargar el historial (del disco si existe) y precalcular la pirámide de resoluciones"""
+        device_id, _, key = self.series_selector.value.rpartition("/")
+        # El archivo se lee por mmap y es append-only: sus vistas no cambian y no hace falta copiarlas
+        ts, values = telemetry_archive.window(device_id, key, start=time.time() - CHART_HISTORY_S)
+        if len(ts) == 0:
+            ts, values = telemetry_store.window(device_id, key)
+            # Copia: el ring buffer sigue recibiendo muestras mientras se navega
+            ts, values = np.array(ts), np.array(values)
+        if len(ts) == 0:
+            self.pyramid = None
+            self.info.value = "Sin datos para esta serie."
+            self.chart.data_series = []
+            self.update()
+            return
+
+        self.pyramid = DownsamplePyramid(ts, values)
+        self.t_min, self.t_max = float(ts[0]), float(ts[-1])
+        self.view_start, self.view_end = self.t_min, self.t_max
+        self.render()
+
+    def zoom(self, factor):
+        """Acercar (factor < 1) o alejar (factor > 1) alrededor del centro de la vista"""
+        if self.pyramid is None:
+            return
+        center = (self.view_start + self.view_end) / 2
+        half = max(1.0, (self.view_end - self.view_start) * factor / 2)
+        self.view_start = max(self.t_min, center - half)
+        self.view_end = min(self.t_max, center + half)
+        self.render()
+
+    def pan(self, fraction):
+        """Desplazar la vista una fracción de su ancho"""
+        if self.pyramid is None:
+            return
+        width = self.view_end - self.view_start
+        shift = min(max(width * fraction, self.t_min - self.view_start), self.t_max - self.view_end)
+        self.view_start += shift
+        self.view_end += shift
+        self.render()
+
+    def render(self):
+        """Dibujar la ventana visible con como mucho CHART_MAX_POINTS puntos"""
+        ts, values = self.pyramid.query(self.view_start, self.view_end, CHART_MAX_POINTS)
+        x = (ts - self.view_start).tolist()
+        self.chart.data_series = [
+            ft.LineChartData(
+                data_points=[ft.LineChartDataPoint(px, py) for px, py in zip(x, values.tolist())],
+                stroke_width=2,
+            )
+        ]
+        self.chart.min_x = 0
+        self.chart.max_x = max(1.0, self.view_end - self.view_start)
+        self.info.value = f"{len(x)} puntos · {self.view_end - self.view_start:.0f} s"
+        self.update()
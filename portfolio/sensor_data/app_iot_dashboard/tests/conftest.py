@@ -0,0 +1,10 @@
+import os
+import sys
+
+# Los módulos de la app se importan desde su raíz (como al ejecutar main.py)
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_ROOT)
+sys.path.insert(0, os.path.dirname(APP_ROOT))  # Paquete shared
+
+# El gestor global no debe conectarse a AWS al importar los módulos
+os.environ.setdefault("MQTT_ASYNC", "1")
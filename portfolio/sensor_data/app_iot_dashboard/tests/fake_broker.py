@@ -0,0 +1,108 @@
+import asyncio
+import struct
+
+# 🔹 Broker MQTT 3.1.1 mínimo en proceso: CONNECT, SUBSCRIBE, PUBLISH (QoS 0/1), PINGREQ y DISCONNECT
+def encode_length(n):
+    out = b""
+    while True:
+        byte, n = n % 128, n // 128
+        out += bytes([byte | (128 if n else 0)])
+        if not n:
+            return out
+
+def topic_matches(topic_filter, topic):
+    filter_levels = topic_filter.split("/")
+    topic_levels = topic.split("/")
+    for i, level in enumerate(filter_levels):
+        if level == "#":
+            return True
+        if i >= len(topic_levels) or level not in ("+", topic_levels[i]):
+            return False
+    return len(filter_levels) == len(topic_levels)
+
+class FakeBroker:
+    """Broker de pruebas sobre asyncio.start_server; guarda las suscripciones por cliente"""
+
+    def __init__(self, port=0):
+        self.port = port
+        self.server = None
+        self.clients = {}  # writer -> filtros suscritos
+        self.connects = 0
+        self.published = []  # (tópico, payload) recibidos de los clientes
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        """Cerrar el servidor y cortar a todos los clientes"""
+        self.server.close()
+        self.drop_clients()
+        await self.server.wait_closed()
+
+    def drop_clients(self):
+        for writer in list(self.clients):
+            writer.close()
+        self.clients.clear()
+
+    def subscriptions(self):
+        return set().union(*self.clients.values()) if self.clients else set()
+
+    async def _read_packet(self, reader):
+        header = (await reader.readexactly(1))[0]
+        multiplier, length = 1, 0
+        while True:
+            byte = (await reader.readexactly(1))[0]
+            length += (byte & 127) * multiplier
+            multiplier *= 128
+            if not byte & 128:
+                break
+        return header, await reader.readexactly(length)
+
+    async def _handle(self, reader, writer):
+        self.clients[writer] = set()
+        try:
+            while True:
+                header, body = await self._read_packet(reader)
+                packet_type = header >> 4
+                if packet_type == 1:  # CONNECT
+                    self.connects += 1
+                    writer.write(b"\x20\x02\x00\x00")
+                elif packet_type == 8:  # SUBSCRIBE
+                    mid, i, filters = body[:2], 2, []
+                    while i < len(body):
+                        size = struct.unpack(">H", body[i:i + 2])[0]
+                        filters.append(body[i + 2:i + 2 + size].decode())
+                        i += 3 + size
+                    self.clients.setdefault(writer, set()).update(filters)
+                    writer.write(b"\x90" + encode_length(2 + len(filters)) + mid + b"\x00" * len(filters))
+                elif packet_type == 10:  # UNSUBSCRIBE
+                    mid, i = body[:2], 2
+                    while i < len(body):
+                        size = struct.unpack(">H", body[i:i + 2])[0]
+                        self.clients.get(writer, set()).discard(body[i + 2:i + 2 + size].decode())
+                        i += 2 + size
+                    writer.write(b"\xb0\x02" + mid)
+                elif packet_type == 3:  # PUBLISH
+                    size = struct.unpack(">H", body[:2])[0]
+                    topic = body[2:2 + size].decode()
+                    i = 2 + size
+                    if (header >> 1) & 3:
+                        writer.write(b"\x40\x02" + body[i:i + 2])  # PUBACK
+                        i += 2
+                    payload = body[i:]
+                    self.published.append((topic, payload))
+                    packet = struct.pack(">H", size) + topic.encode() + payload
+                    for client, filters in list(self.clients.items()):
+                        if any(topic_matches(f, topic) for f in filters):
+                            client.write(b"\x30" + encode_length(len(packet)) + packet)
+                elif packet_type == 12:  # PINGREQ
+                    writer.write(b"\xd0\x00")
+                elif packet_type == 14:  # DISCONNECT
+                    break
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        self.clients.pop(writer, None)
+        writer.close()
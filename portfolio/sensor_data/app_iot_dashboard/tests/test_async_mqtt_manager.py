@@ -0,0 +1,96 @@
+import asyncio
+import threading
+from fake_broker import FakeBroker
+from utils.async_mqtt_manager import AsyncMQTTManager
+
+async def wait_for(condition, timeout=5.0):
+    """Esperar (sin bloquear el loop) a que condition() sea verdadera"""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("tiempo de espera agotado")
+        await asyncio.sleep(0.01)
+
+def run(coro):
+    return asyncio.run(asyncio.wait_for(coro, 20))
+
+def test_no_connection_until_something_is_subscribed():
+    async def scenario():
+        broker = await FakeBroker().start()
+        manager = AsyncMQTTManager(host="127.0.0.1", port=broker.port)
+        manager.start()
+        await asyncio.sleep(0.2)
+        assert broker.connects == 0 and not manager.connected
+
+        manager.subscribe("iot/temp", lambda topic, payload: None)
+        await wait_for(lambda: "iot/temp" in broker.subscriptions())
+        assert broker.connects == 1
+        await broker.stop()
+    run(scenario())
+
+def test_messages_are_delivered_on_the_event_loop_thread():
+    async def scenario():
+        broker = await FakeBroker().start()
+        manager = AsyncMQTTManager(host="127.0.0.1", port=broker.port)
+        manager.start()
+        received = []
+        manager.subscribe("iot/+/temp", lambda topic, payload: received.append((topic, payload, threading.get_ident())))
+        await wait_for(lambda: "iot/+/temp" in broker.subscriptions())
+
+        manager.publish("iot/d1/temp", "21.5")
+        await wait_for(lambda: received)
+        assert received == [("iot/d1/temp", b"21.5", threading.get_ident())]
+        await broker.stop()
+    run(scenario())
+
+def test_publish_before_connecting_is_sent_once_connected():
+    async def scenario():
+        broker = await FakeBroker().start()
+        manager = AsyncMQTTManager(host="127.0.0.1", port=broker.port)
+        manager.publish("iot/d1/cmd/led", "1")  # Aún sin loop: queda pendiente
+        manager.start()
+        await wait_for(lambda: broker.published)
+        assert broker.published == [("iot/d1/cmd/led", b"1")]
+        await broker.stop()
+    run(scenario())
+
+def test_reconnects_with_backoff_and_resubscribes():
+    async def scenario():
+        broker = await FakeBroker().start()
+        port = broker.port
+        await broker.stop()
+
+        manager = AsyncMQTTManager(host="127.0.0.1", port=port, max_backoff=1.0)
+        manager.start()
+        manager.subscribe("iot/temp", lambda topic, payload: None)
+        await asyncio.sleep(0.3)  # Broker caído: el loop sigue libre mientras reintenta
+        assert not manager.connected
+
+        broker = await FakeBroker(port).start()
+        await wait_for(lambda: "iot/temp" in broker.subscriptions(), timeout=10)
+
+        # Corte del lado del broker: se reconecta solo y vuelve a suscribirse
+        broker.drop_clients()
+        await wait_for(lambda: broker.connects == 2 and "iot/temp" in broker.subscriptions(), timeout=10)
+        await broker.stop()
+    run(scenario())
+
+def test_thousands_of_subscriptions_without_extra_threads():
+    async def scenario():
+        broker = await FakeBroker().start()
+        manager = AsyncMQTTManager(host="127.0.0.1", port=broker.port)
+        manager.start()
+        received = []
+        manager.subscribe("iot/warmup", lambda topic, payload: None)
+        await wait_for(lambda: manager.connected)
+        threads = threading.active_count()
+
+        for i in range(5000):
+            manager.subscribe(f"iot/d{i}/temp", lambda topic, payload: received.append(topic))
+        await wait_for(lambda: len(broker.subscriptions()) == 5001, timeout=10)
+        manager.publish("iot/d4321/temp", "1")
+        await wait_for(lambda: received)
+        assert received == ["iot/d4321/temp"]
+        assert threading.active_count() == threads
+        await broker.stop()
+    run(scenario())
@@ -0,0 +1,124 @@
+import time
+from utils.command_queue import CommandQueue
+
+class FakeMqtt:
+    """Gestor MQTT de pruebas: send() devuelve mids crecientes; con early_ack el PUBACK llega dentro de send()"""
+
+    def __init__(self, early_ack=False, fail_topics=()):
+        self.early_ack = early_ack
+        self.fail_topics = set(fail_topics)
+        self.listeners = []
+        self.published = []  # (mid, tópico, payload)
+        self.next_mid = 1
+
+    def add_publish_listener(self, callback):
+        self.listeners.append(callback)
+
+    def send(self, topic, payload, qos=0):
+        if topic in self.fail_topics:
+            raise OSError("socket cerrado")
+        mid, self.next_mid = self.next_mid, self.next_mid + 1
+        self.published.append((mid, topic, payload))
+        if self.early_ack:
+            # Como paho con QoS 0 o un PUBACK que llega antes de que publish() devuelva
+            self.ack(mid)
+        return mid
+
+    def ack(self, mid):
+        for callback in self.listeners:
+            callback(mid)
+
+    def topics(self):
+        return [topic for _, topic, _ in self.published]
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("tiempo de espera agotado")
+        time.sleep(0.01)
+
+def test_puback_before_send_returns_completes_the_command():
+    mqtt = FakeMqtt(early_ack=True)
+    queue = CommandQueue(mqtt=mqtt, qos=1, window=4, ack_timeout=5)
+    for i in range(3):
+        queue.send("d1", f"iot/d1/cmd/k{i}", "ON")
+
+    # Cada PUBACK temprano libera el dispositivo y sale el siguiente sin esperar
+    assert mqtt.topics() == ["iot/d1/cmd/k0", "iot/d1/cmd/k1", "iot/d1/cmd/k2"]
+    stats = queue.stats()
+    assert stats["acked"] == stats["sent"] == 3
+    assert stats["in_flight"] == 0 and stats["queued"] == 0
+    assert not queue._early_acks
+
+def test_commands_of_a_device_go_out_in_order_one_at_a_time():
+    mqtt = FakeMqtt()
+    queue = CommandQueue(mqtt=mqtt, window=8, ack_timeout=5)
+    for key in ("a", "b", "c"):
+        queue.send("d1", f"iot/d1/cmd/{key}", "ON")
+    queue.send("d2", "iot/d2/cmd/a", "ON")
+
+    # Uno en vuelo por dispositivo; los otros dispositivos no esperan
+    assert mqtt.topics() == ["iot/d1/cmd/a", "iot/d2/cmd/a"]
+    mqtt.ack(1)
+    assert mqtt.topics()[-1] == "iot/d1/cmd/b"
+    mqtt.ack(3)
+    assert mqtt.topics()[-1] == "iot/d1/cmd/c"
+    assert queue.stats()["queued"] == 0
+
+def test_window_limits_commands_in_flight():
+    mqtt = FakeMqtt()
+    queue = CommandQueue(mqtt=mqtt, window=2, ack_timeout=5)
+    for d in range(4):
+        queue.send(f"d{d}", f"iot/d{d}/cmd/led", "ON")
+    assert len(mqtt.published) == 2
+    mqtt.ack(1)
+    assert len(mqtt.published) == 3
+
+def test_pending_command_with_the_same_topic_is_replaced():
+    mqtt = FakeMqtt()
+    queue = CommandQueue(mqtt=mqtt, window=4, ack_timeout=5)
+    queue.send("d1", "iot/d1/cmd/led", "ON")
+    queue.send("d1", "iot/d1/cmd/led", "OFF")
+    queue.send("d1", "iot/d1/cmd/led", "ON")
+
+    mqtt.ack(1)
+    # El primero ya estaba en vuelo; de los dos pendientes solo sale el último
+    assert [payload for _, _, payload in mqtt.published] == ["ON", "ON"]
+    assert queue.stats()["coalesced"] == 1
+
+def test_missing_puback_expires_and_late_ack_is_ignored():
+    mqtt = FakeMqtt()
+    queue = CommandQueue(mqtt=mqtt, window=4, ack_timeout=0.2)
+    queue.send("d1", "iot/d1/cmd/a", "ON")
+    queue.send("d1", "iot/d1/cmd/b", "ON")
+    assert mqtt.topics() == ["iot/d1/cmd/a"]
+
+    # Sin PUBACK, el hueco se libera y sale el siguiente
+    wait_for(lambda: len(mqtt.published) == 2)
+    assert queue.stats()["timeouts"] == 1
+
+    # El PUBACK tardío del vencido no completa el comando en vuelo
+    mqtt.ack(1)
+    assert queue.stats()["acked"] == 0 and queue.stats()["in_flight"] == 1
+    mqtt.ack(2)
+    assert queue.stats()["acked"] == 1 and queue.stats()["in_flight"] == 0
+
+def test_reused_mid_of_an_expired_command_completes_the_new_one():
+    mqtt = FakeMqtt()
+    queue = CommandQueue(mqtt=mqtt, window=4, ack_timeout=0.2)
+    queue.send("d1", "iot/d1/cmd/a", "ON")
+    wait_for(lambda: queue.stats()["timeouts"] == 1)
+
+    mqtt.next_mid = 1  # El contador de paho dio la vuelta
+    queue.send("d1", "iot/d1/cmd/b", "ON")
+    mqtt.ack(1)
+    assert queue.stats()["acked"] == 1 and queue.stats()["in_flight"] == 0
+
+def test_failed_send_frees_the_device():
+    mqtt = FakeMqtt(fail_topics={"iot/d1/cmd/a"})
+    queue = CommandQueue(mqtt=mqtt, window=4, ack_timeout=5)
+    queue.send("d1", "iot/d1/cmd/a", "ON")
+    queue.send("d1", "iot/d1/cmd/b", "ON")
+    assert mqtt.topics() == ["iot/d1/cmd/b"]
+    assert queue.stats()["sent"] == 1
@@ -0,0 +1,109 @@
+import threading
+import time
+import boto3
+import pytest
+from moto import mock_aws
+from utils.dynamodb_poller import DynamoDBPoller
+
+TABLE = "sensor-data"
+
+@pytest.fixture
+def table(monkeypatch):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with mock_aws():
+        table = boto3.resource("dynamodb").create_table(
+            TableName=TABLE,
+            KeySchema=[{"AttributeName": "device_id", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "device_id", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        with table.batch_writer() as batch:
+            for i in range(250):
+                batch.put_item(Item={"device_id": f"d{i}", "sensor_value": i})
+        yield table
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "tiempo de espera agotado"
+        time.sleep(0.01)
+
+class Collector:
+    """Callback de widget que guarda los items recibidos"""
+
+    def __init__(self):
+        self.items = []
+        self.event = threading.Event()
+
+    def __call__(self, item):
+        self.items.append(item)
+        self.event.set()
+
+class RecordingResource:
+    """Recurso de DynamoDB que anota cuántas claves lleva cada batch_get_item"""
+
+    def __init__(self, resource):
+        self.resource = resource
+        self.batches = []
+
+    def batch_get_item(self, RequestItems):
+        self.batches.append(sum(len(request["Keys"]) for request in RequestItems.values()))
+        return self.resource.batch_get_item(RequestItems=RequestItems)
+
+def test_batches_of_at_most_100_keys_on_one_thread(table):
+    poller = DynamoDBPoller(default_interval=60)
+    resource = poller._dynamodb = RecordingResource(boto3.resource("dynamodb"))
+    widgets = {f"d{i}": Collector() for i in range(250)}
+    threads = threading.active_count()
+    for key, widget in widgets.items():
+        poller.subscribe(key, widget, table_name=TABLE)
+
+    wait_for(lambda: all(widget.items for widget in widgets.values()))
+    # Las claves vencidas viajan juntas: unas pocas peticiones en lugar de 250, en un solo hilo nuevo
+    assert max(resource.batches) <= 100
+    assert sum(resource.batches) == 250
+    assert len(resource.batches) <= 5
+    assert threading.active_count() == threads + 1
+    assert widgets["d42"].items[0]["sensor_value"] == 42
+
+def test_widgets_on_the_same_key_share_the_read(table):
+    poller = DynamoDBPoller(default_interval=60)
+    first, second = Collector(), Collector()
+    poller.subscribe("d7", first, table_name=TABLE)
+    poller.subscribe("d7", second, table_name=TABLE)
+    wait_for(lambda: first.items and second.items)
+    assert first.items[-1]["sensor_value"] == second.items[-1]["sensor_value"] == 7
+
+def test_per_key_intervals(table):
+    poller = DynamoDBPoller(default_interval=60, max_interval=60)
+    fast, slow = Collector(), Collector()
+    # deadband negativo: cada lectura cuenta como cambio y el intervalo no crece
+    poller.subscribe("d1", fast, interval=0.1, deadband=-1, table_name=TABLE)
+    poller.subscribe("d2", slow, interval=60, deadband=-1, table_name=TABLE)
+    wait_for(lambda: len(fast.items) >= 5)
+    assert len(slow.items) == 1
+
+def test_changes_are_delivered_and_deleted_widgets_stop_polling(table):
+    poller = DynamoDBPoller(default_interval=0.1, max_interval=0.1)
+    widget = Collector()
+    poller.subscribe("d3", widget, table_name=TABLE)
+    wait_for(lambda: widget.items)
+
+    table.put_item(Item={"device_id": "d3", "sensor_value": 99})
+    wait_for(lambda: widget.items[-1]["sensor_value"] == 99)
+
+    poller.unsubscribe("d3", widget, table_name=TABLE)
+    time.sleep(0.3)  # Deja vencer la entrada que ya estaba programada
+    requests = poller.requests
+    time.sleep(0.5)
+    assert poller.requests == requests
+
+def test_listeners_only_see_new_item_versions(table):
+    poller = DynamoDBPoller(default_interval=0.05, max_interval=0.05)
+    seen = []
+    poller.add_listener(lambda table_name, item: seen.append(item["sensor_value"]))
+    poller.subscribe("d5", Collector(), table_name=TABLE)
+    wait_for(lambda: poller.requests >= 5)
+    assert seen == [5]
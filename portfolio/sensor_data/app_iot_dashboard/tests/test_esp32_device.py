@@ -0,0 +1,72 @@
+import pytest
+from devices import esp32_device
+from devices.esp32_device import Esp32Device
+from devices.widgets import vumeter_widget, vumeterMqtt_widget
+
+class FakeSubscriptions:
+    """Registra subscribe/unsubscribe como el poller de DynamoDB o el gestor MQTT"""
+
+    def __init__(self):
+        self.active = {}
+
+    def subscribe(self, key, callback, **kwargs):
+        self.active.setdefault(key, []).append(callback)
+
+    def unsubscribe(self, key, callback, *args):
+        callbacks = self.active.get(key, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+        if not callbacks:
+            self.active.pop(key, None)
+
+@pytest.fixture
+def subscriptions(monkeypatch):
+    poller, mqtt = FakeSubscriptions(), FakeSubscriptions()
+    monkeypatch.setattr(vumeter_widget, "dynamodb_poller", poller)
+    monkeypatch.setattr(vumeterMqtt_widget, "mqtt_manager", mqtt)
+    monkeypatch.setattr(esp32_device.data_manager, "remove_device", lambda device_id: None)
+    # Sin página montada, update() de Flet falla
+    monkeypatch.setattr(Esp32Device, "update", lambda self: None)
+    return poller, mqtt
+
+def make_device(device_id="esp32-1", on_remove=None):
+    device = Esp32Device(device_id, on_remove=on_remove)
+    device.add_widget(vumeter_widget.VUMeterWidget("Temp", "temp", "sensor-data"))
+    device.add_widget(vumeterMqtt_widget.VUMeterWidget("Hum", "hum"))
+    return device
+
+def test_removing_a_widget_stops_its_polling(subscriptions):
+    poller, mqtt = subscriptions
+    device = make_device()
+    assert set(poller.active) == {"temp"} and set(mqtt.active) == {"iot/hum"}
+
+    device.remove_widget(device.widgets[0])
+    assert poller.active == {}
+    assert set(mqtt.active) == {"iot/hum"}
+
+def test_removing_the_device_releases_every_subscription(subscriptions):
+    poller, mqtt = subscriptions
+    removed = []
+    device = make_device(on_remove=removed.append)
+
+    device.remove_device(None)
+    assert removed == ["esp32-1"]
+    assert poller.active == {} and mqtt.active == {}
+
+def test_recycled_control_releases_the_previous_device(subscriptions):
+    poller, mqtt = subscriptions
+    device = make_device()
+
+    device.bind("esp32-2")
+    assert device.device_id == "esp32-2" and device.widgets == []
+    assert poller.active == {} and mqtt.active == {}
+
+def test_dispose_is_idempotent(subscriptions):
+    poller, _ = subscriptions
+    device = make_device()
+    other = vumeter_widget.VUMeterWidget("Temp 2", "temp", "sensor-data")
+    widget = device.widgets[0]
+
+    widget.dispose()
+    device.remove_widget(widget)
+    assert poller.active == {"temp": [other.on_item]}
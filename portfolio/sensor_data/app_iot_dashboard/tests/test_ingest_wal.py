@@ -0,0 +1,102 @@
+import os
+import time
+from utils.ingest_wal import FRAME_CRC, IngestWAL
+
+class FakeArchive:
+    """Sumidero con la interfaz de TelemetryArchive que guarda las muestras en memoria"""
+
+    def __init__(self, last=None):
+        self.samples = []
+        self.flushes = 0
+        self.last = last or {}  # (device_id, key) -> último timestamp ya en disco
+
+    def append_batch(self, samples):
+        self.samples.extend(samples)
+
+    def flush(self):
+        self.flushes += 1
+
+    def last_timestamp(self, device_id, key):
+        return self.last.get((device_id, key))
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("tiempo de espera agotado")
+        time.sleep(0.01)
+
+def write_groups(directory, groups, **kwargs):
+    """Escribir cada lista de muestras como un grupo del WAL y devolver el WAL (que queda 'caído')"""
+    wal = IngestWAL(sink=FakeArchive(), directory=str(directory), group_size=10_000, group_ms=10, fsync=False, **kwargs)
+    wal.start()
+    for group in groups:
+        expected = wal.samples + len(group)
+        for sample in group:
+            wal.put(*sample)
+        wait_for(lambda: wal.samples == expected)
+    return wal
+
+def segments(directory):
+    return sorted(name for name in os.listdir(directory) if name.startswith("wal-"))
+
+def test_replay_after_crash_delivers_every_committed_group(tmp_path):
+    groups = [[("d1", "temp", float(i), 100.0 + i) for i in range(5)], [("d2", "hum", 50.0, 200.0)]]
+    write_groups(tmp_path, groups)
+
+    archive = FakeArchive()
+    restarted = IngestWAL(sink=archive, directory=str(tmp_path), fsync=False)
+    restarted.replay()
+    assert archive.samples == groups[0] + groups[1]
+    assert archive.flushes == 1
+    assert segments(tmp_path) == []
+
+def test_replay_skips_samples_the_archive_already_has(tmp_path):
+    write_groups(tmp_path, [[("d1", "temp", float(i), 100.0 + i) for i in range(5)]])
+
+    archive = FakeArchive(last={("d1", "temp"): 102.0})
+    IngestWAL(sink=archive, directory=str(tmp_path), fsync=False).replay()
+    assert [sample[3] for sample in archive.samples] == [103.0, 104.0]
+
+def test_torn_last_frame_is_discarded(tmp_path):
+    write_groups(tmp_path, [[("d1", "temp", 1.0, 1.0)], [("d1", "temp", 2.0, 2.0), ("d1", "temp", 3.0, 3.0)]])
+    path = tmp_path / segments(tmp_path)[0]
+    os.truncate(path, os.path.getsize(path) - 5)  # Corte a mitad del último grupo
+
+    archive = FakeArchive()
+    IngestWAL(sink=archive, directory=str(tmp_path), fsync=False).replay()
+    assert archive.samples == [("d1", "temp", 1.0, 1.0)]
+
+def test_last_frame_with_bad_crc_is_discarded(tmp_path):
+    write_groups(tmp_path, [[("d1", "temp", 1.0, 1.0)], [("d1", "temp", 2.0, 2.0)]])
+    path = tmp_path / segments(tmp_path)[0]
+    data = bytearray(path.read_bytes())
+    data[-FRAME_CRC.size - 1] ^= 0xFF  # Un byte de los registros del último grupo
+    path.write_bytes(bytes(data))
+
+    archive = FakeArchive()
+    IngestWAL(sink=archive, directory=str(tmp_path), fsync=False).replay()
+    assert archive.samples == [("d1", "temp", 1.0, 1.0)]
+
+def test_checkpoint_deletes_old_segments(tmp_path):
+    groups = [[("d1", "temp", float(i), float(i))] for i in range(5)]
+    wal = write_groups(tmp_path, groups, segment_bytes=1)  # Cada grupo llena su segmento
+
+    # Tras cada checkpoint solo queda el segmento nuevo, vacío, y el archivo está al día
+    assert wal.groups == 5
+    assert wal.sink.flushes == 5
+    assert segments(tmp_path) == ["wal-00000005.log"]
+    assert os.path.getsize(tmp_path / "wal-00000005.log") == 0
+
+    archive = FakeArchive()
+    IngestWAL(sink=archive, directory=str(tmp_path), fsync=False).replay()
+    assert archive.samples == []
+
+def test_max_group_commits_one_sample_per_group(tmp_path):
+    wal = IngestWAL(sink=FakeArchive(), directory=str(tmp_path), group_size=1, max_group=1, fsync=False)
+    wal.start()
+    for i in range(20):
+        wal.put("d1", "temp", float(i), float(i))
+    wait_for(lambda: wal.samples == 20)
+    assert wal.groups == 20
+    assert [sample[2] for sample in wal.sink.samples] == [float(i) for i in range(20)]
@@ -0,0 +1,61 @@
+import os
+import numpy as np
+from utils.telemetry_archive import TelemetryArchive
+
+def fill(archive, n, device_id="esp32-1", key="temp"):
+    archive.append_batch([(device_id, key, float(i), 1000.0 + i) for i in range(n)])
+    archive.flush()
+
+def test_reopened_archive_reads_what_was_written(tmp_path):
+    archive = TelemetryArchive(directory=str(tmp_path), chunk_size=100, flush_interval=3600)
+    fill(archive, 250)
+    fill(archive, 3, device_id="dev/with spaces", key="hum")
+
+    reopened = TelemetryArchive(directory=str(tmp_path), chunk_size=100, flush_interval=3600)
+    assert reopened.series() == [("dev/with spaces", "hum"), ("esp32-1", "temp")]
+    ts, values = reopened.window("esp32-1", "temp")
+    assert np.array_equal(values, np.arange(250, dtype=np.float64))
+    assert reopened.last_timestamp("esp32-1", "temp") == 1249.0
+    assert reopened.window("dev/with spaces", "hum")[1].tolist() == [0.0, 1.0, 2.0]
+
+def test_window_across_chunk_boundaries(tmp_path):
+    archive = TelemetryArchive(directory=str(tmp_path), chunk_size=100, flush_interval=3600)
+    fill(archive, 250)  # Chunks de 100, 100 y 50
+
+    ts, values = archive.window("esp32-1", "temp", 1095.0, 1205.0)
+    assert ts.tolist() == [1000.0 + i for i in range(95, 206)]
+    assert values.tolist() == [float(i) for i in range(95, 206)]
+
+    # Dentro de un solo chunk: vista del mmap, sin copia
+    ts, values = archive.window("esp32-1", "temp", 1010.0, 1020.0)
+    assert len(values) == 11 and values.base is not None
+
+def test_window_merges_pending_and_late_samples(tmp_path):
+    archive = TelemetryArchive(directory=str(tmp_path), chunk_size=100, flush_interval=3600)
+    fill(archive, 100)
+    # Una muestra tardía ya escrita y otra aún en memoria
+    archive.append_batch([("esp32-1", "temp", -1.0, 1050.5)])
+    archive.flush()
+    archive.append_batch([("esp32-1", "temp", 500.0, 2000.0)])
+
+    ts, values = archive.window("esp32-1", "temp", 1049.0, None)
+    assert ts.tolist() == [1049.0, 1050.0, 1050.5] + [1000.0 + i for i in range(51, 100)] + [2000.0]
+    assert values[2] == -1.0 and values[-1] == 500.0
+
+def test_torn_chunk_is_truncated_on_reopen(tmp_path):
+    archive = TelemetryArchive(directory=str(tmp_path), chunk_size=100, flush_interval=3600)
+    fill(archive, 200)
+    path = os.path.join(tmp_path, "esp32-1@temp.tsc")
+    os.truncate(path, os.path.getsize(path) - 10)
+
+    reopened = TelemetryArchive(directory=str(tmp_path), chunk_size=100, flush_interval=3600)
+    assert reopened.window("esp32-1", "temp")[1].tolist() == [float(i) for i in range(100)]
+
+def test_only_max_open_maps_series_stay_mapped(tmp_path):
+    archive = TelemetryArchive(directory=str(tmp_path), chunk_size=10, flush_interval=3600, max_open_maps=2)
+    for d in range(4):
+        fill(archive, 10, device_id=f"d{d}")
+        archive.window(f"d{d}", "temp")
+    assert list(archive._open_maps) == [("d2", "temp"), ("d3", "temp")]
+    # Una serie liberada se vuelve a mapear al leerla
+    assert archive.window("d0", "temp")[1].tolist() == [float(i) for i in range(10)]
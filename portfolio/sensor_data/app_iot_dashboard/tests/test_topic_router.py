@@ -0,0 +1,84 @@
+import pytest
+from utils.mqtt_manager import MQTTManager
+from utils.topic_router import TopicRouter
+
+def cb(name):
+    def callback(topic, payload):
+        pass
+    callback.__name__ = name
+    return callback
+
+@pytest.fixture
+def router():
+    router = TopicRouter()
+    callbacks = {}
+    for topic_filter in ("iot/d1/temp", "iot/+/temp", "iot/#", "iot/d1/+", "#", "+/d1/temp", "$SYS/#"):
+        callbacks[topic_filter] = cb(topic_filter)
+        router.add(topic_filter, callbacks[topic_filter])
+    return router, callbacks
+
+def matched(router, callbacks, topic):
+    by_callback = {callback: topic_filter for topic_filter, callback in callbacks.items()}
+    return {by_callback[callback] for callback in router.match(topic)}
+
+def test_exact_plus_and_hash_wildcards(router):
+    router, callbacks = router
+    assert matched(router, callbacks, "iot/d1/temp") == {"iot/d1/temp", "iot/+/temp", "iot/#", "iot/d1/+", "#", "+/d1/temp"}
+    assert matched(router, callbacks, "iot/d2/temp") == {"iot/+/temp", "iot/#", "#"}
+    assert matched(router, callbacks, "iot/d1/hum") == {"iot/#", "iot/d1/+", "#"}
+    # + ocupa exactamente un nivel
+    assert matched(router, callbacks, "iot/d1/temp/raw") == {"iot/#", "#"}
+    # # también coincide con el nivel padre
+    assert matched(router, callbacks, "iot") == {"iot/#", "#"}
+
+def test_topics_starting_with_dollar_skip_first_level_wildcards(router):
+    router, callbacks = router
+    assert matched(router, callbacks, "$SYS/broker/load") == {"$SYS/#"}
+    assert matched(router, callbacks, "$aws/d1/temp") == set()
+
+def test_cache_is_invalidated_on_changes():
+    router = TopicRouter()
+    first, second = cb("first"), cb("second")
+    router.add("iot/+/temp", first)
+    assert router.match("iot/d1/temp") == (first,)
+    router.add("iot/d1/temp", second)
+    assert set(router.match("iot/d1/temp")) == {first, second}
+    router.remove("iot/+/temp", first)
+    assert router.match("iot/d1/temp") == (second,)
+
+def test_add_and_remove_report_first_and_last_subscriber():
+    router = TopicRouter()
+    first, second = cb("first"), cb("second")
+    assert router.add("iot/+/temp", first) is True
+    assert router.add("iot/+/temp", second) is False
+    assert router.remove("iot/+/temp", first) is False
+    assert router.filters() == ["iot/+/temp"]
+    assert router.remove("iot/+/temp", second) is True
+    assert router.filters() == []
+    # Quitar algo que no está no cambia nada
+    assert router.remove("iot/+/temp", second) is False
+    assert router.match("iot/d1/temp") == ()
+
+class FakeClient:
+    def __init__(self):
+        self.calls = []
+
+    def subscribe(self, topic_filter):
+        self.calls.append(("subscribe", topic_filter))
+
+    def unsubscribe(self, topic_filter):
+        self.calls.append(("unsubscribe", topic_filter))
+
+def test_broker_subscription_follows_the_first_and_last_listener(monkeypatch):
+    monkeypatch.setattr(MQTTManager, "connect", lambda self: None)
+    manager = MQTTManager()
+    manager.client = FakeClient()
+    first, second = cb("first"), cb("second")
+
+    manager.subscribe("iot/d1/temp", first)
+    manager.subscribe("iot/d1/temp", second)
+    manager.unsubscribe("iot/d1/temp", first)
+    assert manager.client.calls == [("subscribe", "iot/d1/temp")]
+
+    manager.unsubscribe("iot/d1/temp", second)
+    assert manager.client.calls == [("subscribe", "iot/d1/temp"), ("unsubscribe", "iot/d1/temp")]
@@ -0,0 +1,174 @@
+import asyncio
+import random
+from collections import deque
+import paho.mqtt.client as mqtt
+from config import AWS_IOT_ENDPOINT, MQTT_USERNAME, MQTT_PASSWORD
+from utils.mqtt_base import MQTTManagerBase
+
+class AsyncMQTTManager(MQTTManagerBase):
+    """Misma interfaz que MQTTManager, pero el socket de paho lo atiende el event loop de asyncio"""
+
+    def __init__(self, host=AWS_IOT_ENDPOINT, port=8883, client_factory=mqtt.Client, max_backoff=60.0):
+        self.host = host
+        self.port = port
+        self.max_backoff = max_backoff
+
+        self.client = client_factory()
+        self.client.username_pw_set(MQTT_USERNAME, MQTT_PASSWORD)
+        self.client.on_connect = self.on_connect
+        self.client.on_disconnect = self.on_disconnect
+        self.client.on_message = self.on_message
+        self.client.on_publish = self.on_publish
+
+        # paho no abre hilos: nos avisa del socket y el loop lo lee/escribe
+        self.client.on_socket_open = self.on_socket_open
+        self.client.on_socket_close = self.on_socket_close
+        self.client.on_socket_register_write = self.on_socket_register_write
+        self.client.on_socket_unregister_write = self.on_socket_unregister_write
+
+        self._init_dispatch()
+        self.connected = False
+        self.loop = None
+        self._sock = None
+        self._reading = True
+        self._connect_task = None
+        self._misc_task = None
+        self._pending = deque(maxlen=1000)  # Publicaciones hechas antes de conectar
+
+    def start(self, loop=None):
+        """Enganchar el gestor al event loop (p. ej. desde el main asíncrono de Flet)"""
+        self.loop = loop or asyncio.get_running_loop()
+        # Conexión perezosa: solo si ya hay algo que suscribir o publicar
+        if self.router.filters() or self._pending:
+            self._call_soon(self._ensure_connection)
+
+    def subscribe(self, topic_filter, callback):
+        """Registrar un callback(topic, payload decodificado); se suscribe al broker con el primer suscriptor"""
+        if self.router.add(topic_filter, callback):
+            self._call_soon(self._broker_subscribe, topic_filter)
+
+    def unsubscribe(self, topic_filter, callback):
+        """Quitar un callback; se desuscribe del broker al quedar sin suscriptores"""
+        if self.router.remove(topic_filter, callback):
+            self._call_soon(self._broker_unsubscribe, topic_filter)
+
+    def pause_reading(self):
+        """Dejar de leer del socket (contrapresión hacia el broker) hasta resume_reading()"""
+        self._call_soon(self._set_reading, False)
+
+    def resume_reading(self):
+        self._call_soon(self._set_reading, True)
+
+    def publish(self, topic, message):
+        """Publicar un mensaje en MQTT (se encola si aún no hay conexión)"""
+        self._pending.append((topic, message))
+        self._call_soon(self._flush_pending)
+
+    def send(self, topic, payload, qos=0):
+        """Publicar y devolver el mid; sin conexión paho guarda los QoS > 0 hasta reconectar"""
+        mid = self.client.publish(topic, payload, qos=qos).mid
+        if not self.connected:
+            self._call_soon(self._ensure_connection)
+        return mid
+
+    def on_connect(self, client, userdata, flags, rc):
+        """Callback cuando el cliente se conecta a MQTT"""
+        print(f"Conectado a AWS IoT Core con código {rc}")
+        if rc != 0:
+            return
+        self.connected = True
+        for topic_filter in self.router.filters():
+            client.subscribe(topic_filter)
+        self._flush_pending()
+
+    def on_disconnect(self, client, userdata, rc):
+        """Callback de desconexión: reintentar si no fue solicitada"""
+        self.connected = False
+        if rc != 0:
+            self._call_soon(self._ensure_connection)
+
+    def on_socket_open(self, client, userdata, sock):
+        # connect() corre en el executor, así que volvemos al hilo del loop
+        self._call_soon(self._watch_socket, sock)
+
+    def on_socket_close(self, client, userdata, sock):
+        self._call_soon(self._unwatch_socket, sock)
+
+    def on_socket_register_write(self, client, userdata, sock):
+        self._call_soon(self.loop.add_writer, sock, client.loop_write)
+
+    def on_socket_unregister_write(self, client, userdata, sock):
+        self._call_soon(self.loop.remove_writer, sock)
+
+    def _set_reading(self, reading):
+        if reading == self._reading:
+            return
+        self._reading = reading
+        if self._sock is None:
+            return
+        if reading:
+            self.loop.add_reader(self._sock, self.client.loop_read)
+        else:
+            self.loop.remove_reader(self._sock)
+
+    def _watch_socket(self, sock):
+        self._sock = sock
+        if self._reading:
+            self.loop.add_reader(sock, self.client.loop_read)
+        if self._misc_task is None:
+            self._misc_task = self.loop.create_task(self._misc_loop())
+
+    def _unwatch_socket(self, sock):
+        self._sock = None
+        self.loop.remove_reader(sock)
+        self.loop.remove_writer(sock)
+        if self._misc_task is not None:
+            self._misc_task.cancel()
+            self._misc_task = None
+
+    async def _misc_loop(self):
+        """Keepalive y reintentos de paho, una vez por segundo"""
+        while self.client.loop_misc() == mqtt.MQTT_ERR_SUCCESS:
+            await asyncio.sleep(1)
+
+    def _call_soon(self, func, *args):
+        """Ejecutar en el hilo del loop; sin loop, la acción queda para start()/on_connect"""
+        if self.loop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(func, *args)
+
+    def _ensure_connection(self):
+        if self.connected or (self._connect_task is not None and not self._connect_task.done()):
+            return
+        self._connect_task = self.loop.create_task(self._connect())
+
+    async def _connect(self):
+        """Conectar al broker con reintentos y backoff exponencial con jitter"""
+        delay = 1.0
+        while not self.connected:
+            try:
+                # DNS + TCP + TLS fuera del loop para no bloquear la UI
+                await self.loop.run_in_executor(None, self.client.connect, self.host, self.port)
+                return
+            except (OSError, ValueError) as e:
+                print(f"❌ Error al conectar a MQTT: {e}, reintentando en {delay:.0f}s")
+            await asyncio.sleep(random.uniform(delay / 2, delay))
+            delay = min(self.max_backoff, delay * 2)
+
+    def _broker_subscribe(self, topic_filter):
+        if self.connected:
+            self.client.subscribe(topic_filter)
+        else:
+            self._ensure_connection()  # on_connect se suscribe a todos los filtros
+
+    def _broker_unsubscribe(self, topic_filter):
+        if self.connected:
+            self.client.unsubscribe(topic_filter)
+
+    def _flush_pending(self):
+        if not self.connected:
+            if self._pending:
+                self._ensure_connection()
+            return
+        while self._pending:
+            topic, message = self._pending.popleft()
+            self.client.publish(topic, message)
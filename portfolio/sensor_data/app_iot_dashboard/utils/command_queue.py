@@ -0,0 +1,158 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from config import COMMAND_QOS, COMMAND_WINDOW, COMMAND_TIMEOUT_S
+from utils.mqtt_manager import mqtt_manager
+
+class CommandQueue:
+    """Cola de comandos salientes hacia los dispositivos.
+
+    Los comandos de un mismo dispositivo salen en orden y de uno en uno (el siguiente espera al
+    PUBACK del anterior); como mucho `window` comandos en vuelo en total. Un comando que aún no
+    salió se reemplaza si llega otro con la misma clave (p. ej. el mismo tópico de un interruptor):
+    solo importa el último estado.
+    """
+
+    def __init__(self, mqtt=mqtt_manager, qos=COMMAND_QOS, window=COMMAND_WINDOW, ack_timeout=COMMAND_TIMEOUT_S):
+        self.mqtt = mqtt
+        self.qos = qos
+        self.window = window
+        self.ack_timeout = ack_timeout
+        self._queues = OrderedDict()  # device_id -> OrderedDict(clave -> comando) pendientes
+        self._busy = set()  # Dispositivos con un comando en vuelo
+        self._in_flight = {}  # mid -> comando
+        self._publishing = 0  # Llamadas a send() de esta cola en curso
+        self._early_acks = set()  # PUBACK recibidos mientras una de esas llamadas no devolvía su mid
+        self._expired = OrderedDict()  # mid vencido -> momento en que venció; su PUBACK tardío se ignora
+        self._lock = threading.Lock()
+        self._thread = None
+        self.latencies = deque(maxlen=1000)  # Segundos desde publish hasta PUBACK
+
+        # Contadores
+        self.sent = 0
+        self.acked = 0
+        self.coalesced = 0
+        self.timeouts = 0
+        self.mqtt.add_publish_listener(self.on_publish)
+
+    def send(self, device_id, topic, payload, qos=None, coalesce_key=None):
+        """Encolar un comando; reemplaza al pendiente con la misma clave (por defecto, el tópico)"""
+        command = {
+            "device_id": device_id,
+            "topic": topic,
+            "payload": payload,
+            "qos": self.qos if qos is None else qos,
+        }
+        key = coalesce_key or topic
+        with self._lock:
+            queue = self._queues.setdefault(device_id, OrderedDict())
+            if queue.pop(key, None) is not None:
+                self.coalesced += 1
+            queue[key] = command
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._expire_loop, daemon=True)
+                self._thread.start()
+        self._pump()
+
+    def on_publish(self, mid):
+        """Listener de MQTTManager: PUBACK (QoS 1), PUBCOMP (QoS 2) o envío (QoS 0) de un mensaje"""
+        with self._lock:
+            command = self._in_flight.pop(mid, None)
+            if command is None:
+                if self._expired.pop(mid, None) is None and self._publishing:
+                    # Puede ser el de un comando cuyo send() aún no devolvió el mid; si no lo es,
+                    # se descarta cuando terminan los send() en curso
+                    self._early_acks.add(mid)
+                return
+            self._complete(command)
+        self._pump()
+
+    def stats(self):
+        latencies = sorted(self.latencies)
+        percentile = lambda p: latencies[min(len(latencies) - 1, int(p * len(latencies)))] if latencies else None
+        with self._lock:
+            queued = sum(len(queue) for queue in self._queues.values())
+            in_flight = len(self._in_flight)
+        return {
+            "queued": queued,
+            "in_flight": in_flight,
+            "sent": self.sent,
+            "acked": self.acked,
+            "coalesced": self.coalesced,
+            "timeouts": self.timeouts,
+            "latency_p50": percentile(0.5),
+            "latency_p95": percentile(0.95),
+        }
+
+    def _pump(self):
+        """Publicar lo que permita la ventana, respetando un comando en vuelo por dispositivo"""
+        while True:
+            with self._lock:
+                command = self._next()
+                if command is None:
+                    return
+                self._busy.add(command["device_id"])
+                self._publishing += 1
+            # Se publica fuera del lock: paho puede llamar a on_publish dentro de publish()
+            command["sent_at"] = time.monotonic()
+            try:
+                mid = self.mqtt.send(command["topic"], command["payload"], command["qos"])
+            except Exception as e:
+                print(f"❌ Error al enviar el comando a {command['topic']}: {e}")
+                mid = None
+            with self._lock:
+                self._publishing -= 1
+                early = mid in self._early_acks
+                if not self._publishing:
+                    # Los PUBACK de mids que ninguna llamada reclamó son de otras publicaciones
+                    self._early_acks.clear()
+                else:
+                    self._early_acks.discard(mid)
+                if mid is None:
+                    self._busy.discard(command["device_id"])
+                    continue
+                self.sent += 1
+                self._expired.pop(mid, None)  # El mid se reutiliza (el contador de paho dio la vuelta)
+                if early:
+                    self._complete(command)
+                else:
+                    self._in_flight[mid] = command
+
+    def _next(self):
+        if len(self._busy) >= self.window:
+            return None
+        for device_id, queue in self._queues.items():
+            if device_id not in self._busy and queue:
+                command = queue.popitem(last=False)[1]
+                if not queue:
+                    del self._queues[device_id]
+                else:
+                    # Turnos entre dispositivos: el que acaba de enviar pasa al final
+                    self._queues.move_to_end(device_id)
+                return command
+        return None
+
+    def _complete(self, command):
+        self._busy.discard(command["device_id"])
+        self.acked += 1
+        self.latencies.append(time.monotonic() - command["sent_at"])
+
+    def _expire_loop(self):
+        """Liberar el hueco de los comandos sin PUBACK (paho los reintenta por su cuenta)"""
+        while True:
+            time.sleep(max(0.1, self.ack_timeout / 4))
+            now = time.monotonic()
+            with self._lock:
+                expired = [mid for mid, command in self._in_flight.items() if now - command["sent_at"] > self.ack_timeout]
+                for mid in expired:
+                    self._busy.discard(self._in_flight.pop(mid)["device_id"])
+                    self._expired[mid] = now
+                self.timeouts += len(expired)
+                # Un PUBACK que no llegó en varios plazos ya no llegará
+                while self._expired and now - next(iter(self._expired.values())) > 10 * self.ack_timeout:
+                    self._expired.popitem(last=False)
+            if expired:
+                self._pump()
+
+# Instancia global de CommandQueue
+command_queue = CommandQueue()
@@ -1,24 +1,36 @@
-import json
 import os
+from shared.registry import DeviceRegistry
 
 CONFIG_PATH = os.path.expanduser("~/.config/iot_dashboard")
 DEVICES_FILE = os.path.join(CONFIG_PATH, "devices_data.json")
+REGISTRY_FILE = os.path.join(CONFIG_PATH, "devices.db")
 
 def ensure_config_dir():
     """Asegurar que la carpeta de configuración existe"""
     if not os.path.exists(CONFIG_PATH):
         os.makedirs(CONFIG_PATH)
 
-def save_devices(dispositivos):
-    """Guardar los dispositivos en un archivo JSON"""
-    ensure_config_dir()
-    data = {dev.device_id: [w.__class__.__name__ for w in dev.widgets] for dev in dispositivos.values()}
-    with open(DEVICES_FILE, "w") as f:
-        json.dump(data, f, indent=4)
+ensure_config_dir()
+# Registro SQLite; devices_data.json se importa solo la primera vez
+registry = DeviceRegistry(REGISTRY_FILE)
+registry.import_json(DEVICES_FILE)
+
+def save_device(device):
+    """Guardar (upsert) un dispositivo y sus widgets sin reescribir los demás"""
+    registry.upsert_device(device.device_id)
+    registry.save_widgets(device.device_id, [
+        {"type": w.__class__.__name__, "key": getattr(w, "key", ""), "name": getattr(w, "name", w.__class__.__name__)}
+        for w in device.widgets
+    ])
+
+def remove_device(device_id):
+    """Eliminar un dispositivo y sus widgets del registro"""
+    registry.delete_device(device_id)
 
 def load_devices():
-    """Cargar los dispositivos desde el archivo JSON"""
-    if os.path.exists(DEVICES_FILE):
-        with open(DEVICES_FILE, "r") as f:
-            return json.load(f)
-    return {}
+    """Cargar los dispositivos desde el registro"""
+    return registry.load_devices()
+
+def device_ids():
+    """Solo los IDs de los dispositivos, sin leer sus widgets"""
+    return registry.device_ids()
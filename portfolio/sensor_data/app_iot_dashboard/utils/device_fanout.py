@@ -0,0 +1,83 @@
+import threading
+import numpy as np
+from config import DEVICE_STATE_TOPIC
+from utils.mqtt_manager import mqtt_manager
+
+class DeviceFanout:
+    """Índice (device_id, key) -> widgets para los tópicos de estado por dispositivo.
+
+    El dispositivo publica todas sus claves en un mensaje (iot/{device_id}/state, JSON o binario
+    según el codec del tópico); el mensaje se decodifica una vez en MQTTManager y cada valor
+    se entrega a los widgets enlazados a su clave.
+    """
+
+    def __init__(self, mqtt=mqtt_manager, topic=DEVICE_STATE_TOPIC):
+        self.mqtt = mqtt
+        self.topic = topic  # Plantilla con {device_id}
+        self._index = {}  # device_id -> {key: [callbacks]}
+        self._lock = threading.Lock()
+
+        # Contadores
+        self.messages = 0
+        self.deliveries = 0
+        self.callback_errors = 0
+
+    def bind(self, device_id, key, callback):
+        """Entregar a callback(valor) la clave del dispositivo; suscribe su tópico con el primer enlace"""
+        with self._lock:
+            keys = self._index.get(device_id)
+            first = keys is None
+            if first:
+                keys = self._index[device_id] = {}
+            # Listas nuevas en cada cambio: on_message las recorre sin tomar el lock
+            keys[key] = keys.get(key, []) + [callback]
+        if first:
+            self.mqtt.subscribe(self.topic.format(device_id=device_id), self.on_message)
+
+    def unbind(self, device_id, key, callback):
+        with self._lock:
+            keys = self._index.get(device_id)
+            if keys is None or callback not in keys.get(key, []):
+                return
+            callbacks = [c for c in keys[key] if c != callback]
+            if callbacks:
+                keys[key] = callbacks
+            else:
+                del keys[key]
+            last = not keys
+            if last:
+                del self._index[device_id]
+        if last:
+            self.mqtt.unsubscribe(self.topic.format(device_id=device_id), self.on_message)
+
+    def on_message(self, topic, payload):
+        """Suscriptor de MQTTManager: payload ya decodificado ({clave: valor} o array estructurado)"""
+        keys = self._index.get(self._device_id(topic))
+        if not keys:
+            return
+        self.messages += 1
+        if isinstance(payload, np.ndarray):
+            # Tramas binarias: el valor más reciente de cada canal enlazado
+            fields = payload.dtype.names or ()
+            values = {key: payload[key][-1] for key in keys if key in fields and len(payload)}
+        elif isinstance(payload, dict):
+            values = payload
+        else:
+            return
+        for key, callbacks in list(keys.items()):
+            value = values.get(key)
+            if value is None:
+                continue
+            for callback in callbacks:
+                try:
+                    callback(value)
+                except Exception:
+                    self.callback_errors += 1
+            self.deliveries += len(callbacks)
+
+    def _device_id(self, topic):
+        prefix, _, suffix = self.topic.partition("{device_id}")
+        return topic[len(prefix):len(topic) - len(suffix)]
+
+# Instancia global de DeviceFanout
+device_fanout = DeviceFanout()
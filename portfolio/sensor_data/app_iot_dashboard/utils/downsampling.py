@@ -0,0 +1,72 @@
+import numpy as np
+
+def minmax(ts, values, bucket_size):
+    """Envolvente mín/máx: conserva los dos extremos de cada bucket de bucket_size muestras"""
+    n = len(values)
+    if n <= 2 or bucket_size <= 1:
+        return ts, values
+
+    full = (n // bucket_size) * bucket_size
+    # Buckets completos como vista 2D (sin copia)
+    buckets = values[:full].reshape(-1, bucket_size)
+    offsets = np.arange(0, full, bucket_size)
+    lo = buckets.argmin(axis=1) + offsets
+    hi = buckets.argmax(axis=1) + offsets
+    if full < n:
+        tail = values[full:]
+        lo = np.append(lo, full + tail.argmin())
+        hi = np.append(hi, full + tail.argmax())
+
+    # Mantener el orden temporal dentro de cada bucket
+    indices = np.sort(np.stack([lo, hi], axis=1), axis=1).ravel()
+    return ts[indices], values[indices]
+
+def lttb(ts, values, n_out):
+    """Largest-Triangle-Three-Buckets: reduce la serie a n_out puntos conservando su forma"""
+    n = len(values)
+    if n_out >= n or n_out < 3:
+        return ts, values
+
+    # Límites de los n_out - 2 buckets intermedios (el primer y último punto se conservan)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    counts = np.diff(edges)
+    # Punto promedio de cada bucket, usado como tercer vértice del triángulo
+    avg_ts = np.add.reduceat(ts[:-1], edges[:-1]) / counts
+    avg_values = np.add.reduceat(values[:-1], edges[:-1]) / counts
+    avg_ts = np.append(avg_ts[1:], ts[-1])
+    avg_values = np.append(avg_values[1:], values[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        bucket_ts = ts[start:end]
+        bucket_values = values[start:end]
+        area = np.abs(
+            (ts[a] - avg_ts[i]) * (bucket_values - values[a])
+            - (ts[a] - bucket_ts) * (avg_values[i] - values[a])
+        )
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+    return ts[selected], values[selected]
+
+class DownsamplePyramid:
+    """Niveles precalculados de envolventes mín/máx para hacer zoom y desplazamiento sin recorrer la serie"""
+
+    def __init__(self, ts, values, factor=4, min_points=1024):
+        self.levels = [(ts, values)]
+        # Cada nivel reduce el anterior por factor, hasta quedar con pocos puntos
+        while len(self.levels[-1][1]) > min_points:
+            prev_ts, prev_values = self.levels[-1]
+            self.levels.append(minmax(prev_ts, prev_values, 2 * factor))
+
+    def query(self, start, end, max_points):
+        """Como mucho max_points puntos de la ventana [start, end]"""
+        for level_ts, level_values in self.levels:
+            lo = np.searchsorted(level_ts, start, side="left")
+            hi = np.searchsorted(level_ts, end, side="right")
+            # El primer nivel con pocos candidatos basta para un LTTB rápido
+            if hi - lo <= 4 * max_points or level_ts is self.levels[-1][0]:
+                return lttb(level_ts[lo:hi], level_values[lo:hi], max_points)
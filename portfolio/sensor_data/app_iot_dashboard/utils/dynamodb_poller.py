@@ -0,0 +1,254 @@
+import heapq
+import random
+import threading
+import time
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from config import DYNAMODB_TABLE
+
+# Límite de claves por llamada a batch_get_item
+BATCH_SIZE = 100
+
+# Errores con los que DynamoDB indica que estamos excediendo la capacidad
+THROTTLING_ERRORS = {"ProvisionedThroughputExceededException", "ThrottlingException", "RequestLimitExceeded"}
+
+class DynamoDBPoller:
+    """Un único hilo y un único cliente que consultan en lote las claves de todos los widgets.
+
+    El intervalo de cada clave se adapta: crece (hasta max_interval) mientras el valor no cambia
+    más que su banda muerta y vuelve al intervalo base en cuanto se mueve. Solo se avisa a los
+    widgets cuando el valor cambia.
+    """
+
+    def __init__(self, default_interval=5.0, max_interval=60.0, slowdown=1.5, max_backoff=30.0, max_pool_connections=10):
+        self.default_interval = default_interval
+        self.max_interval = max_interval
+        self.slowdown = slowdown
+        self.max_backoff = max_backoff
+        self.max_pool_connections = max_pool_connections
+        self._backoff = 0.0
+        self._dynamodb = None
+        self._subscriptions = {}  # (tabla, clave) -> {"callbacks": [...], "interval": s}
+        self._schedule = []  # heap de (próxima consulta, tabla, clave)
+        self._listeners = []  # Reciben cada versión nueva de los items leídos
+        self._seen = {}  # (tabla, clave) -> versión del último item avisado a los listeners
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+        # Contadores
+        self.requests = 0
+        self.items = 0
+        self.unchanged = 0
+        self.throttled = 0
+
+    @property
+    def dynamodb(self):
+        """Recurso de DynamoDB compartido, con pool de conexiones"""
+        if self._dynamodb is None:
+            self._dynamodb = boto3.resource(
+                "dynamodb", config=Config(max_pool_connections=self.max_pool_connections)
+            )
+        return self._dynamodb
+
+    def subscribe(self, key, callback, interval=None, deadband=0.0, table_name=DYNAMODB_TABLE):
+        """Consultar la clave cada `interval` segundos y entregar el item a callback(item) si cambió"""
+        series = (table_name, key)
+        with self._lock:
+            subscription = self._subscriptions.get(series)
+            if subscription is None:
+                subscription = {
+                    "callbacks": [],
+                    "interval": interval or self.default_interval,
+                    "current": interval or self.default_interval,
+                    "deadband": deadband,
+                    "last": None,
+                }
+                self._subscriptions[series] = subscription
+            else:
+                # Con varios widgets en la misma clave gana la configuración más exigente
+                if interval:
+                    subscription["interval"] = min(subscription["interval"], interval)
+                subscription["deadband"] = min(subscription["deadband"], deadband)
+            subscription["callbacks"].append(callback)
+            # Lectura inmediata y forzada para que el nuevo widget reciba el valor actual
+            subscription["force"] = True
+            subscription["current"] = subscription["interval"]
+            self._push(subscription, time.monotonic(), table_name, key)
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def add_listener(self, callback):
+        """Llamar a callback(table_name, item) con cada item de DynamoDB que cambió desde la última lectura"""
+        self._listeners.append(callback)
+
+    def unsubscribe(self, key, callback, table_name=DYNAMODB_TABLE):
+        """Quitar el callback; la clave deja de consultarse cuando no quedan widgets"""
+        series = (table_name, key)
+        with self._lock:
+            subscription = self._subscriptions.get(series)
+            if subscription is None:
+                return
+            try:
+                subscription["callbacks"].remove(callback)
+            except ValueError:
+                return
+            if not subscription["callbacks"]:
+                del self._subscriptions[series]  # Su entrada del heap se descarta al vencer
+                self._seen.pop(series, None)
+
+    def refresh(self, key, table_name=DYNAMODB_TABLE):
+        """Adelantar la próxima consulta de la clave y avisar a los widgets aunque no cambie"""
+        with self._lock:
+            subscription = self._subscriptions.get((table_name, key))
+            if subscription is None:
+                return
+            subscription["force"] = True
+            self._push(subscription, time.monotonic(), table_name, key)
+        self._wakeup.set()
+
+    def _push(self, subscription, due, table_name, key):
+        """Programar la clave; solo la entrada más reciente del heap es válida"""
+        subscription["due"] = due
+        heapq.heappush(self._schedule, (due, table_name, key))
+
+    def _run(self):
+        while True:
+            due = self._take_due()
+            if due:
+                self._poll(due)
+                continue
+            with self._lock:
+                wait = self._schedule[0][0] - time.monotonic() if self._schedule else None
+            self._wakeup.wait(wait)
+            self._wakeup.clear()
+
+    def _take_due(self):
+        """Sacar del heap las claves vencidas que siguen teniendo suscriptores"""
+        now = time.monotonic()
+        due = []
+        with self._lock:
+            while self._schedule and self._schedule[0][0] <= now:
+                when, table_name, key = heapq.heappop(self._schedule)
+                subscription = self._subscriptions.get((table_name, key))
+                if subscription is not None and subscription["due"] == when:
+                    due.append((table_name, key))
+        return due
+
+    def _poll(self, due):
+        """Consultar las claves vencidas en lotes de BATCH_SIZE y repartir los resultados"""
+        for i in range(0, len(due), BATCH_SIZE):
+            chunk = due[i:i + BATCH_SIZE]
+            request = {}
+            for table_name, key in chunk:
+                request.setdefault(table_name, {"Keys": []})["Keys"].append({"device_id": key})
+
+            found = {}
+            try:
+                while request:
+                    response = self.dynamodb.batch_get_item(RequestItems=request)
+                    self.requests += 1
+                    for table_name, items in response.get("Responses", {}).items():
+                        for item in items:
+                            found[(table_name, item["device_id"])] = item
+                    request = response.get("UnprocessedKeys") or {}
+                    if request:
+                        # Claves sin procesar: DynamoDB está limitando la capacidad
+                        self._throttle()
+                        time.sleep(self._jitter())
+                self._backoff = 0.0
+            except ClientError as e:
+                if e.response["Error"]["Code"] not in THROTTLING_ERRORS:
+                    print(f"❌ Error al consultar DynamoDB: {e}")
+                self._throttle()
+            except Exception as e:
+                print(f"❌ Error al consultar DynamoDB: {e}")
+
+            self.items += len(found)
+            self._notify_listeners(found)
+            self._dispatch(chunk, found)
+            self._reschedule(chunk)
+
+    def _throttle(self):
+        """Duplicar el backoff global tras una limitación de capacidad"""
+        self.throttled += 1
+        self._backoff = min(self.max_backoff, max(1.0, self._backoff * 2))
+
+    def _jitter(self):
+        return random.uniform(0, self._backoff)
+
+    def _notify_listeners(self, found):
+        for series, item in found.items():
+            # Un item sin cambios (misma versión o timestamp) no es una muestra nueva
+            version = self._version(item)
+            if self._seen.get(series) == version:
+                continue
+            self._seen[series] = version
+            for callback in self._listeners:
+                try:
+                    callback(series[0], item)
+                except Exception as e:
+                    print(f"❌ Error en el listener de DynamoDB: {e}")
+
+    def _dispatch(self, chunk, found):
+        """Avisar a los widgets de las claves cuyo valor cambió y ajustar su intervalo"""
+        for series in chunk:
+            item = found.get(series)
+            if item is None:
+                continue
+            with self._lock:
+                subscription = self._subscriptions.get(series)
+                if subscription is None:
+                    continue
+                value = item.get("sensor_value")
+                changed = subscription["force"] or not self._within_deadband(
+                    subscription["last"], value, subscription["deadband"]
+                )
+                subscription["force"] = False
+                if changed:
+                    subscription["last"] = value
+                    subscription["current"] = subscription["interval"]
+                    callbacks = list(subscription["callbacks"])
+                else:
+                    # Serie estable: consultarla cada vez menos
+                    subscription["current"] = min(self.max_interval, subscription["current"] * self.slowdown)
+                    callbacks = []
+            if not changed:
+                self.unchanged += 1
+            for callback in callbacks:
+                try:
+                    callback(item)
+                except Exception as e:
+                    print(f"❌ Error en el widget de {series[1]}: {e}")
+
+    @staticmethod
+    def _version(item):
+        """Versión o timestamp del item; sin ninguno de los dos, el item completo"""
+        version = (item.get("version"), item.get("timestamp"))
+        return version if version != (None, None) else item
+
+    @staticmethod
+    def _within_deadband(last, value, deadband):
+        if last is None:
+            return False
+        try:
+            return abs(float(value) - float(last)) <= deadband
+        except (TypeError, ValueError):
+            return value == last
+
+    def _reschedule(self, chunk):
+        # Tras una limitación se suma un retraso aleatorio para no reintentar todos a la vez
+        now = time.monotonic()
+        with self._lock:
+            for table_name, key in chunk:
+                subscription = self._subscriptions.get((table_name, key))
+                if subscription is not None:
+                    delay = subscription["current"] + (self._jitter() if self._backoff else 0.0)
+                    self._push(subscription, now + delay, table_name, key)
+
+# Instancia global de DynamoDBPoller
+dynamodb_poller = DynamoDBPoller()
@@ -0,0 +1,220 @@
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+from config import INGEST_WAL_DIR, INGEST_GROUP_SIZE, INGEST_GROUP_MS, INGEST_MAX_GROUP, INGEST_MAX_PENDING, INGEST_FSYNC
+from utils.telemetry_store import message_samples
+from utils.telemetry_archive import telemetry_archive
+
+# Formato de cada grupo: cabecera | registros | crc32 de los registros
+FRAME_MAGIC = b"WAL1"
+FRAME_HEADER = struct.Struct("<4sII")  # magic, número de registros, bytes de registros
+FRAME_CRC = struct.Struct("<I")
+RECORD = struct.Struct("<ddHH")  # timestamp, valor, bytes de device_id, bytes de key
+SEGMENT_BYTES = 16 * 1024 * 1024
+
+class IngestWAL:
+    """Etapa de ingesta entre MQTT y el archivo de telemetría, con write-ahead log y group commit.
+
+    Las muestras se acumulan y un único hilo las escribe al WAL en grupos (al llegar a group_size
+    o tras group_ms, como mucho max_group por grupo), con un write y un fsync por grupo, antes de pasarlas al archivo. Al arrancar
+    se reproducen los segmentos que el archivo no llegó a guardar. La cola está acotada: si el
+    disco no da abasto, put() nunca bloquea (se llama desde el hilo de red de MQTT) sino que
+    descarta las muestras nuevas y, si hay control de flujo, pide al gestor que deje de leer
+    del socket hasta que se vacíe la cola.
+    """
+
+    def __init__(self, sink=telemetry_archive, directory=INGEST_WAL_DIR, group_size=INGEST_GROUP_SIZE,
+                 group_ms=INGEST_GROUP_MS, max_group=INGEST_MAX_GROUP, max_pending=INGEST_MAX_PENDING,
+                 fsync=INGEST_FSYNC, segment_bytes=SEGMENT_BYTES):
+        self.sink = sink  # append_batch(samples), flush() y last_timestamp(device_id, key)
+        self.directory = directory
+        self.group_size = group_size
+        self.group_ms = group_ms
+        self.max_group = max_group  # 0 = todo lo pendiente en un grupo; 1 = sin group commit
+        self.max_pending = max_pending
+        self.fsync = fsync
+        self.segment_bytes = segment_bytes
+        self._batch = deque()  # (device_id, key, valor, timestamp) aún sin escribir
+        self._cond = threading.Condition()
+        self._thread = None
+        self._segment = None
+        self._segment_seq = 0
+        self._pause = None
+        self._resume = None
+        self._paused = False
+
+        # Contadores
+        self.samples = 0
+        self.groups = 0
+        self.paused = 0
+        self.dropped = 0
+        self.rejected = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def set_flow_control(self, pause, resume):
+        """Funciones del gestor MQTT para dejar de leer y volver a leer del socket"""
+        self._pause = pause
+        self._resume = resume
+
+    def start(self):
+        """Reproducir el WAL pendiente y arrancar el hilo de escritura"""
+        if self._thread is not None:
+            return
+        self.replay()
+        self._open_segment()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def put(self, device_id, key, value, timestamp=None):
+        """Encolar una muestra sin bloquear; con la cola llena se descarta y se pausa MQTT"""
+        if timestamp is None:
+            timestamp = time.time()
+        with self._cond:
+            if len(self._batch) >= self.max_pending:
+                self.dropped += 1
+            else:
+                self._batch.append((device_id, key, value, timestamp))
+                if len(self._batch) >= self.group_size:
+                    self._cond.notify_all()
+            pause = len(self._batch) >= self.max_pending and not self._paused
+            if pause:
+                self._paused = True
+                self.paused += 1
+        if pause and self._pause:
+            self._pause()
+
+    def on_mqtt_message(self, topic, payload):
+        """Listener de MQTTManager: ver telemetry_store.message_samples"""
+        samples = message_samples(topic, payload)
+        if not samples:
+            self.rejected += 1
+        now = time.time()
+        for device_id, key, value in samples:
+            self.put(device_id, key, value, now)
+
+    def on_dynamodb_item(self, table_name, item):
+        """Listener de DynamoDBPoller: cada lectura de sensor_value como muestra de la serie"""
+        try:
+            value = float(item["sensor_value"])
+            timestamp = item.get("timestamp")
+            timestamp = float(timestamp) if timestamp is not None else None
+        except (KeyError, TypeError, ValueError):
+            self.rejected += 1
+            return
+        self.put(item["device_id"], "sensor_value", value, timestamp)
+
+    def replay(self):
+        """Pasar al archivo las muestras del WAL que no llegó a guardar y borrar los segmentos"""
+        segments = self._segments()
+        replayed = 0
+        for path in segments:
+            for samples in self._read_frames(path):
+                # Lo que el archivo ya tiene en disco no se repite
+                last = {}
+                fresh = []
+                for sample in samples:
+                    series = sample[:2]
+                    if series not in last:
+                        last[series] = self.sink.last_timestamp(*series)
+                    if last[series] is None or sample[3] > last[series]:
+                        fresh.append(sample)
+                self.sink.append_batch(fresh)
+                replayed += len(fresh)
+        if segments:
+            self.sink.flush()
+            for path in segments:
+                os.remove(path)
+            print(f"ℹ️ WAL reproducido: {replayed} muestras")
+        self._segment_seq = int(os.path.basename(segments[-1])[4:12]) + 1 if segments else 0
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if len(self._batch) < self.group_size:
+                    self._cond.wait(self.group_ms / 1000)
+                n = min(len(self._batch), self.max_group) if self.max_group else len(self._batch)
+                batch = [self._batch.popleft() for _ in range(n)]
+                resume = self._paused and len(self._batch) < self.max_pending
+                if resume:
+                    self._paused = False
+            if batch:
+                try:
+                    self._commit(batch)
+                except Exception as e:
+                    # El hilo no puede morir: de él depende reanudar la lectura de MQTT
+                    print(f"❌ Error al escribir el WAL de telemetría: {e}")
+            if resume and self._resume:
+                self._resume()
+
+    def _commit(self, batch):
+        """Un write (y un fsync) para todo el grupo; después se pasa al archivo"""
+        records = bytearray()
+        for device_id, key, value, timestamp in batch:
+            device_bytes = device_id.encode()
+            key_bytes = key.encode()
+            records += RECORD.pack(timestamp, value, len(device_bytes), len(key_bytes))
+            records += device_bytes
+            records += key_bytes
+        frame = FRAME_HEADER.pack(FRAME_MAGIC, len(batch), len(records)) + records + FRAME_CRC.pack(zlib.crc32(records))
+        self._segment.write(frame)
+        self._segment.flush()
+        if self.fsync:
+            os.fsync(self._segment.fileno())
+        self.sink.append_batch(batch)
+        self.samples += len(batch)
+        self.groups += 1
+        if self._segment.tell() >= self.segment_bytes:
+            self._checkpoint()
+
+    def _checkpoint(self):
+        """Con el archivo al día, los segmentos anteriores del WAL ya no hacen falta"""
+        self.sink.flush()
+        old = self._segment.name
+        self._segment.close()
+        self._open_segment()
+        os.remove(old)
+
+    def _open_segment(self):
+        path = os.path.join(self.directory, f"wal-{self._segment_seq:08d}.log")
+        self._segment_seq += 1
+        self._segment = open(path, "ab")
+
+    def _segments(self):
+        names = sorted(name for name in os.listdir(self.directory) if name.startswith("wal-") and name.endswith(".log"))
+        return [os.path.join(self.directory, name) for name in names]
+
+    @staticmethod
+    def _read_frames(path):
+        """Grupos válidos de un segmento; se detiene en el primero incompleto o corrupto"""
+        with open(path, "rb") as f:
+            data = f.read()
+        offset = 0
+        while offset + FRAME_HEADER.size <= len(data):
+            magic, count, size = FRAME_HEADER.unpack_from(data, offset)
+            start = offset + FRAME_HEADER.size
+            end = start + size + FRAME_CRC.size
+            if magic != FRAME_MAGIC or end > len(data):
+                break
+            records = data[start:start + size]
+            if FRAME_CRC.unpack_from(data, start + size)[0] != zlib.crc32(records):
+                break
+            samples = []
+            pos = 0
+            for _ in range(count):
+                timestamp, value, device_len, key_len = RECORD.unpack_from(records, pos)
+                pos += RECORD.size
+                device_id = records[pos:pos + device_len].decode()
+                pos += device_len
+                key = records[pos:pos + key_len].decode()
+                pos += key_len
+                samples.append((device_id, key, value, timestamp))
+            yield samples
+            offset = end
+        if offset < len(data):
+            print(f"⚠️ Grupo incompleto al final de {path}, se descartan {len(data) - offset} bytes")
+
+# Instancia global de IngestWAL
+ingest_wal = IngestWAL()
@@ -0,0 +1,63 @@
+from config import MQTT_CODECS
+from utils.topic_router import TopicRouter
+from utils.payload_codecs import CodecRouter, parse_codecs
+
+class MQTTManagerBase:
+    """Despacho común a MQTTManager y AsyncMQTTManager: suscriptores, codecs y listeners.
+
+    Cada gestor pone la red (hilo de paho o event loop) y llama a _init_dispatch() en su __init__.
+    """
+
+    def _init_dispatch(self):
+        self.router = TopicRouter()
+        self.codecs = CodecRouter()
+        for topic_filter, codec in parse_codecs(MQTT_CODECS):
+            self.codecs.set(topic_filter, codec)
+        self.callback_errors = 0
+        self.decode_errors = 0
+        self._publish_listeners = []
+        self._message_listeners = ()  # Reciben los mensajes de todos los tópicos suscritos
+
+    def set_codec(self, topic_filter, codec):
+        """Decodificar los payloads de los tópicos del filtro con codec (ver utils.payload_codecs)"""
+        self.codecs.set(topic_filter, codec)
+
+    def add_message_listener(self, callback):
+        """Llamar a callback(topic, payload decodificado) con cada mensaje de un tópico que tenga suscriptores.
+
+        No agrega suscripciones al broker: recibe lo mismo que los widgets y una sola vez por mensaje.
+        """
+        self._message_listeners += (callback,)
+
+    def add_publish_listener(self, callback):
+        """Llamar a callback(mid) cuando el broker confirma una publicación (o al enviarla con QoS 0)"""
+        self._publish_listeners.append(callback)
+
+    def on_publish(self, client, userdata, mid):
+        for callback in self._publish_listeners:
+            try:
+                callback(mid)
+            except Exception:
+                self.callback_errors += 1
+
+    def on_message(self, client, userdata, message):
+        """Callback cuando se recibe un mensaje MQTT (ruta crítica: sin logs)"""
+        topic = message.topic
+        callbacks = self.router.match(topic)
+        if not callbacks:
+            return
+        # Se decodifica una sola vez para todos los callbacks del tópico
+        codec = self.codecs.get(topic)
+        if codec is None:
+            payload = message.payload
+        else:
+            try:
+                payload = codec.decode(message.payload)
+            except Exception:
+                self.decode_errors += 1
+                return
+        for callback in callbacks + self._message_listeners:
+            try:
+                callback(topic, payload)
+            except Exception:
+                self.callback_errors += 1
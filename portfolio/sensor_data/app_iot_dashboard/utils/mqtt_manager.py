@@ -1,32 +1,51 @@
 import paho.mqtt.client as mqtt
-from config import AWS_IOT_ENDPOINT, MQTT_USERNAME, MQTT_PASSWORD
+from config import AWS_IOT_ENDPOINT, MQTT_USERNAME, MQTT_PASSWORD, MQTT_ASYNC
+from utils.mqtt_base import MQTTManagerBase
 
-class MQTTManager:
+class MQTTManager(MQTTManagerBase):
     def __init__(self):
         self.client = mqtt.Client()
         self.client.username_pw_set(MQTT_USERNAME, MQTT_PASSWORD)
         self.client.on_connect = self.on_connect
         self.client.on_message = self.on_message
+        self.client.on_publish = self.on_publish
+        self._init_dispatch()
         self.connect()
 
     def on_connect(self, client, userdata, flags, rc):
         """Callback cuando el cliente se conecta a MQTT"""
         print(f"Conectado a AWS IoT Core con código {rc}")
-        client.subscribe("iot/#")  # Suscribirse a todos los tópicos
+        # Suscribirse solo a los tópicos que tienen widgets vivos (también tras reconectar)
+        for topic_filter in self.router.filters():
+            client.subscribe(topic_filter)
 
-    def on_message(self, client, userdata, message):
-        """Callback cuando se recibe un mensaje MQTT"""
-        print(f"Mensaje recibido en {message.topic}: {message.payload.decode()}")
+    def subscribe(self, topic_filter, callback):
+        """Registrar un callback(topic, payload decodificado); se suscribe al broker con el primer suscriptor"""
+        if self.router.add(topic_filter, callback):
+            self.client.subscribe(topic_filter)
+
+    def unsubscribe(self, topic_filter, callback):
+        """Quitar un callback; se desuscribe del broker al quedar sin suscriptores"""
+        if self.router.remove(topic_filter, callback):
+            self.client.unsubscribe(topic_filter)
 
     def publish(self, topic, message):
         """Publicar un mensaje en MQTT"""
         self.client.publish(topic, message)
         print(f"Publicado en {topic}: {message}")
 
+    def send(self, topic, payload, qos=0):
+        """Publicar sin log y devolver el mid del mensaje para seguir su confirmación"""
+        return self.client.publish(topic, payload, qos=qos).mid
+
     def connect(self):
         """Conectar al broker MQTT"""
         self.client.connect(AWS_IOT_ENDPOINT, 8883)
         self.client.loop_start()
 
-# Instancia global de MQTTManager
-mqtt_manager = MQTTManager()
+# Instancia global: con MQTT_ASYNC no se conecta hasta que main() la engancha al loop
+if MQTT_ASYNC:
+    from utils.async_mqtt_manager import AsyncMQTTManager
+    mqtt_manager = AsyncMQTTManager()
+else:
+    mqtt_manager = MQTTManager()
@@ -0,0 +1,120 @@
+import json
+import struct
+import numpy as np
+from utils.topic_router import TopicRouter
+
+# Dependencias opcionales: se usan si están instaladas
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+class AsciiFloatCodec:
+    """Un número en texto: b"0.42" -> 0.42"""
+
+    def decode(self, payload):
+        return float(payload)
+
+class JsonCodec:
+    """JSON con orjson si está disponible"""
+
+    def decode(self, payload):
+        if orjson is not None:
+            return orjson.loads(payload)
+        return json.loads(payload)
+
+class CborCodec:
+    def __init__(self):
+        if cbor2 is None:
+            raise ImportError("CborCodec necesita el paquete cbor2")
+
+    def decode(self, payload):
+        return cbor2.loads(payload)
+
+class MsgPackCodec:
+    def __init__(self):
+        if msgpack is None:
+            raise ImportError("MsgPackCodec necesita el paquete msgpack")
+
+    def decode(self, payload):
+        return msgpack.unpackb(payload, raw=False)
+
+class StructCodec:
+    """Trama de formato fijo de struct con un valor por canal: {canal: valor}"""
+
+    def __init__(self, fmt, fields):
+        self.struct = struct.Struct(fmt)
+        self.fields = tuple(fields)
+
+    def decode(self, payload):
+        return dict(zip(self.fields, self.struct.unpack(payload)))
+
+class DtypeCodec:
+    """Tramas binarias de muchos canales decodificadas de una vez con NumPy.
+
+    El payload son una o más tramas seguidas con el dtype estructurado dado (p. ej.
+    [("ts", "<f8"), ("ch0", "<f4"), ...]); devuelve un array estructurado sin copiar el payload.
+    """
+
+    def __init__(self, dtype, offset=0):
+        self.dtype = np.dtype(dtype)
+        self.offset = offset  # Bytes de cabecera a saltar
+
+    def decode(self, payload):
+        return np.frombuffer(payload, dtype=self.dtype, offset=self.offset)
+
+def make_codec(spec):
+    """Codec a partir de su descripción: float, json, cbor, msgpack, struct:<fmt>:<canales> o dtype:<tipos>:<canales>"""
+    name, _, args = spec.partition(":")
+    if name == "float":
+        return AsciiFloatCodec()
+    if name == "json":
+        return JsonCodec()
+    if name == "cbor":
+        return CborCodec()
+    if name == "msgpack":
+        return MsgPackCodec()
+    if name == "struct":
+        fmt, _, fields = args.partition(":")
+        return StructCodec(fmt, fields.split(","))
+    if name == "dtype":
+        types, _, fields = args.partition(":")
+        return DtypeCodec(list(zip(fields.split(","), types.split(","))))
+    raise ValueError(f"Codec desconocido: {spec}")
+
+def parse_codecs(spec):
+    """[(filtro, codec), ...] a partir de una especificación como iot/+=float;iot/+/frame=dtype:<f8,<f4:ts,a"""
+    codecs = []
+    for entry in filter(None, (part.strip() for part in spec.split(";"))):
+        topic_filter, _, codec_spec = entry.partition("=")
+        codecs.append((topic_filter.strip(), make_codec(codec_spec.strip())))
+    return codecs
+
+class CodecRouter:
+    """Codec de cada tópico según su filtro; si varios coinciden gana el más específico"""
+
+    def __init__(self):
+        self._router = TopicRouter()
+        self._order = 0
+
+    def set(self, topic_filter, codec):
+        levels = topic_filter.split("/")
+        # Menos comodines, luego más niveles, luego el registrado más tarde
+        rank = (-sum(level in ("+", "#") for level in levels), len(levels), self._order)
+        self._order += 1
+        self._router.add(topic_filter, (rank, codec))
+
+    def get(self, topic):
+        """Codec del tópico o None para entregar el payload sin decodificar"""
+        matches = self._router.match(topic)
+        if not matches:
+            return None
+        return max(matches, key=lambda match: match[0])[1]
@@ -0,0 +1,235 @@
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import quote, unquote
+import numpy as np
+from config import TELEMETRY_ARCHIVE_DIR, TELEMETRY_CHUNK_SIZE, TELEMETRY_FLUSH_S
+
+# Formato de cada chunk: cabecera | n timestamps float64 | n valores float64 | pie con el resumen
+CHUNK_MAGIC = b"TSC1"
+HEADER = struct.Struct("<4sI")  # magic, n
+FOOTER = struct.Struct("<4sIdddd")  # magic, n, t_min, t_max, v_min, v_max
+EXTENSION = ".tsc"
+# Series con su mmap abierto a la vez (cada mmap retiene un descriptor de archivo)
+MAX_OPEN_MAPS = 128
+
+class SeriesFile:
+    """Archivo append-only de una serie, leído mediante mmap"""
+
+    def __init__(self, path):
+        self.path = path
+        self.chunks = []  # (offset de los datos, n, t_min, t_max, v_min, v_max)
+        self._mmap = None
+        self._mapped = 0
+        self.size = self._scan()
+
+    def _scan(self):
+        """Leer solo cabeceras y pies; un chunk incompleto (escritura cortada) se trunca"""
+        if not os.path.exists(self.path):
+            return 0
+        size = os.path.getsize(self.path)
+        offset = 0
+        with open(self.path, "rb") as f:
+            while offset + HEADER.size <= size:
+                f.seek(offset)
+                magic, n = HEADER.unpack(f.read(HEADER.size))
+                end = offset + HEADER.size + 16 * n + FOOTER.size
+                if magic != CHUNK_MAGIC or end > size:
+                    break
+                f.seek(end - FOOTER.size)
+                footer = FOOTER.unpack(f.read(FOOTER.size))
+                if footer[0] != CHUNK_MAGIC or footer[1] != n:
+                    break
+                self.chunks.append((offset + HEADER.size, *footer[1:]))
+                offset = end
+        if offset < size:
+            print(f"⚠️ Chunk incompleto en {self.path}, se descartan {size - offset} bytes")
+            os.truncate(self.path, offset)
+        return offset
+
+    def append_chunk(self, ts, values):
+        """Escribir un chunk columnar con su pie de mínimos, máximos y rango de tiempo"""
+        n = len(ts)
+        footer = (CHUNK_MAGIC, n, ts[0], ts[-1], values.min(), values.max())
+        data = HEADER.pack(CHUNK_MAGIC, n) + ts.tobytes() + values.tobytes() + FOOTER.pack(*footer)
+        with open(self.path, "ab") as f:
+            f.write(data)
+        self.chunks.append((self.size + HEADER.size, *footer[1:]))
+        self.size += len(data)
+
+    def window(self, start=None, end=None):
+        """Vistas sobre el mmap de los chunks que se solapan con [start, end]"""
+        selected = [
+            chunk for chunk in self.chunks
+            if (start is None or chunk[3] >= start) and (end is None or chunk[2] <= end)
+        ]
+        if not selected:
+            return []
+        buffer = self._map()
+        views = []
+        for offset, n, t_min, t_max, _, _ in selected:
+            ts = np.frombuffer(buffer, dtype=np.float64, count=n, offset=offset)
+            values = np.frombuffer(buffer, dtype=np.float64, count=n, offset=offset + 8 * n)
+            # Solo los chunks de los bordes necesitan recortarse
+            lo = 0 if start is None or t_min >= start else np.searchsorted(ts, start, side="left")
+            hi = n if end is None or t_max <= end else np.searchsorted(ts, end, side="right")
+            views.append((ts[lo:hi], values[lo:hi]))
+        return views
+
+    @property
+    def mapped(self):
+        return self._mmap is not None
+
+    def release(self):
+        """Soltar el mmap; se cierra (con su descriptor) cuando no quedan vistas que lo usen"""
+        self._mmap = None
+        self._mapped = 0
+
+    def _map(self):
+        # Se vuelve a mapear solo si el archivo creció; las vistas anteriores mantienen vivo su mmap
+        if self._mmap is None or self._mapped < self.size:
+            with open(self.path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), self.size, access=mmap.ACCESS_READ)
+            self._mapped = self.size
+        return self._mmap
+
+class TelemetryArchive:
+    """Historial persistente de telemetría: un archivo columnar por (device_id, key), en chunks.
+
+    Las muestras se acumulan en memoria y se escriben como un chunk al llegar a chunk_size o
+    cada flush_interval segundos. Las lecturas solo tocan los chunks del rango pedido.
+    """
+
+    def __init__(self, directory=TELEMETRY_ARCHIVE_DIR, chunk_size=TELEMETRY_CHUNK_SIZE, flush_interval=TELEMETRY_FLUSH_S,
+                 max_open_maps=MAX_OPEN_MAPS):
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self.flush_interval = flush_interval
+        self.max_open_maps = max_open_maps
+        self._files = {}  # (device_id, key) -> SeriesFile
+        self._open_maps = OrderedDict()  # Series con mmap abierto, de la menos a la más usada
+        self._pending = {}  # (device_id, key) -> ([timestamps], [valores]) sin escribir
+        self._lock = threading.Lock()
+        self._thread = None
+        os.makedirs(directory, exist_ok=True)
+
+    def append(self, device_id, key, value, timestamp=None):
+        """Agregar una muestra; se escribe a disco con el siguiente chunk de la serie"""
+        if timestamp is None:
+            timestamp = time.time()
+        self.append_batch([(device_id, key, value, timestamp)])
+
+    def append_batch(self, samples):
+        """Agregar muestras (device_id, key, valor, timestamp) tomando el lock una sola vez"""
+        with self._lock:
+            for device_id, key, value, timestamp in samples:
+                ts, values = self._pending.setdefault((device_id, key), ([], []))
+                ts.append(timestamp)
+                values.append(value)
+                if len(ts) >= self.chunk_size:
+                    self._write((device_id, key))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def last_timestamp(self, device_id, key):
+        """Timestamp más reciente ya escrito en disco, o None"""
+        series = (device_id, key)
+        with self._lock:
+            if not self._exists(series):
+                return None
+            chunks = self._file(series).chunks
+            return max(chunk[3] for chunk in chunks) if chunks else None
+
+    def window(self, device_id, key, start=None, end=None):
+        """(timestamps, valores) del rango; sin copia si cae en un solo chunk del disco"""
+        series = (device_id, key)
+        with self._lock:
+            views = self._read(series, start, end) if self._exists(series) else []
+            pending = self._pending.get(series)
+            if pending and pending[0]:
+                ts = np.array(pending[0], dtype=np.float64)
+                values = np.array(pending[1], dtype=np.float64)
+                mask = np.ones(len(ts), dtype=bool)
+                if start is not None:
+                    mask &= ts >= start
+                if end is not None:
+                    mask &= ts <= end
+                if mask.any():
+                    views.append((ts[mask], values[mask]))
+        if not views:
+            empty = np.empty(0, dtype=np.float64)
+            return empty, empty
+        if len(views) == 1:
+            return views[0]
+        ts = np.concatenate([v[0] for v in views])
+        values = np.concatenate([v[1] for v in views])
+        if np.any(ts[1:] < ts[:-1]):
+            # Chunks solapados por muestras que llegaron tarde
+            order = np.argsort(ts, kind="stable")
+            ts, values = ts[order], values[order]
+        return ts, values
+
+    def series(self):
+        """Claves (device_id, key) de las series archivadas"""
+        names = [name for name in os.listdir(self.directory) if name.endswith(EXTENSION)]
+        with self._lock:
+            found = set(self._pending)
+        for name in names:
+            device_id, _, key = name[:-len(EXTENSION)].partition("@")
+            found.add((unquote(device_id), unquote(key)))
+        return sorted(found)
+
+    def flush(self):
+        """Escribir todas las muestras pendientes"""
+        with self._lock:
+            for series in list(self._pending):
+                self._write(series)
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except OSError as e:
+                print(f"❌ Error al escribir el historial de telemetría: {e}")
+
+    def _write(self, series):
+        ts, values = self._pending.pop(series, ([], []))
+        if not ts:
+            return
+        # Las muestras pueden llegar desordenadas (MQTT y DynamoDB); cada chunk va ordenado por tiempo
+        ts = np.array(ts, dtype=np.float64)
+        values = np.array(values, dtype=np.float64)
+        order = np.argsort(ts, kind="stable")
+        self._file(series).append_chunk(ts[order], values[order])
+
+    def _read(self, series, start, end):
+        """Vistas del archivo de la serie; solo las max_open_maps series más usadas quedan mapeadas"""
+        file = self._file(series)
+        views = file.window(start, end)
+        if file.mapped:
+            self._open_maps[series] = file
+            self._open_maps.move_to_end(series)
+            while len(self._open_maps) > self.max_open_maps:
+                self._open_maps.popitem(last=False)[1].release()
+        return views
+
+    def _exists(self, series):
+        return series in self._files or os.path.exists(self._path(series))
+
+    def _file(self, series):
+        file = self._files.get(series)
+        if file is None:
+            file = self._files[series] = SeriesFile(self._path(series))
+        return file
+
+    def _path(self, series):
+        device_id, key = series
+        return os.path.join(self.directory, f"{quote(device_id, safe='')}@{quote(key, safe='')}{EXTENSION}")
+
+# Instancia global de TelemetryArchive
+telemetry_archive = TelemetryArchive()
@@ -0,0 +1,147 @@
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from config import TELEMETRY_CAPACITY, TELEMETRY_MAX_MB
+
+def split_topic(topic):
+    """iot/{device_id}/{key} -> (device_id, key); iot/{key} -> ("", key)"""
+    device_id, _, key = topic.partition("/")[2].rpartition("/")
+    return device_id, key
+
+def message_samples(topic, payload):
+    """Muestras (device_id, key, valor) de un mensaje ya decodificado.
+
+    Un float ASCII en iot/{device_id}/{key} o iot/{key}, o un mapa de estado {clave: valor}
+    (o array estructurado) en el tópico de estado del dispositivo.
+    """
+    device_id, key = split_topic(topic)
+    if isinstance(payload, dict):
+        items = payload.items()
+    elif isinstance(payload, np.ndarray):
+        # Tramas binarias: el valor más reciente de cada canal
+        items = [(name, payload[name][-1]) for name in payload.dtype.names or () if len(payload)]
+    else:
+        try:
+            return [(device_id, key, float(payload))]
+        except (TypeError, ValueError):
+            return []
+    # Solo las claves numéricas; las de texto del estado (p. ej. firmware) no son series
+    return [(device_id, str(name), float(value)) for name, value in items if isinstance(value, (int, float, np.number))]
+
+class RingBuffer:
+    """Buffer circular preasignado de muestras (timestamp, valor)"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        # Cada muestra se escribe en i y en i + capacity: cualquier ventana es un slice contiguo
+        self._ts = np.zeros(2 * capacity, dtype=np.float64)
+        self._values = np.zeros(2 * capacity, dtype=np.float64)
+        self._head = 0
+        self.size = 0
+
+    @property
+    def nbytes(self):
+        return self._ts.nbytes + self._values.nbytes
+
+    def append(self, timestamp, value):
+        """Agregar una muestra en O(1)"""
+        i = self._head
+        j = i + self.capacity
+        self._ts[i] = self._ts[j] = timestamp
+        self._values[i] = self._values[j] = value
+        self._head = i + 1 if i + 1 < self.capacity else 0
+        if self.size < self.capacity:
+            self.size += 1
+
+    def extend(self, timestamps, values):
+        """Agregar un bloque de muestras de una vez"""
+        timestamps = np.asarray(timestamps, dtype=np.float64)[-self.capacity:]
+        values = np.asarray(values, dtype=np.float64)[-self.capacity:]
+        n = len(timestamps)
+        positions = (self._head + np.arange(n)) % self.capacity
+        self._ts[positions] = self._ts[positions + self.capacity] = timestamps
+        self._values[positions] = self._values[positions + self.capacity] = values
+        self._head = (self._head + n) % self.capacity
+        self.size = min(self.capacity, self.size + n)
+
+    def arrays(self):
+        """Vistas (sin copia) de los timestamps y valores, de la muestra más antigua a la más nueva"""
+        start = (self._head - self.size) % self.capacity
+        end = start + self.size
+        return self._ts[start:end], self._values[start:end]
+
+    def window(self, start=None, end=None):
+        """Vistas (sin copia) de las muestras con start <= timestamp <= end"""
+        ts, values = self.arrays()
+        lo = 0 if start is None else np.searchsorted(ts, start, side="left")
+        hi = len(ts) if end is None else np.searchsorted(ts, end, side="right")
+        return ts[lo:hi], values[lo:hi]
+
+class TelemetryStore:
+    """Historial en memoria por (device_id, key) con límite de memoria y expulsión LRU"""
+
+    def __init__(self, capacity=TELEMETRY_CAPACITY, max_bytes=TELEMETRY_MAX_MB * 1024 * 1024):
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self._series = OrderedDict()  # De la serie más fría a la más reciente
+        self._lock = threading.Lock()
+        self.evicted = 0
+        self.rejected = 0
+
+    def append(self, device_id, key, value, timestamp=None):
+        """Agregar una muestra a la serie (la crea si no existe)"""
+        if timestamp is None:
+            timestamp = time.time()
+        with self._lock:
+            self._get_or_create((device_id, key)).append(timestamp, value)
+
+    def extend(self, device_id, key, timestamps, values):
+        """Agregar un bloque de muestras a la serie"""
+        with self._lock:
+            self._get_or_create((device_id, key)).extend(timestamps, values)
+
+    def window(self, device_id, key, start=None, end=None):
+        """Vistas (timestamps, valores) de una serie; válidas hasta que el buffer da la vuelta"""
+        with self._lock:
+            buffer = self._series.get((device_id, key))
+            if buffer is None:
+                empty = np.empty(0, dtype=np.float64)
+                return empty, empty
+            self._series.move_to_end((device_id, key))
+            return buffer.window(start, end)
+
+    def series(self):
+        """Claves (device_id, key) de las series almacenadas"""
+        with self._lock:
+            return list(self._series)
+
+    def memory_usage(self):
+        with self._lock:
+            return sum(buffer.nbytes for buffer in self._series.values())
+
+    def on_mqtt_message(self, topic, payload):
+        """Listener de MQTTManager: ver message_samples"""
+        samples = message_samples(topic, payload)
+        if not samples:
+            self.rejected += 1
+        now = time.time()
+        for device_id, key, value in samples:
+            self.append(device_id, key, value, now)
+
+    def _get_or_create(self, series_key):
+        buffer = self._series.get(series_key)
+        if buffer is not None:
+            self._series.move_to_end(series_key)
+            return buffer
+
+        buffer = RingBuffer(self.capacity)
+        # Expulsar las series menos usadas hasta que quepa la nueva
+        while self._series and (len(self._series) + 1) * buffer.nbytes > self.max_bytes:
+            self._series.popitem(last=False)
+            self.evicted += 1
+        self._series[series_key] = buffer
+        return buffer
+
+# Instancia global de TelemetryStore
+telemetry_store = TelemetryStore()
@@ -0,0 +1,101 @@
+import threading
+
+class _Node:
+    __slots__ = ("children", "subscribers")
+
+    def __init__(self):
+        self.children = {}
+        self.subscribers = []
+
+class TopicRouter:
+    """Registro de suscripciones MQTT en un trie de tópicos con soporte de comodines (+ y #)"""
+
+    def __init__(self, cache_size=65536):
+        self._root = _Node()
+        self._filters = {}  # filtro -> número de suscriptores vivos
+        self._cache = {}  # tópico -> tupla de callbacks ya resueltos
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+
+    def add(self, topic_filter, callback):
+        """Registrar un callback; devuelve True si el filtro no tenía suscriptores"""
+        with self._lock:
+            node = self._root
+            for level in topic_filter.split("/"):
+                node = node.children.setdefault(level, _Node())
+            node.subscribers.append(callback)
+            count = self._filters.get(topic_filter, 0) + 1
+            self._filters[topic_filter] = count
+            self._cache = {}
+            return count == 1
+
+    def remove(self, topic_filter, callback):
+        """Quitar un callback; devuelve True si el filtro se quedó sin suscriptores"""
+        with self._lock:
+            path = [self._root]
+            for level in topic_filter.split("/"):
+                node = path[-1].children.get(level)
+                if node is None:
+                    return False
+                path.append(node)
+            try:
+                path[-1].subscribers.remove(callback)
+            except ValueError:
+                return False
+
+            # Podar las ramas que quedaron vacías
+            levels = topic_filter.split("/")
+            for i in range(len(levels), 0, -1):
+                node = path[i]
+                if node.subscribers or node.children:
+                    break
+                del path[i - 1].children[levels[i - 1]]
+
+            count = self._filters[topic_filter] - 1
+            if count:
+                self._filters[topic_filter] = count
+            else:
+                del self._filters[topic_filter]
+            self._cache = {}
+            return count == 0
+
+    def filters(self):
+        """Filtros que tienen al menos un suscriptor"""
+        with self._lock:
+            return list(self._filters)
+
+    def match(self, topic):
+        """Callbacks suscritos a un tópico concreto (ruta crítica, resultado cacheado)"""
+        callbacks = self._cache.get(topic)
+        if callbacks is not None:
+            return callbacks
+
+        with self._lock:
+            callbacks = []
+            self._collect(self._root, topic.split("/"), 0, callbacks)
+            callbacks = tuple(callbacks)
+            if len(self._cache) >= self._cache_size:
+                self._cache = {}
+            self._cache[topic] = callbacks
+            return callbacks
+
+    def _collect(self, node, levels, index, out):
+        """Recorrer el trie acumulando los suscriptores que coinciden"""
+        # Los tópicos que empiezan con $ no coinciden con comodines en el primer nivel
+        wildcards = index > 0 or not levels[0].startswith("$")
+
+        multi = node.children.get("#")
+        if multi is not None and wildcards:
+            out.extend(multi.subscribers)
+
+        if index == len(levels):
+            out.extend(node.subscribers)
+            return
+
+        exact = node.children.get(levels[index])
+        if exact is not None:
+            self._collect(exact, levels, index + 1, out)
+        if wildcards:
+            single = node.children.get("+")
+            if single is not None:
+                self._collect(single, levels, index + 1, out)
@@ -0,0 +1,90 @@
+import threading
+from collections import deque
+from config import UI_FPS
+
+class UIUpdateQueue:
+    """Traspaso entre el hilo de red MQTT y la UI: guarda el último valor por widget y refresca por frames"""
+
+    def __init__(self, fps=UI_FPS, max_pending=10000):
+        self.interval = 1.0 / fps
+        self.page = None
+        # deque.append/popleft son atómicos: el productor nunca espera al consumidor
+        self._queue = deque(maxlen=max_pending)
+        self._stop = threading.Event()
+        self._thread = None
+
+        # Contadores
+        self.received = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.flushes = 0
+
+    def put(self, widget, value):
+        """Encolar un valor para el widget (se llama desde el hilo de red)"""
+        queue = self._queue
+        if len(queue) == queue.maxlen:
+            self.dropped += 1  # La deque descarta la entrada más antigua
+        queue.append((widget, value))
+        self.received += 1
+
+    def start(self, page):
+        """Iniciar el refresco periódico sobre la página"""
+        self.page = page
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Detener el refresco periódico"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def flush(self):
+        """Aplicar el último valor de cada widget pendiente y enviar un único page.update()"""
+        queue = self._queue
+        latest = {}
+        drained = 0
+        while True:
+            try:
+                widget, value = queue.popleft()
+            except IndexError:
+                break
+            latest[id(widget)] = (widget, value)  # Gana la última escritura
+            drained += 1
+
+        if not drained:
+            return
+        self.coalesced += drained - len(latest)
+
+        dirty = []
+        for widget, value in latest.values():
+            widget.apply_value(value)
+            if widget.page is not None:
+                dirty.append(widget)
+
+        if dirty and self.page is not None:
+            try:
+                self.page.update(*dirty)
+                self.flushes += 1
+            except Exception as e:
+                print(f"❌ Error al refrescar la UI: {e}")
+
+    def stats(self):
+        """Contadores de mensajes recibidos, descartados y combinados"""
+        return {
+            "received": self.received,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "flushes": self.flushes,
+            "pending": len(self._queue),
+        }
+
+# Instancia global de UIUpdateQueue
+update_queue = UIUpdateQueue()
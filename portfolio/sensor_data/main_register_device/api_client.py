@@ -0,0 +1,114 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# 🔹 Cliente HTTP compartido para la API de dispositivos
+class ApiClient:
+    def __init__(self, api_url, api_key, timeout=(3.05, 10), max_workers=32, bulk=None, batch_window=0.02, max_batch=100,
+                 on_bulk_detected=None):
+        self.timeout = timeout  # (conexión, lectura) en segundos
+        self.max_workers = max_workers
+        # Soporte del endpoint multi-dispositivo (device_id=a,b,c): None = detectarlo en la primera petición
+        self.bulk = bulk
+        self.on_bulk_detected = on_bulk_detected  # on_bulk_detected(bool) para guardar lo detectado
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+
+        # Una sola sesión: keep-alive y reutilización de la sesión TLS entre peticiones
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="api")
+        # Pool aparte para los lotes, que a su vez pueden repartir peticiones en _executor
+        self._batch_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="api-batch")
+
+        self._pending = {}  # device_id -> futures que esperan su resultado
+        self._lock = threading.Lock()
+        self._timer = None
+        self.configure(api_url, api_key)
+
+    def configure(self, api_url, api_key):
+        # Otra API: el soporte multi-dispositivo se vuelve a detectar
+        if getattr(self, "api_url", api_url) != api_url:
+            self.bulk = None
+        self.api_url = api_url
+        self.session.headers["x-api-key"] = api_key
+
+    def fetch_device(self, device_id):
+        return self.submit(device_id).result()
+
+    def fetch_all(self, device_ids):
+        """Consultar todos los dispositivos; las peticiones se agrupan en lotes"""
+        futures = {device_id: self.submit(device_id) for device_id in device_ids}
+        return {device_id: future.result() for device_id, future in futures.items()}
+
+    def submit(self, device_id):
+        """Encolar una consulta; las que llegan dentro de batch_window viajan en la misma petición"""
+        future = Future()
+        with self._lock:
+            self._pending.setdefault(device_id, []).append(future)
+            if self._timer is None:
+                self._timer = threading.Timer(self.batch_window, self._flush)
+                self._timer.daemon = True
+                self._timer.start()
+        return future
+
+    def _flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._timer = None
+        device_ids = list(pending)
+        for i in range(0, len(device_ids), self.max_batch):
+            self._batch_executor.submit(self._resolve, device_ids[i:i + self.max_batch], pending)
+
+    def _resolve(self, device_ids, pending):
+        try:
+            results = self._fetch_many(device_ids)
+        except Exception as e:
+            print(f"❌ Error al consultar dispositivos: {e}")
+            results = {}
+        for device_id in device_ids:
+            for future in pending[device_id]:
+                future.set_result(results.get(device_id, {}))
+
+    def _fetch_many(self, device_ids):
+        """Una petición multi-dispositivo si el servidor la soporta; si no, una por dispositivo"""
+        bulk_ids = [device_id for device_id in device_ids if "," not in device_id]
+        if len(bulk_ids) > 1 and self.bulk is not False:
+            data = self._get(",".join(bulk_ids))
+            # Respuesta multi-dispositivo: {device_id: {clave: valor}} con claves que son ids pedidos
+            requested = set(bulk_ids)
+            if isinstance(data, dict) and data and all(
+                key in requested and isinstance(value, dict) for key, value in data.items()
+            ):
+                if self.bulk is None:
+                    self._set_bulk(True)
+                # Los que falten (borrados, desconocidos) se consultan uno por uno, sin desactivar el lote
+                missing = [device_id for device_id in device_ids if device_id not in data]
+                data.update(zip(missing, self._executor.map(self._get, missing)))
+                return data
+            # Error, respuesta vacía o de un solo dispositivo: la detección queda resuelta
+            if self.bulk is None:
+                print("ℹ️ La API no soporta consultas multi-dispositivo, se consultará uno por uno")
+                self._set_bulk(False)
+        return dict(zip(device_ids, self._executor.map(self._get, device_ids)))
+
+    def _set_bulk(self, bulk):
+        self.bulk = bulk
+        if self.on_bulk_detected:
+            try:
+                self.on_bulk_detected(bulk)
+            except Exception as e:
+                print(f"❌ Error al guardar el soporte multi-dispositivo: {e}")
+
+    def _get(self, device_id):
+        try:
+            response = self.session.get(self.api_url, params={"device_id": device_id}, timeout=self.timeout)
+        except requests.RequestException as e:
+            print(f"❌ Error al consultar {device_id}: {e}")
+            return {}
+        if response.status_code == 200:
+            return response.json()
+        return {}
@@ -0,0 +1,64 @@
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+
+# Los módulos de la app se importan desde su raíz (como al ejecutar main.py); el registro va a un directorio temporal
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_ROOT)
+os.environ["APPDATA"] = tempfile.mkdtemp()
+
+from main import DATA_FILE, registry, save_values, values_writer
+
+# 🔹 Tiempo en el hilo de la UI por refresco: JSON completo con indent=4 (antes) vs registro directo vs escritor con debounce
+DEVICES = 100
+WIDGETS = 20
+REFRESHES = 500
+
+def make_devices():
+    return {
+        f"esp32-{d:03d}": [{"type": "Texto", "key": f"k{i}", "name": f"Sensor {i}", "value": "--", "editing": False} for i in range(WIDGETS)]
+        for d in range(DEVICES)
+    }
+
+def save_devices_json(devices):
+    """save_devices anterior: reescribe todo devices_data.json en el hilo de la UI"""
+    serializable_data = {device_id: {"widgets": widgets} for device_id, widgets in devices.items()}
+    with open(DATA_FILE, "w") as f:
+        json.dump(serializable_data, f, indent=4)
+    print(f"✅ Dispositivos guardados correctamente en {DATA_FILE}")
+
+def bench(save, devices, refresh_all):
+    """ms por refresco en el hilo que llama: aplicar los valores y guardar"""
+    ids = list(devices)
+    start = time.perf_counter()
+    for n in range(REFRESHES):
+        refreshed = devices if refresh_all else {ids[n % len(ids)]: devices[ids[n % len(ids)]]}
+        for widgets in refreshed.values():
+            for widget in widgets:
+                widget["value"] = n
+        save(refreshed)
+    return (time.perf_counter() - start) / REFRESHES * 1000
+
+def report(label, refresh_all, ms):
+    print(f"{label:<38} {'todos' if refresh_all else 'uno':<6} {ms:>8.3f} ms/refresco")
+
+if __name__ == "__main__":
+    devices = make_devices()
+    for device_id, widgets in devices.items():
+        registry.upsert_device(device_id)
+        registry.save_widgets(device_id, widgets)
+
+    for refresh_all in (False, True):
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            # El anterior reescribía todos los dispositivos en cada guardado
+            ms = bench(lambda refreshed: save_devices_json(devices), devices, refresh_all)
+        report("antes: JSON indent=4 síncrono", refresh_all, ms)
+        report("registro SQLite síncrono", refresh_all, bench(registry.update_values, devices, refresh_all))
+        writes = values_writer.writes
+        report("DebouncedWriter (save_values)", refresh_all, bench(save_values, devices, refresh_all))
+        values_writer.flush()
+        print(f"{'':<45} {values_writer.writes - writes} escrituras para {REFRESHES} refrescos")
+    assert registry.get_device("esp32-000")["widgets"][0]["value"] == REFRESHES - 1
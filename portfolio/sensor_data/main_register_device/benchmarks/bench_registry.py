@@ -0,0 +1,61 @@
+import json
+import os
+import sys
+import tempfile
+import time
+
+# El paquete shared está junto a las dos apps (como en main.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from shared.registry import DeviceRegistry
+
+# 🔹 Carga al arrancar con 10k dispositivos: registro SQLite frente al presupuesto de 100 ms (y al JSON anterior)
+DEVICES = 10_000
+BUDGET_MS = 100
+REPEAT = 5
+
+def fill(registry, widgets_per_device):
+    devices = {}
+    for d in range(DEVICES):
+        device_id = f"esp32-{d:05d}"
+        widgets = [
+            {"type": "texto", "key": f"k{i}", "name": f"Sensor {i}", "value": d * i, "editing": False}
+            for i in range(widgets_per_device)
+        ]
+        registry.upsert_device(device_id)
+        registry.save_widgets(device_id, widgets)
+        devices[device_id] = {"widgets": widgets}
+    return devices
+
+def best_ms(func):
+    times = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = func()
+        times.append((time.perf_counter() - start) * 1000)
+    return min(times), result
+
+def report(label, ms):
+    verdict = "dentro" if ms < BUDGET_MS else "FUERA"
+    print(f"{label:<44} {ms:>8.1f} ms  ({verdict} del presupuesto de {BUDGET_MS} ms)")
+
+if __name__ == "__main__":
+    for widgets_per_device in (2, 5):
+        directory = tempfile.mkdtemp()
+        registry = DeviceRegistry(os.path.join(directory, "devices.db"))
+        devices = fill(registry, widgets_per_device)
+        # Reabrir como al arrancar la app
+        registry = DeviceRegistry(os.path.join(directory, "devices.db"))
+        json_file = os.path.join(directory, "devices_data.json")
+        with open(json_file, "w") as f:
+            json.dump(devices, f, indent=4)
+
+        print(f"{DEVICES:,} dispositivos x {widgets_per_device} widgets")
+        ms, ids = best_ms(registry.device_ids)
+        assert len(ids) == DEVICES
+        report("  device_ids() (arranque con lista perezosa)", ms)
+        ms, loaded = best_ms(registry.load_devices)
+        assert len(loaded) == DEVICES and loaded["esp32-00001"]["widgets"][1]["value"] == 1
+        report("  load_devices() (todo en memoria)", ms)
+        ms, _ = best_ms(lambda: json.load(open(json_file)))
+        report("  antes: json.load de devices_data.json", ms)
@@ -0,0 +1,88 @@
+import json
+import os
+import sys
+import tempfile
+import time
+
+# Los módulos de la app se importan desde su raíz (como al ejecutar main.py); el registro va a un directorio temporal
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_ROOT)
+os.environ["APPDATA"] = tempfile.mkdtemp()
+
+import flet as ft
+from flet_core.protocol import CommandEncoder
+from main import Esp32Device, apply_values
+
+# 🔹 Controles creados y bytes enviados por refresco de un dispositivo con 50 widgets: reconstrucción vs reconciliación
+WIDGETS = 50
+REFRESHES = 200
+
+class RebuildDevice(Esp32Device):
+    """Comportamiento anterior: cada refresco reconstruye todo el árbol del dispositivo"""
+
+    def apply_data(self, data):
+        apply_values(self.widgets, data)
+        self.controls = [self.rebuild_device_ui()]
+
+    def rebuild_device_ui(self):
+        widget_elements = []
+        for widget in self.widgets:
+            widget_elements.append(ft.Row([
+                ft.Text(f"{widget['name']}: {widget['value']}", size=14),
+                ft.IconButton(icon=ft.icons.DELETE, on_click=lambda e, w=widget: self.remove_widget(w), visible=self.show_delete),
+                ft.IconButton(icon=ft.icons.UPDATE, on_click=lambda e: self.update_widgets(), visible=self.show_update)
+            ]))
+        return ft.Column([
+            ft.Row([
+                ft.Text(f"Dispositivo: {self.device_id}", size=16, weight=ft.FontWeight.BOLD),
+                ft.IconButton(icon=ft.icons.DELETE, on_click=lambda e: self.remove_device_callback(self.device_id), visible=self.show_delete)
+            ]),
+            ft.Column(widget_elements, spacing=10)
+        ], spacing=10)
+
+class FakeSession:
+    """Lo que hace Page.update sin conexión: diff de Flet, ids para los controles nuevos y bytes del mensaje"""
+
+    def __init__(self, control):
+        self.index = {"page": None}
+        self.next_id = 0
+        self.control = control
+        added = []
+        control._build_add_commands(index=self.index, added_controls=added)
+        self._assign_ids(added)
+
+    def update(self):
+        commands, added, removed = [], [], []
+        self.control.build_update_commands(self.index, commands, added, removed)
+        self._assign_ids(added)
+        return len(added), len(json.dumps(commands, cls=CommandEncoder).encode())
+
+    def _assign_ids(self, controls):
+        for control in controls:
+            self.next_id += 1
+            control._Control__uid = f"_{self.next_id}"
+            self.index[control._Control__uid] = control
+
+def make_widgets():
+    return [{"type": "Texto", "key": f"k{i}", "name": f"Sensor {i}", "value": "--", "editing": False} for i in range(WIDGETS)]
+
+def bench(label, device_class, changed):
+    device = device_class("esp32-001", lambda device_id: None, widgets=make_widgets())
+    session = FakeSession(device)
+    created = sent = 0
+    start = time.perf_counter()
+    for n in range(REFRESHES):
+        # `changed` claves cambian de valor en cada refresco
+        data = {f"k{i}": (n if i < changed else 0) for i in range(WIDGETS)}
+        device.apply_data(data)
+        controls, size = session.update()
+        created += controls
+        sent += size
+    elapsed = time.perf_counter() - start
+    print(f"{label:<16} {changed:>3} cambios {created / REFRESHES:>8.0f} controles/refresco "
+          f"{sent / REFRESHES:>10,.0f} bytes/refresco {elapsed / REFRESHES * 1000:>8.2f} ms/refresco")
+
+if __name__ == "__main__":
+    for changed in (0, 5, WIDGETS):
+        bench("reconstrucción", RebuildDevice, changed)
+        bench("reconciliación", Esp32Device, changed)
@@ -1,68 +1,65 @@
 import flet as ft
-import requests
-import json
 import os
+import sys
+# Módulos compartidos por las dos apps de sensor_data (paquete shared)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import AWS_API_URL, AWS_API_KEY
+from api_client import ApiClient
+from shared.registry import DeviceRegistry
+from persistence import DebouncedWriter
+from shared.virtualized_list import VirtualizedList
 
 # 🔹 Definir la ubicación del archivo de configuración y datos
 CONFIG_DIR = os.path.join(os.getenv("APPDATA") or os.path.expanduser("~/.config"), "IOT_Dashboard")
 CONFIG_FILE = os.path.join(CONFIG_DIR, "config.json")
 DATA_FILE = os.path.join(CONFIG_DIR, "devices_data.json")
+REGISTRY_FILE = os.path.join(CONFIG_DIR, "devices.db")
 
 # 🔹 Asegurar que la carpeta de configuración exista
 os.makedirs(CONFIG_DIR, exist_ok=True)
 
+# 🔹 Registro SQLite de dispositivos, widgets y ajustes (importa los JSON antiguos la primera vez)
+registry = DeviceRegistry(REGISTRY_FILE)
+registry.import_json(DATA_FILE, CONFIG_FILE)
+
+# 🔹 Los valores refrescados se escriben en segundo plano, como mucho una vez por segundo
+values_writer = DebouncedWriter(registry.update_values)
+
+# 🔹 Función para programar el guardado de los valores de varios dispositivos
+def save_values(widgets_by_device):
+    # Instantánea barata en el hilo de la UI; el registro se escribe en el hilo del escritor
+    values_writer.save({
+        device_id: [dict(widget) for widget in widgets] for device_id, widgets in widgets_by_device.items()
+    })
+
 # 🔹 Función para cargar la configuración
 def load_config():
-    if os.path.exists(CONFIG_FILE):
-        with open(CONFIG_FILE, "r") as file:
-            return json.load(file)
     return {
-        "API_URL": AWS_API_URL,
-        "API_KEY": AWS_API_KEY
+        "API_URL": registry.get_setting("API_URL", AWS_API_URL),
+        "API_KEY": registry.get_setting("API_KEY", AWS_API_KEY),
+        "API_BULK": registry.get_setting("API_BULK"),
     }
 
 # 🔹 Función para guardar la configuración
 def save_config(config):
-    with open(CONFIG_FILE, "w") as file:
-        json.dump(config, file, indent=4)
+    registry.set_settings(config)
 
 # 🔹 Cargar configuración al inicio
 config = load_config()
 API_URL = config["API_URL"]
 API_KEY = config["API_KEY"]
 
-# 🔹 Función para cargar dispositivos desde el archivo
-def load_devices():
-    try:
-        if os.path.exists(DATA_FILE):
-            with open(DATA_FILE, "r") as f:
-                data = json.load(f)
-
-            if not isinstance(data, dict):
-                return {}
-
-            for device_id in data:
-                if not isinstance(data[device_id], dict) or "widgets" not in data[device_id]:
-                    data[device_id] = {"widgets": []}
-
-            return data
-        return {}
-    except (json.JSONDecodeError, ValueError) as e:
-        print(f"❌ Error al cargar dispositivos: {e}")
-        return {}
-
-# 🔹 Función para guardar dispositivos en archivo JSON
-def save_devices(devices):
-    try:
-        serializable_data = {
-            device_id: {"widgets": device.widgets} for device_id, device in devices.items()
-        }
-        with open(DATA_FILE, "w") as f:
-            json.dump(serializable_data, f, indent=4)
-        print(f"✅ Dispositivos guardados correctamente en {DATA_FILE}")
-    except Exception as e:
-        print(f"❌ Error al guardar dispositivos: {e}")
+# 🔹 Función para guardar si la API admite consultas multi-dispositivo (se detecta una vez)
+def save_bulk(bulk):
+    config["API_BULK"] = bulk
+    registry.set_settings({"API_BULK": bulk})
+
+api_client = ApiClient(API_URL, API_KEY, bulk=config.get("API_BULK"), on_bulk_detected=save_bulk)
+
+# 🔹 Función para aplicar los datos de la API a los widgets de un dispositivo
+def apply_values(widgets, data):
+    for widget in widgets:
+        widget["value"] = data.get(widget["key"], "--")
 
 # 🔹 Clase para representar un dispositivo ESP32
 class Esp32Device(ft.Column):
@@ -73,22 +70,32 @@ class Esp32Device(ft.Column):
         self.remove_device_callback = remove_device_callback
         self.show_delete = True  
         self.show_update = True  
+        self._rows = {}  # id(widget) -> (widget, fila, texto) persistentes entre refrescos
+        self.widgets_column = ft.Column([], spacing=10)
+        self.title = ft.Text(f"Dispositivo: {self.device_id}", size=16, weight=ft.FontWeight.BOLD)
+        self.scroll = ft.ScrollMode.AUTO  # La lista virtualizada le da una altura fija
         self.controls = [self.build_device_ui()]
+        self.sync_widgets()
+
+    def bind(self, device_id, widgets):
+        """Reutilizar este control para otro dispositivo (lo usa la lista virtualizada)"""
+        self.device_id = device_id
+        self.widgets = widgets
+        self.title.value = f"Dispositivo: {device_id}"
+        self.sync_widgets()
     
     def fetch_data(self):
-        headers = {"x-api-key": API_KEY}
-        response = requests.get(f"{API_URL}?device_id={self.device_id}", headers=headers)
-        if response.status_code == 200:
-            return response.json()
-        return {}
+        return api_client.fetch_device(self.device_id)
+
+    def apply_data(self, data):
+        apply_values(self.widgets, data)
+        self.sync_widgets()
 
     def update_widgets(self):
-        data = self.fetch_data()
-        for widget in self.widgets:
-            widget["value"] = data.get(widget["key"], "--")
-        self.controls = [self.build_device_ui()]
-        self.update()
-        save_devices(dispositivos)
+        self.apply_data(self.fetch_data())
+        if self.page:
+            self.update()
+        save_values({self.device_id: self.widgets})
 
     def add_widget(self, widget_type, key, widget_name):
         new_widget = {
@@ -99,48 +106,80 @@ class Esp32Device(ft.Column):
             "editing": False
         }
         self.widgets.append(new_widget)
+        registry.save_widgets(self.device_id, self.widgets)
         self.update_widgets()
 
     def remove_widget(self, widget):
         self.widgets.remove(widget)
+        registry.save_widgets(self.device_id, self.widgets)
         self.update_widgets()
 
-    def build_device_ui(self):
-        widget_elements = []
+    def sync_widgets(self):
+        """Reconciliar las filas con self.widgets: solo se crean, quitan o modifican las que cambiaron"""
+        rows = []
+        alive = set()
         for widget in self.widgets:
-            widget_elements.append(ft.Row([
-                ft.Text(f"{widget['name']}: {widget['value']}", size=14),
-                ft.IconButton(icon=ft.icons.DELETE, on_click=lambda e, w=widget: self.remove_widget(w), visible=self.show_delete),
-                ft.IconButton(icon=ft.icons.UPDATE, on_click=lambda e: self.update_widgets(), visible=self.show_update)
-            ]))
+            row_key = id(widget)
+            alive.add(row_key)
+            label = f"{widget['name']}: {widget['value']}"
+            entry = self._rows.get(row_key)
+            if entry is None or entry[0] is not widget:
+                entry = (widget, *self.build_widget_row(widget, label))
+                self._rows[row_key] = entry
+            elif entry[2].value != label:
+                entry[2].value = label  # Flet solo envía el valor modificado
+            rows.append(entry[1])
+
+        for row_key in [k for k in self._rows if k not in alive]:
+            del self._rows[row_key]
+        if rows != self.widgets_column.controls:
+            self.widgets_column.controls = rows
+
+    def build_widget_row(self, widget, label):
+        text = ft.Text(label, size=14)
+        row = ft.Row([
+            text,
+            ft.IconButton(icon=ft.icons.DELETE, on_click=lambda e, w=widget: self.remove_widget(w), visible=self.show_delete),
+            ft.IconButton(icon=ft.icons.UPDATE, on_click=lambda e: self.update_widgets(), visible=self.show_update)
+        ])
+        return row, text
+
+    def build_device_ui(self):
         return ft.Column([
             ft.Row([
-                ft.Text(f"Dispositivo: {self.device_id}", size=16, weight=ft.FontWeight.BOLD),
+                self.title,
                 ft.IconButton(icon=ft.icons.DELETE, on_click=lambda e: self.remove_device_callback(self.device_id), visible=self.show_delete)
             ]),
-            ft.Column(widget_elements, spacing=10)
+            self.widgets_column
         ], spacing=10)
 
 # 🔹 Función principal de la app
 def main(page: ft.Page):
     page.title = "ESP32 IoT Dashboard"
     page.scroll = "auto"
-    global dispositivos
-    dispositivos = {}
-    stored_devices = load_devices()
     
+    def construir_dispositivo(device_id, recycled):
+        # Los datos se leen del registro solo cuando el dispositivo entra en pantalla
+        widgets = (registry.get_device(device_id) or {}).get("widgets", [])
+        if recycled is not None:
+            recycled.bind(device_id, widgets)
+            return recycled
+        return Esp32Device(device_id, remove_dispositivo, widgets=widgets)
+
+    def obtener_dispositivo(device_id):
+        # Fuera de la ventana visible se trabaja con un control sin montar
+        return lista_dispositivos.get(device_id) or construir_dispositivo(device_id, None)
+
     def actualizar_dispositivos():
-        dispositivo_selector.options = [ft.dropdown.Option(dev_id) for dev_id in dispositivos]
+        dispositivo_selector.options = [ft.dropdown.Option(dev_id) for dev_id in lista_dispositivos.keys]
         dispositivo_selector.update()
         page.update()
     
     def agregar_dispositivo(e):
         dispositivo = dispositivo_input.value.strip()
-        if dispositivo and dispositivo not in dispositivos:
-            device = Esp32Device(dispositivo, remove_dispositivo)
-            dispositivos[dispositivo] = device
-            pestañas[1].content.controls.append(device)
-            save_devices(dispositivos)
+        if dispositivo and dispositivo not in lista_dispositivos:
+            registry.upsert_device(dispositivo)
+            lista_dispositivos.append(dispositivo)
             actualizar_dispositivos()
             page.update()
     
@@ -150,16 +189,30 @@ def main(page: ft.Page):
         key = clave_input.value.strip()
         widget_name = nombre_widget_input.value.strip()
         
-        if device_id in dispositivos and widget_type and key and widget_name:
-            dispositivos[device_id].add_widget(widget_type, key, widget_name)
-            save_devices(dispositivos)
+        if device_id in lista_dispositivos and widget_type and key and widget_name:
+            obtener_dispositivo(device_id).add_widget(widget_type, key, widget_name)
             page.update()
     
+    def actualizar_todos(e):
+        # Todas las consultas en paralelo y un solo envío de la UI
+        resultados = api_client.fetch_all(lista_dispositivos.keys)
+        almacenados = registry.load_devices()
+        widgets_por_dispositivo = {}
+        for dev_id, data in resultados.items():
+            device = lista_dispositivos.get(dev_id)
+            if device is not None:
+                device.apply_data(data)
+                widgets_por_dispositivo[dev_id] = device.widgets
+            elif dev_id in almacenados:
+                widgets_por_dispositivo[dev_id] = almacenados[dev_id]["widgets"]
+                apply_values(widgets_por_dispositivo[dev_id], data)
+        save_values(widgets_por_dispositivo)
+        page.update()
+    
     def remove_dispositivo(device_id):
-        if device_id in dispositivos:
-            device = dispositivos.pop(device_id)
-            pestañas[1].content.controls.remove(device)
-            save_devices(dispositivos)
+        if device_id in lista_dispositivos:
+            registry.delete_device(device_id)
+            lista_dispositivos.remove(device_id)
             actualizar_dispositivos()
             page.update()
     
@@ -168,9 +221,12 @@ def main(page: ft.Page):
     api_key_input = ft.TextField(value=config["API_KEY"], label="API KEY", expand=True, password=True)
 
     def guardar_config(e):
+        if api_url_input.value != config["API_URL"]:
+            config["API_BULK"] = None  # Otra API: se vuelve a detectar
         config["API_URL"] = api_url_input.value
         config["API_KEY"] = api_key_input.value
         save_config(config)
+        api_client.configure(config["API_URL"], config["API_KEY"])
         page.snack_bar = ft.SnackBar(ft.Text("Configuración guardada correctamente"), bgcolor=ft.colors.GREEN)
         page.snack_bar.open = True
         page.update()
@@ -188,13 +244,15 @@ def main(page: ft.Page):
     clave_input = ft.TextField(label="Clave JSON", expand=True)
     nombre_widget_input = ft.TextField(label="Nombre del Widget", expand=True)
     btn_widget = ft.ElevatedButton("Agregar Widget", on_click=agregar_widget)
+    btn_actualizar_todos = ft.ElevatedButton("Actualizar Todos", icon=ft.icons.UPDATE, on_click=actualizar_todos)
+    lista_dispositivos = VirtualizedList(construir_dispositivo, row_height=200, spacing=20)
 
     pestañas = [
         ft.Tab(text="Administrar ESP32", content=ft.Column([
             ft.Row([dispositivo_input, btn_agregar], spacing=10),
             ft.Row([dispositivo_selector, widget_selector, clave_input, nombre_widget_input, btn_widget], spacing=10),
         ], spacing=20)),
-        ft.Tab(text="Visualizar Datos", content=ft.Column([], spacing=20, scroll="adaptive")),
+        ft.Tab(text="Visualizar Datos", content=ft.Column([btn_actualizar_todos, lista_dispositivos], spacing=20)),
         ft.Tab(text="Configuración", content=ft.Column([
             api_url_input,
             api_key_input,
@@ -205,12 +263,10 @@ def main(page: ft.Page):
     tab_view = ft.Tabs(tabs=pestañas, expand=1)
     page.add(tab_view)
 
-    for dev_id, data in stored_devices.items():
-        device = Esp32Device(dev_id, remove_dispositivo, widgets=data.get("widgets", []))
-        dispositivos[dev_id] = device
-        pestañas[1].content.controls.append(device)
-
+    # Al inicio solo se cargan los IDs; los controles se crean al hacerse visibles
+    lista_dispositivos.set_keys(registry.device_ids())
     actualizar_dispositivos()
     page.update()
 
-ft.app(target=main)
+if __name__ == "__main__":
+    ft.app(target=main)
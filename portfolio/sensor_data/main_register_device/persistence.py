@@ -0,0 +1,57 @@
+import atexit
+import threading
+import time
+
+class DebouncedWriter:
+    """Escribe en segundo plano, como mucho una vez por intervalo, agrupando los cambios pendientes"""
+
+    def __init__(self, write, interval=1.0):
+        self.write = write  # write({clave: valor}) con todos los cambios agrupados
+        self.interval = interval
+        self._data = {}
+        self._last_write = 0.0
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._thread = None
+
+        # Contadores
+        self.requests = 0
+        self.writes = 0
+
+        # Lo pendiente se escribe al cerrar la aplicación
+        atexit.register(self.flush)
+
+    def save(self, changes):
+        """Programar la escritura de `changes`; la llamada no toca el disco y el último valor de cada clave gana"""
+        with self._cond:
+            self._data.update(changes)
+            self.requests += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def flush(self):
+        """Escribir ahora lo que esté pendiente"""
+        with self._write_lock:
+            with self._cond:
+                if not self._data:
+                    return
+                data, self._data = self._data, {}
+            try:
+                self.write(data)
+                self.writes += 1
+            except Exception as e:
+                print(f"❌ Error al guardar en segundo plano: {e}")
+            self._last_write = time.monotonic()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._data:
+                    self._cond.wait()
+            # Los cambios que lleguen mientras tanto se agrupan en la misma escritura
+            delay = self._last_write + self.interval - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self.flush()
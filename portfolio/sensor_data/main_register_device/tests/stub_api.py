@@ -0,0 +1,72 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+class _Server(ThreadingHTTPServer):
+    request_queue_size = 256  # Admitir ráfagas de conexiones simultáneas
+    daemon_threads = True
+
+# 🔹 API de dispositivos local: GET ?device_id=a[,b,...] con un retardo fijo por petición
+class StubApi:
+    """Servidor HTTP de pruebas; anota cada petición y las conexiones TCP que se abren"""
+
+    def __init__(self, devices, delay=0.0, bulk=True):
+        self.devices = devices  # device_id -> {clave: valor}
+        self.delay = delay
+        self.bulk = bulk  # False: ignora las listas y responde como un endpoint de un solo dispositivo
+        self.requests = []  # device_id tal como llegó en la query
+        self.connections = set()  # Puertos de cliente vistos
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self.server = _Server(("127.0.0.1", 0), self._handler())
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/devices"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def respond(self, device_id):
+        if "," in device_id and self.bulk:
+            ids = device_id.split(",")
+            return 200, {i: self.devices[i] for i in ids if i in self.devices}
+        if device_id in self.devices:
+            return 200, self.devices[device_id]
+        return 404, {"error": "not found"}
+
+    def _handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+
+            def do_GET(self):
+                device_id = parse_qs(urlparse(self.path).query).get("device_id", [""])[0]
+                with api._lock:
+                    api.requests.append(device_id)
+                    api.connections.add(self.client_address[1])
+                    api.in_flight += 1
+                    api.max_in_flight = max(api.max_in_flight, api.in_flight)
+                try:
+                    time.sleep(api.delay)
+                    status, data = api.respond(device_id)
+                    body = json.dumps(data).encode()
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                finally:
+                    with api._lock:
+                        api.in_flight -= 1
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
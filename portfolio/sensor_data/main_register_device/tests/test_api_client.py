@@ -0,0 +1,91 @@
+from api_client import ApiClient
+from stub_api import StubApi
+
+DEVICES = {f"esp32-{i:03d}": {"led": i % 2, "temp": 20 + i % 10} for i in range(50)}
+
+def test_concurrent_lookups_share_one_bulk_request():
+    api = StubApi(DEVICES).start()
+    try:
+        client = ApiClient(api.url, "key")
+        results = client.fetch_all(list(DEVICES))
+        assert results == DEVICES
+        assert len(api.requests) == 1
+        assert client.bulk is True
+    finally:
+        api.stop()
+
+def test_batches_are_split_at_max_batch():
+    api = StubApi(DEVICES).start()
+    try:
+        client = ApiClient(api.url, "key", max_batch=20)
+        assert client.fetch_all(list(DEVICES)) == DEVICES
+        assert sorted(len(ids.split(",")) for ids in api.requests) == [10, 20, 20]
+    finally:
+        api.stop()
+
+def test_falls_back_to_one_request_per_device_without_bulk_support():
+    api = StubApi(DEVICES, bulk=False).start()
+    detected = []
+    try:
+        client = ApiClient(api.url, "key", on_bulk_detected=detected.append)
+        assert client.fetch_all(list(DEVICES)) == DEVICES
+        # Un intento multi-dispositivo (404) y luego uno por dispositivo
+        assert len(api.requests) == 1 + 50
+        assert client.bulk is False
+        assert detected == [False]
+
+        # La detección no se repite en las rondas siguientes
+        api.requests.clear()
+        assert client.fetch_all(list(DEVICES)) == DEVICES
+        assert len(api.requests) == 50
+        assert all("," not in device_id for device_id in api.requests)
+    finally:
+        api.stop()
+
+def test_detected_value_is_reported_once_and_reset_by_a_new_url():
+    api = StubApi(DEVICES).start()
+    detected = []
+    try:
+        client = ApiClient(api.url, "key", on_bulk_detected=detected.append)
+        client.fetch_all(list(DEVICES))
+        client.fetch_all(list(DEVICES))
+        assert detected == [True]
+
+        client.configure(api.url, "other-key")
+        assert client.bulk is True
+        client.configure(api.url + "?v=2", "key")
+        assert client.bulk is None
+    finally:
+        api.stop()
+
+def test_single_device_answer_disables_bulk():
+    api = StubApi(DEVICES, bulk=False).start()
+    # Endpoint que solo lee el primer id de la lista y responde sus claves
+    respond = api.respond
+    api.respond = lambda device_id: respond(device_id.split(",")[0])
+    try:
+        client = ApiClient(api.url, "key")
+        assert client.fetch_all(list(DEVICES)) == DEVICES
+        assert client.bulk is False
+
+        api.requests.clear()
+        ids = list(DEVICES)[:10]
+        assert client.fetch_all(ids) == {k: DEVICES[k] for k in ids}
+        assert len(api.requests) == 10
+        assert all("," not in device_id for device_id in api.requests)
+    finally:
+        api.stop()
+
+def test_missing_ids_are_fetched_singly_without_disabling_bulk():
+    api = StubApi(DEVICES).start()
+    try:
+        client = ApiClient(api.url, "key")
+        ids = list(DEVICES) + ["gone-1", "gone-2"]
+        results = client.fetch_all(ids)
+        assert {k: results[k] for k in DEVICES} == DEVICES
+        assert results["gone-1"] == results["gone-2"] == {}
+        # Lote + los 2 desconocidos uno por uno
+        assert len(api.requests) == 3
+        assert client.bulk is True
+    finally:
+        api.stop()
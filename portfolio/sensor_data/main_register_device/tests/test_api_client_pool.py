@@ -0,0 +1,65 @@
+import time
+from api_client import ApiClient
+from stub_api import StubApi
+
+DEVICES = {f"esp32-{i:03d}": {"led": i % 2, "temp": 20 + i % 10} for i in range(200)}
+
+def test_200_devices_refresh_in_about_one_round_trip():
+    api = StubApi(DEVICES, delay=0.2, bulk=False).start()
+    try:
+        client = ApiClient(api.url, "key", bulk=False, max_workers=200)
+        start = time.monotonic()
+        results = client.fetch_all(list(DEVICES))
+        elapsed = time.monotonic() - start
+
+        assert results == DEVICES
+        assert len(api.requests) == 200
+        # En serie serían 200 x 0.2 s = 40 s; en paralelo, unas pocas veces el RTT
+        assert api.max_in_flight >= 50
+        assert elapsed < 2.0
+    finally:
+        api.stop()
+
+def test_session_reuses_connections():
+    api = StubApi(DEVICES).start()
+    try:
+        client = ApiClient(api.url, "key", bulk=False, max_workers=4)
+        for device_id in list(DEVICES)[:20]:
+            assert client.fetch_device(device_id) == DEVICES[device_id]
+        # Keep-alive: las 20 peticiones en serie viajan por la misma conexión
+        assert len(api.requests) == 20
+        assert len(api.connections) == 1
+    finally:
+        api.stop()
+
+def test_api_key_is_sent_and_reconfigured():
+    api = StubApi(DEVICES).start()
+    seen = []
+    respond = api.respond
+    api.respond = lambda device_id: (seen.append(device_id), respond(device_id))[1]
+    try:
+        client = ApiClient("http://127.0.0.1:1/unused", "old")
+        client.configure(api.url, "new")
+        assert client.session.headers["x-api-key"] == "new"
+        assert client.fetch_device("esp32-001") == DEVICES["esp32-001"]
+        assert seen == ["esp32-001"]
+    finally:
+        api.stop()
+
+def test_read_timeout_returns_empty_result_instead_of_hanging():
+    api = StubApi(DEVICES, delay=1.0).start()
+    try:
+        client = ApiClient(api.url, "key", timeout=(1, 0.2))
+        start = time.monotonic()
+        assert client.fetch_device("esp32-001") == {}
+        assert time.monotonic() - start < 0.9
+    finally:
+        api.stop()
+
+def test_unknown_device_returns_empty_result():
+    api = StubApi(DEVICES).start()
+    try:
+        client = ApiClient(api.url, "key", bulk=False)
+        assert client.fetch_device("missing") == {}
+    finally:
+        api.stop()
@@ -0,0 +1,171 @@
+import json
+import os
+import sqlite3
+import threading
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS devices (
+    device_id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS widgets (
+    device_id TEXT NOT NULL REFERENCES devices(device_id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    key TEXT NOT NULL,
+    type TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value,
+    PRIMARY KEY (device_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_widgets_key ON widgets(key);
+CREATE INDEX IF NOT EXISTS idx_devices_position ON devices(position);
+CREATE TABLE IF NOT EXISTS settings (
+    name TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+class DeviceRegistry:
+    """Registro de dispositivos, widgets y ajustes en SQLite (WAL), con escrituras por fila"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+
+    def load_devices(self):
+        """Todos los dispositivos con sus widgets: {device_id: {"widgets": [...]}}"""
+        with self._lock:
+            devices = {
+                device_id: {"widgets": []}
+                for (device_id,) in self._conn.execute("SELECT device_id FROM devices ORDER BY position")
+            }
+            rows = self._conn.execute(
+                "SELECT device_id, type, key, name, value FROM widgets ORDER BY device_id, position"
+            ).fetchall()
+        for device_id, widget_type, key, name, value in rows:
+            devices[device_id]["widgets"].append(
+                {"type": widget_type, "key": key, "name": name, "value": value, "editing": False}
+            )
+        return devices
+
+    def device_ids(self):
+        """IDs de los dispositivos en orden de alta"""
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT device_id FROM devices ORDER BY position")]
+
+    def get_device(self, device_id):
+        """Un dispositivo con sus widgets, o None si no existe"""
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM devices WHERE device_id = ?", (device_id,)).fetchone() is None:
+                return None
+            rows = self._conn.execute(
+                "SELECT type, key, name, value FROM widgets WHERE device_id = ? ORDER BY position", (device_id,)
+            )
+            return {
+                "widgets": [
+                    {"type": widget_type, "key": key, "name": name, "value": value, "editing": False}
+                    for widget_type, key, name, value in rows
+                ]
+            }
+
+    def upsert_device(self, device_id):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO devices (device_id, position) "
+                "VALUES (?, (SELECT COALESCE(MAX(position), -1) + 1 FROM devices)) "
+                "ON CONFLICT(device_id) DO NOTHING",
+                (device_id,),
+            )
+
+    def delete_device(self, device_id):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM devices WHERE device_id = ?", (device_id,))
+
+    def save_widgets(self, device_id, widgets):
+        """Reemplazar los widgets de un dispositivo (solo se tocan sus filas)"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM widgets WHERE device_id = ?", (device_id,))
+            self._conn.executemany(
+                "INSERT INTO widgets (device_id, position, key, type, name, value) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (device_id, position, widget.get("key", ""), widget["type"], widget.get("name", widget["type"]),
+                     self._value(widget.get("value", "--")))
+                    for position, widget in enumerate(widgets)
+                ],
+            )
+
+    def update_values(self, widgets_by_device):
+        """Actualizar solo los valores de los widgets de uno o varios dispositivos"""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE widgets SET value = ? WHERE device_id = ? AND position = ?",
+                [
+                    (self._value(widget.get("value", "--")), device_id, position)
+                    for device_id, widgets in widgets_by_device.items()
+                    for position, widget in enumerate(widgets)
+                ],
+            )
+
+    def get_setting(self, name, default=None):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM settings WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_settings(self, settings):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO settings (name, value) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET value = excluded.value",
+                [(name, json.dumps(value)) for name, value in settings.items()],
+            )
+
+    def import_json(self, devices_file, config_file=None):
+        """Importar una única vez los JSON de cualquiera de las dos apps (el archivo original no se borra)"""
+        if self.get_setting("json_imported"):
+            return
+        devices = self._read_json(devices_file)
+        with self._lock, self._conn:
+            for position, (device_id, data) in enumerate(devices.items()):
+                # main_register_device: {"widgets": [dict, ...]}; app_iot_dashboard: [nombre de clase, ...]
+                widgets = data.get("widgets", []) if isinstance(data, dict) else data
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO devices (device_id, position) VALUES (?, ?)", (device_id, position)
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO widgets (device_id, position, key, type, name, value) VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (device_id, i, widget.get("key", ""), widget.get("type", ""), widget.get("name", ""),
+                         self._value(widget.get("value", "--")))
+                        if isinstance(widget, dict) else (device_id, i, "", widget, widget, "--")
+                        for i, widget in enumerate(widgets)
+                    ],
+                )
+            for name, value in self._read_json(config_file).items():
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO settings (name, value) VALUES (?, ?)", (name, json.dumps(value))
+                )
+            self._conn.execute("INSERT OR REPLACE INTO settings (name, value) VALUES ('json_imported', 'true')")
+
+    @staticmethod
+    def _read_json(path):
+        if not path or not os.path.exists(path):
+            return {}
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, ValueError) as e:
+            print(f"❌ Error al importar {path}: {e}")
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    @staticmethod
+    def _value(value):
+        """Los valores son de visualización: escalares tal cual, el resto como texto JSON"""
+        if value is None or isinstance(value, (str, int, float)):
+            return value
+        return json.dumps(value)
@@ -0,0 +1,106 @@
+import math
+import flet as ft
+
+class VirtualizedList(ft.ListView):
+    """ListView que solo crea controles para los elementos visibles (y un margen); el resto son espaciadores.
+
+    item_builder(key, recycled) construye el control de un elemento; `recycled` es un control
+    liberado que puede reutilizarse (o None). Los controles para los que can_recycle() es False
+    tienen estado propio: se conservan y se devuelven al mismo elemento.
+    """
+
+    def __init__(self, item_builder, row_height=150, overscan=5, pool_size=50, can_recycle=None, height=600, **kwargs):
+        super().__init__(height=height, on_scroll=self.on_list_scroll, on_scroll_interval=50, **kwargs)
+        self.item_builder = item_builder
+        self.row_height = row_height  # Altura fija de cada elemento, para calcular la ventana visible
+        self.overscan = overscan
+        self.pool_size = pool_size
+        self.can_recycle = can_recycle or (lambda control: True)
+        self.keys = []
+        self._index = {}  # key -> posición en keys (se recalcula tras quitar un elemento)
+        self._index_stale = False
+        self._active = {}  # key -> control materializado
+        self._kept = {}  # key -> control con estado fuera de la ventana
+        self._pool = []  # Controles libres para reutilizar
+        self._first = 0
+        self._viewport = height
+        self._top = ft.Container(height=0)
+        self._bottom = ft.Container(height=0)
+        self.controls = [self._top, self._bottom]
+
+    def set_keys(self, keys):
+        """Reemplazar la lista de elementos"""
+        self.keys = list(keys)
+        self._index = {key: i for i, key in enumerate(self.keys)}
+        self._index_stale = False
+        self._render()
+
+    def append(self, key):
+        self._index[key] = len(self.keys)
+        self.keys.append(key)
+        self._render()
+
+    def remove(self, key):
+        if key not in self._index:
+            return
+        if self._index_stale:
+            self._index = {k: i for i, k in enumerate(self.keys)}
+        del self.keys[self._index.pop(key)]
+        self._index_stale = True  # Las posiciones siguientes se desplazaron
+        self._kept.pop(key, None)
+        control = self._active.pop(key, None)
+        if control is not None:
+            self._release(key, control)
+        self._render()
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def get(self, key):
+        """Control materializado de un elemento, o None si está fuera de la ventana"""
+        return self._active.get(key) or self._kept.get(key)
+
+    def active_items(self):
+        return list(self._active.items())
+
+    def on_list_scroll(self, e):
+        if e.viewport_dimension:
+            self._viewport = e.viewport_dimension
+        first = int((e.pixels or 0) // self.row_height)
+        # Re-renderizar solo cuando la ventana se acerca al borde del margen
+        if abs(first - self._first) >= max(1, self.overscan // 2):
+            self._first = first
+            self._render()
+
+    def _render(self):
+        visible = math.ceil(self._viewport / self.row_height) + 1
+        # Si la lista se acortó (quitar elementos, set_keys) la ventana no puede quedar más allá del final
+        self._first = min(self._first, max(0, len(self.keys) - visible))
+        start = max(0, self._first - self.overscan)
+        end = min(len(self.keys), self._first + visible + self.overscan)
+        window = self.keys[start:end]
+
+        wanted = set(window)
+        for key in [k for k in self._active if k not in wanted]:
+            self._release(key, self._active.pop(key))
+
+        items = []
+        for key in window:
+            control = self._active.get(key) or self._kept.pop(key, None)
+            if control is None:
+                control = self.item_builder(key, self._pool.pop() if self._pool else None)
+                control.height = self.row_height
+            self._active[key] = control
+            items.append(control)
+
+        self._top.height = start * self.row_height
+        self._bottom.height = (len(self.keys) - end) * self.row_height
+        self.controls = [self._top, *items, self._bottom]
+        if self.page:
+            self.update()
+
+    def _release(self, key, control):
+        if not self.can_recycle(control):
+            self._kept[key] = control
+        elif len(self._pool) < self.pool_size:
+            self._pool.append(control)
@@ -1,87 +1,121 @@
 import flet as ft
 import pandas as pd
-from sklearn.preprocessing import StandardScaler, LabelEncoder
+from cleaning.loader import CsvSource
+from cleaning.table_view import DataFrameView
+from cleaning.dedup import clean_to_csv
+from cleaning.plan import OperationPlan
+
+# Archivos mayores se procesan por chunks; en memoria solo queda una vista previa
+MAX_IN_MEMORY_MB = 512
+PREVIEW_ROWS = 100_000
+CHUNK_ROWS = 100_000
 
 def main(page: ft.Page):
     page.scroll = ft.ScrollMode.AUTO
     df = None
+    source = None
+    streaming = False  # True si df es solo la vista previa del archivo
+    plan = None  # Operaciones registradas; se evalúan sobre la vista previa y completas al exportar
+
+    def show_progress(rows, bytes_read, total_bytes):
+        progress_bar.value = bytes_read / total_bytes if total_bytes else 1.0
+        file_info.value = f"Leyendo... {rows:,} filas ({bytes_read / 1024 / 1024:.0f}/{total_bytes / 1024 / 1024:.0f} MB)"
+        page.update()
 
     def file_picker_result(e: ft.FilePickerResultEvent):
-        nonlocal df
+        nonlocal df, source, streaming, plan
         if e.files:
             file_path = e.files[0].path
-            df = pd.read_csv(file_path, sep=None, engine='python', encoding='latin1', on_bad_lines='skip')
-            update_dataframe_view(df)
-
-    def update_dataframe_view(dataframe: pd.DataFrame):
-        table = ft.DataTable(
-            columns=[ft.DataColumn(ft.Text(col)) for col in dataframe.columns],
-            rows=[
-                ft.DataRow(
-                    cells=[ft.DataCell(ft.Text(str(dataframe.iloc[i, j]))) for j in range(dataframe.shape[1])]
-                ) for i in range(dataframe.shape[0])
-            ]
-        )
-
-        scrollable_column = ft.Column(
-            controls=[table],
-            scroll=ft.ScrollMode.AUTO,  # Habilita el desplazamiento
-            expand=True  # Permite expandirse para usar todo el espacio disponible
-        )
-
-        scrollable_row=ft.Row(controls=[scrollable_column], scroll=ft.ScrollMode.AUTO,expand=True)
-
-
-        page.controls.clear()
-        page.add(file_picker_button, file_info, scrollable_row, btn_remove_nulls, btn_remove_duplicates, btn_normalize, btn_encode, btn_export_csv)
+            # Codificación y separador se detectan una vez con una muestra; después lee el motor C
+            try:
+                new_source = CsvSource(file_path)
+                new_streaming = new_source.size > MAX_IN_MEMORY_MB * 1024 * 1024
+                if progress_bar not in page.controls:
+                    page.add(progress_bar)
+                new_df = new_source.read(CHUNK_ROWS, on_progress=show_progress, nrows=PREVIEW_ROWS if new_streaming else None)
+            except (OSError, UnicodeDecodeError, pd.errors.ParserError) as error:
+                print(f"❌ Error al leer {file_path}: {error}")
+                file_info.value = f"No se pudo leer el archivo: {error}"
+                page.update()
+                return
+            source, streaming, df = new_source, new_streaming, new_df
+            plan = OperationPlan(df.head(PREVIEW_ROWS))
+            table_view.page_index = 0
+            if streaming:
+                file_info.value = f"Vista previa: primeras {len(df):,} filas. Las operaciones se aplican al archivo completo al exportar."
+            elif len(df) > PREVIEW_ROWS:
+                file_info.value = f"{len(df):,} filas cargadas. Vista previa de {PREVIEW_ROWS:,}; las operaciones se aplican a todo al exportar."
+            else:
+                file_info.value = f"{len(df):,} filas cargadas."
+            update_dataframe_view()
+
+    def update_dataframe_view():
+        # La tabla solo materializa la página visible; el resto de la UI se arma una sola vez
+        if table_view not in page.controls:
+            page.controls.clear()
+            page.add(file_picker_button, file_info, progress_bar, table_view,
+                     ft.Row([btn_remove_nulls, btn_remove_duplicates, btn_normalize, btn_encode, btn_export_csv]),
+                     ft.Row([btn_undo, btn_redo, steps_row], wrap=True))
+        table_view.set_frame(plan.result())
+        update_steps()
         page.update()
 
-    def remove_nulls(e):
-        nonlocal df
-        if df is not None:
-            df = df.dropna()
-            update_dataframe_view(df)
-
-    def remove_duplicates(e):
-        nonlocal df
-        if df is not None:
-            df = df.drop_duplicates()
-            update_dataframe_view(df)
-
-    def normalize_data(e):
-        nonlocal df
-        if df is not None:
-            numerical_columns = df.select_dtypes(include=['float64', 'int64']).columns.tolist()
-            scaler = StandardScaler()
-            df[numerical_columns] = scaler.fit_transform(df[numerical_columns])
-            update_dataframe_view(df)
-
-    def encode_categorical(e):
-        nonlocal df
-        if df is not None:
-            categorical_columns = df.select_dtypes(include=['object']).columns.tolist()
-            encoder = LabelEncoder()
-            for col in categorical_columns:
-                df[col] = encoder.fit_transform(df[col])
-            update_dataframe_view(df)
+    def update_steps():
+        """Pasos del plan, cada uno con botones para moverlo o quitarlo"""
+        steps_row.controls = [
+            ft.Container(
+                ft.Row([
+                    ft.Text(f"{i + 1}. {label}"),
+                    ft.IconButton(icon=ft.icons.ARROW_BACK, icon_size=16, disabled=i == 0,
+                                  on_click=lambda e, i=i: change_plan("move", i, -1)),
+                    ft.IconButton(icon=ft.icons.ARROW_FORWARD, icon_size=16, disabled=i == len(plan.ops) - 1,
+                                  on_click=lambda e, i=i: change_plan("move", i, 1)),
+                    ft.IconButton(icon=ft.icons.CLOSE, icon_size=16, on_click=lambda e, i=i: change_plan("remove", i)),
+                ], spacing=0),
+                border=ft.border.all(1, ft.colors.OUTLINE), border_radius=8, padding=ft.padding.only(left=8),
+            )
+            for i, label in enumerate(plan.labels())
+        ]
+        btn_undo.disabled = not plan.can_undo()
+        btn_redo.disabled = not plan.can_redo()
+
+    def change_plan(action, *args):
+        # Solo se recalcula desde el primer paso sin resultado guardado
+        if plan is not None:
+            getattr(plan, action)(*args)
+            update_dataframe_view()
 
     def export_data(e):
-        if df is not None:
-            df.to_csv("datos_procesados.csv", index=False)
+        if df is not None and streaming:
+            export_streaming("datos_procesados.csv")
+            page.update()
+        elif df is not None:
+            plan.run(df).to_csv("datos_procesados.csv", index=False)
             file_info.value = "Datos exportados a 'datos_procesados.csv'."
             page.update()
 
+    def export_streaming(output_path):
+        # Los pasos se aplican en el orden del plan: cada paso con estado (duplicados, normalizar,
+        # codificar) se prepara con una pasada sobre la salida de los anteriores
+        stats = clean_to_csv(source, output_path, plan.ops, chunksize=CHUNK_ROWS, on_progress=show_progress)
+        file_info.value = f"{stats['rows_out']:,} de {stats['rows_in']:,} filas exportadas ({stats['nulls']:,} con nulos, {stats['duplicates']:,} duplicadas)."
+
 
-    btn_remove_nulls = ft.ElevatedButton("Eliminar Nulos", on_click=remove_nulls)
-    btn_remove_duplicates = ft.ElevatedButton("Eliminar Duplicados", on_click=remove_duplicates)
-    btn_normalize = ft.ElevatedButton("Normalizar Datos", on_click=normalize_data)
-    btn_encode = ft.ElevatedButton("Codificar Categóricos", on_click=encode_categorical)
+    btn_remove_nulls = ft.ElevatedButton("Eliminar Nulos", on_click=lambda e: change_plan("add", "remove_nulls"))
+    btn_remove_duplicates = ft.ElevatedButton("Eliminar Duplicados", on_click=lambda e: change_plan("add", "remove_duplicates"))
+    btn_normalize = ft.ElevatedButton("Normalizar Datos", on_click=lambda e: change_plan("add", "normalize"))
+    btn_encode = ft.ElevatedButton("Codificar Categóricos", on_click=lambda e: change_plan("add", "encode"))
     btn_export_csv = ft.ElevatedButton("Exportar CSV", on_click=export_data)
+    btn_undo = ft.IconButton(icon=ft.icons.UNDO, tooltip="Deshacer", on_click=lambda e: change_plan("undo"))
+    btn_redo = ft.IconButton(icon=ft.icons.REDO, tooltip="Rehacer", on_click=lambda e: change_plan("redo"))
+    steps_row = ft.Row(wrap=True)
     
     file_picker = ft.FilePicker(on_result=file_picker_result)
     file_picker_button = ft.ElevatedButton("Seleccionar Archivo", on_click=lambda _: file_picker.pick_files())
 
     file_info = ft.Text()
+    progress_bar = ft.ProgressBar(value=0, width=400)
+    table_view = DataFrameView(page_size=50)
     
 
     page.add(file_picker_button, file_info)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# El paquete cleaning se importa desde la raíz de portfolio (como test.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
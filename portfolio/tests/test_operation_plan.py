@@ -0,0 +1,71 @@
+import pandas as pd
+import pytest
+from cleaning import plan as plan_module
+from cleaning.plan import OperationPlan
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Cuenta cuántas veces se ejecuta cada operación"""
+    counts = {}
+    operations = {}
+    for name, (label, func) in plan_module.OPERATIONS.items():
+        def counted(frame, name=name, func=func):
+            counts[name] = counts.get(name, 0) + 1
+            return func(frame)
+        operations[name] = (label, counted)
+    monkeypatch.setattr(plan_module, "OPERATIONS", operations)
+    return counts
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({"a": [1.0, 1.0, None, 4.0, 4.0], "b": ["x", "x", "y", "z", "z"]})
+
+def test_nothing_runs_until_the_result_is_requested(calls, frame):
+    plan = OperationPlan(frame)
+    plan.add("remove_nulls")
+    plan.add("remove_duplicates")
+    assert calls == {}
+    assert plan.result().equals(frame.dropna().drop_duplicates())
+    assert calls == {"remove_nulls": 1, "remove_duplicates": 1}
+
+def test_undo_and_redo_reuse_cached_prefixes(calls, frame):
+    plan = OperationPlan(frame)
+    plan.add("remove_nulls")
+    plan.add("remove_duplicates")
+    full = plan.result()
+
+    plan.undo()
+    assert plan.result().equals(frame.dropna())
+    plan.redo()
+    assert plan.result() is full
+    # Ni deshacer ni rehacer volvieron a ejecutar nada
+    assert calls == {"remove_nulls": 1, "remove_duplicates": 1}
+    assert not plan.can_redo()
+
+def test_move_recomputes_only_from_the_first_changed_step(calls, frame):
+    plan = OperationPlan(frame)
+    for op in ("remove_nulls", "remove_duplicates", "encode"):
+        plan.add(op)
+    plan.result()
+
+    plan.move(2, -1)  # remove_nulls, encode, remove_duplicates
+    assert plan.labels() == ["Eliminar nulos", "Codificar", "Eliminar duplicados"]
+    result = plan.result()
+    # El prefijo (remove_nulls,) venía de la caché
+    assert calls == {"remove_nulls": 1, "remove_duplicates": 2, "encode": 2}
+    assert result.equals(plan.run(frame.copy()))
+
+def test_new_step_clears_redo_and_cache_is_bounded(calls, frame):
+    plan = OperationPlan(frame, max_cached=2)
+    plan.add("remove_nulls")
+    plan.undo()
+    plan.add("remove_duplicates")
+    assert not plan.can_redo()
+    plan.add("remove_nulls")
+    plan.add("remove_duplicates")
+    plan.result()
+    assert len(plan._cache) == 2
+
+def test_unknown_operation_is_rejected(frame):
+    with pytest.raises(ValueError):
+        OperationPlan(frame).add("drop_table")